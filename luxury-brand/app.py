@@ -1,7 +1,14 @@
 from flask import Flask, render_template, request, jsonify, send_from_directory, session, redirect, url_for, flash
+from flask import Response, stream_with_context, g
 from flask_cors import CORS
 import os
-from werkzeug.utils import secure_filename
+import json
+import tempfile
+import hashlib
+import hmac
+from functools import wraps
+from werkzeug.utils import secure_filename, safe_join
+from werkzeug.middleware.proxy_fix import ProxyFix
 from PIL import Image
 from datetime import datetime
 from flask import abort
@@ -10,16 +17,61 @@ import paypalrestsdk
 
 # Import config and database models
 from config import Config
+from cache import LRUCache
+import blobstore
+from storage import init_storage, IMMUTABLE_CACHE_CONTROL
+from media import send_media
+from compression import Compression
+from build_assets import dist_path
+import critical_css
+import template_cache
+import serializers
+from serializers import json_response
+from product_cache import ProductCache
+from site_settings import SiteSettings
+from order_history import paginate_orders, decode_cursor, listing_dicts, order_detail
+from asset_reconcile import is_referenced
 from database import (
     db, Product, Testimonial, Video, Giveaway, Subscriber, Message,
-    SectionVisibility, User, Order, OrderItem, Notification, CartItem, 
-    WishlistItem, Payment, init_db
+    User, Order, OrderItem, Notification, CartItem, 
+    WishlistItem, Payment, Job, GiveawayEntry, init_db
 )
+from notifications import (
+    unread_notifications, mark_read, mark_read_range, paginate_notifications,
+    latest_notification_id, stream_notifications
+)
+import jobs
+from jobs import enqueue, job_handler, requeue_dead
+from giveaways import EntryBuffer, draw_winners
+from subscribers import normalize_email, subscribe as add_subscriber, export_csv as export_subscribers_csv
+from contact_intake import content_hash, is_duplicate, spam_score
+from ratelimit import Policy, RateLimiter, TOKEN_BUCKET, client_ip
+from instrumentation import Instrumentation
+import metrics
+from gateway import GatewayCall, gateway_view
 
 app = Flask(__name__)
 app.config.from_object(Config)
+
+# Behind a reverse proxy, take the client address (rate limits, contact intake) from X-Forwarded-*
+if app.config.get('PROXY_FIX_HOPS'):
+    hops = app.config['PROXY_FIX_HOPS']
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
+
 CORS(app)
 
+# Compiled templates persist in TEMPLATE_CACHE_DIR across workers and restarts
+template_cache.init_app(app)
+
+# Request timing, query counts and slow-query log
+perf = Instrumentation(app)
+
+# gzip/brotli for HTML, JSON and other text responses
+compression = Compression(app)
+
+# critical_css() / section_scripts() template globals for index.html
+critical_css.init_app(app)
+
 # Initialize payment processors
 stripe.api_key = app.config.get('STRIPE_SECRET_KEY', '')
 paypalrestsdk.configure({
@@ -28,11 +80,14 @@ paypalrestsdk.configure({
     "client_secret": app.config.get('PAYPAL_CLIENT_SECRET', '')
 })
 
-# Ensure upload folder and subfolders exist
-base_upload = app.config.get('UPLOAD_FOLDER', 'static/uploads')
-os.makedirs(base_upload, exist_ok=True)
-for sub in ['products', 'giveaway', 'videos']:
-    os.makedirs(os.path.join(base_upload, sub), exist_ok=True)
+# Upload storage (local UPLOAD_FOLDER or an S3-compatible bucket)
+storage = init_storage(app)
+if app.config.get('STORAGE_BACKEND', 'filesystem') == 'filesystem':
+    # Ensure upload folder and subfolders exist
+    base_upload = app.config.get('UPLOAD_FOLDER', 'static/uploads')
+    os.makedirs(base_upload, exist_ok=True)
+    for sub in ['products', 'giveaway', 'videos']:
+        os.makedirs(os.path.join(base_upload, sub), exist_ok=True)
 
 # Initialize SQLAlchemy app
 db.init_app(app)
@@ -41,6 +96,14 @@ db.init_app(app)
 with app.app_context():
     init_db()
 
+# Prometheus metrics: request latency, DB pool, job queue depth
+if app.config.get('METRICS_ENABLED', True):
+    metrics.init_app(app, db, queue_depth=jobs.queue_depth)
+    metrics.register_cache('compressed_responses', compression.cache)
+
+# Background job worker for side effects (notifications, file cleanup, payment records)
+jobs.init_app(app)
+
 # -------------------------
 # Helper functions
 # -------------------------
@@ -49,17 +112,17 @@ def allowed_file(filename):
 
 def save_image(file, folder, max_size=(800, 800)):
     """
-    Save an uploaded image safely and resize it.
-    Returns filename or None.
+    Resize an uploaded image and store it content-addressed, so identical
+    images share one file. `folder` only appears in the public URL
+    (/uploads/<folder>/<name>). Returns the blob name or None; a blob
+    reference is taken in the current transaction, so the caller commits.
     """
     if not file or not file.filename or not allowed_file(file.filename):
         return None
 
-    filename = secure_filename(file.filename)
-    filename = f"{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{filename}"
-    folder_path = os.path.join(app.config['UPLOAD_FOLDER'], folder)
-    os.makedirs(folder_path, exist_ok=True)
-    filepath = os.path.join(folder_path, filename)
+    ext = secure_filename(file.filename).rsplit('.', 1)[-1].lower()
+    if ext == 'jpeg':
+        ext = 'jpg'
 
     try:
         image = Image.open(file.stream)
@@ -71,12 +134,182 @@ def save_image(file, folder, max_size=(800, 800)):
 
         if image.mode in ("RGBA", "P"):
             image = image.convert("RGB")
-        image.save(filepath)
-        return filename
+        # Encode to a spooled temp file (disk past 1 MB) and stream it to storage
+        with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as encoded:
+            image.save(encoded, format=Image.registered_extensions()[f'.{ext}'])
+            return blobstore.store(storage, encoded, ext)
     except Exception as e:
         app.logger.exception("Error processing image: %s", e)
         return None
 
+# Per-user header badge counts (cart, wishlist, unread notifications)
+summary_cache = LRUCache(maxsize=app.config.get('USER_SUMMARY_CACHE_SIZE', 10000),
+                         ttl=app.config.get('USER_SUMMARY_CACHE_TTL', 30))
+metrics.register_cache('user_summary', summary_cache)
+
+def invalidate_user_summary(*user_ids):
+    for user_id in user_ids:
+        summary_cache.delete(user_id)
+
+def build_user_summary(user_id):
+    """
+    Return (summary, etag) for the header badges, computing it at most
+    once per TTL per user.
+    """
+    cached = summary_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    user = User.query.get(user_id)
+    summary = {
+        'authenticated': True,
+        'username': user.username if user else None,
+        'is_admin': bool(user and user.user_type == 'admin'),
+        'cart_count': CartItem.query.filter_by(user_id=user_id).count(),
+        'wishlist_count': WishlistItem.query.filter_by(user_id=user_id).count(),
+        'unread_notifications': Notification.query.filter_by(user_id=user_id, is_read=False).count(),
+    }
+    etag = hashlib.sha1(json.dumps(summary, sort_keys=True).encode()).hexdigest()
+    summary_cache.set(user_id, (summary, etag))
+    return summary, etag
+
+def public_page(view):
+    """
+    Mark a page as identical for every visitor so shared caches (CDN,
+    reverse proxy) can serve it. The page must not read the session;
+    login state and badges are filled in client-side from /api/me/summary.
+    Adds a body ETag for revalidation. A response that sets a cookie
+    anyway (e.g. a session refresh) falls back to private caching.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.public_page = True
+        response = app.make_response(view(*args, **kwargs))
+        if response.status_code != 200:
+            return response
+        if 'Set-Cookie' in response.headers:
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+        directives = [
+            'public',
+            f"max-age={app.config.get('PUBLIC_CACHE_MAX_AGE', 60)}",
+            f"s-maxage={app.config.get('PUBLIC_CACHE_S_MAXAGE', 300)}",
+        ]
+        stale = app.config.get('PUBLIC_CACHE_STALE_WHILE_REVALIDATE', 60)
+        if stale:
+            directives.append(f'stale-while-revalidate={stale}')
+        response.headers['Cache-Control'] = ', '.join(directives)
+        response.add_etag()
+        return response.make_conditional(request)
+    return wrapper
+
+# Section toggles, held in memory and reloaded when the version file changes
+site_settings = SiteSettings(app.config['SITE_SETTINGS_VERSION_PATH'])
+
+# Product snapshots for cart, wishlist and checkout; invalidated by manage_products
+product_cache = ProductCache(maxsize=app.config.get('PRODUCT_CACHE_SIZE', 5000),
+                             ttl=app.config.get('PRODUCT_CACHE_TTL', 300),
+                             shared_path=app.config.get('PRODUCT_CACHE_SHARED_PATH') or None,
+                             shared_ttl=app.config.get('PRODUCT_CACHE_SHARED_TTL', 3600))
+metrics.register_cache('products', product_cache.local)
+if product_cache.shared is not None:
+    metrics.register_cache('products_shared', product_cache.shared)
+
+# Giveaway entries are buffered in memory and written in batches
+giveaway_entries = EntryBuffer(
+    app,
+    batch_size=app.config.get('GIVEAWAY_ENTRY_BATCH_SIZE', 500),
+    flush_interval=app.config.get('GIVEAWAY_ENTRY_FLUSH_INTERVAL', 0.5),
+    max_pending=app.config.get('GIVEAWAY_ENTRY_MAX_PENDING', 20000),
+)
+active_giveaway_cache = LRUCache(maxsize=1, ttl=10)
+metrics.register_cache('active_giveaway', active_giveaway_cache)
+
+def get_active_giveaway():
+    """(id, end_date) of the giveaway shown on the homepage, cached briefly for entry spikes."""
+    active = active_giveaway_cache.get('active')
+    if active is None:
+        giveaway = Giveaway.query.filter_by(visible=True).first()
+        active = (giveaway.id, giveaway.end_date) if giveaway else (None, None)
+        active_giveaway_cache.set('active', active)
+    return active
+
+# Throttles for public write endpoints, checked before the view touches the database
+rate_limiter = RateLimiter(app)
+LOGIN_LIMIT = Policy.parse('login', app.config.get('RATELIMIT_LOGIN', '10/300'))
+REGISTER_LIMIT = Policy.parse('register', app.config.get('RATELIMIT_REGISTER', '5/3600'))
+SUBSCRIBE_LIMIT = Policy.parse('subscribe', app.config.get('RATELIMIT_SUBSCRIBE', '10/3600'))
+GIVEAWAY_LIMIT = Policy.parse('giveaway', app.config.get('RATELIMIT_GIVEAWAY', '10/3600'))
+CART_LIMIT = Policy.parse('cart', app.config.get('RATELIMIT_CART', '60/60'), TOKEN_BUCKET)
+CONTACT_IP_LIMIT = Policy('contact_ip', app.config.get('CONTACT_IP_LIMIT', 5),
+                          app.config.get('CONTACT_RATE_WINDOW', 600))
+CONTACT_EMAIL_LIMIT = Policy('contact_email', app.config.get('CONTACT_EMAIL_LIMIT', 3),
+                             app.config.get('CONTACT_RATE_WINDOW', 600))
+
+# -------------------------
+# Background jobs
+# -------------------------
+@job_handler('notify_admins')
+def notify_admins_job(message, notification_type='order', related_id=None):
+    admin_ids = [admin_id for (admin_id,) in db.session.query(User.id).filter_by(user_type='admin')]
+    db.session.add_all(
+        Notification(user_id=admin_id, message=message, notification_type=notification_type, related_id=related_id)
+        for admin_id in admin_ids
+    )
+    db.session.commit()
+    invalidate_user_summary(*admin_ids)
+
+@job_handler('notify_user')
+def notify_user_job(user_id, message, notification_type='general', related_id=None):
+    db.session.add(Notification(user_id=user_id, message=message,
+                                notification_type=notification_type, related_id=related_id))
+    db.session.commit()
+    invalidate_user_summary(user_id)
+
+@job_handler('delete_upload')
+def delete_upload_job(folder, filename):
+    if blobstore.is_blob_name(filename):
+        # Only removed once nothing references it any more
+        blobstore.collect(storage, filename)
+        return
+    if not is_referenced(folder, filename):
+        storage.delete(f'{folder}/{filename}')
+
+@job_handler('record_payment')
+def record_payment_job(order_id, user_id, payment_method, payment_intent_id, amount,
+                       currency='USD', payment_status='pending'):
+    """Create the Payment row for a gateway transaction, or advance its status if it already exists."""
+    payment = Payment.query.filter_by(payment_intent_id=payment_intent_id).first()
+    if payment is None:
+        db.session.add(Payment(
+            order_id=order_id,
+            user_id=user_id,
+            payment_method=payment_method,
+            payment_intent_id=payment_intent_id,
+            amount=amount,
+            currency=currency,
+            payment_status=payment_status
+        ))
+    elif payment_status != 'pending':
+        payment.payment_status = payment_status
+    db.session.commit()
+
+@job_handler('score_message')
+def score_message_job(message_id):
+    message = Message.query.get(message_id)
+    if message is None:
+        return
+    message.spam_score = spam_score(message.name, message.email, message.message)
+    message.is_spam = message.spam_score >= app.config.get('CONTACT_SPAM_THRESHOLD', 0.7)
+    db.session.commit()
+
+def delete_upload_later(folder, filename):
+    """Drop a reference to an uploaded file and queue its removal; caller commits."""
+    if filename:
+        blobstore.release(filename)
+        enqueue('delete_upload', folder=folder, filename=filename)
+
 # -------------------------
 # Context processor
 # -------------------------
@@ -85,6 +318,9 @@ def inject_globals():
     now = datetime.utcnow()
     current_user = None
     cart_count = 0
+    if g.get('public_page'):
+        # Shared-cacheable page: touching the session would add Vary: Cookie
+        return {'now': now, 'current_user': current_user, 'cart_count': cart_count}
     user_id = session.get('user_id')
     if user_id:
         try:
@@ -100,6 +336,7 @@ def inject_globals():
 # Auth routes
 # -------------------------
 @app.route('/register', methods=['GET', 'POST'])
+@rate_limiter.limit(REGISTER_LIMIT, methods=('POST',))
 def register():
     if request.method == 'POST':
         username = request.form.get('username')
@@ -133,6 +370,7 @@ def register():
     return render_template('register.html')
 
 @app.route('/login', methods=['GET', 'POST'])
+@rate_limiter.limit(LOGIN_LIMIT, methods=('POST',))
 def login():
     if request.method == 'POST':
         username = request.form.get('username')
@@ -171,12 +409,15 @@ def logout():
 # Cart and wishlist routes
 # -------------------------
 @app.route('/add_to_cart/<int:product_id>')
+@rate_limiter.limit(CART_LIMIT, key=lambda: str(session.get('user_id') or client_ip()))
 def add_to_cart(product_id):
     if 'user_id' not in session:
         flash('Please login to add items to your cart.', 'error')
         return redirect(url_for('login'))
 
-    product = Product.query.get_or_404(product_id)
+    product = product_cache.get(product_id)
+    if product is None:
+        abort(404)
 
     # Check if item already in cart
     cart_item = CartItem.query.filter_by(user_id=session['user_id'], product_id=product_id).first()
@@ -188,7 +429,8 @@ def add_to_cart(product_id):
         db.session.add(cart_item)
 
     db.session.commit()
-    flash(f'{product.name} added to cart!', 'success')
+    invalidate_user_summary(session['user_id'])
+    flash(f"{product['name']} added to cart!", 'success')
     return redirect(request.referrer or url_for('index'))
 
 @app.route('/remove_from_cart/<int:item_id>')
@@ -206,6 +448,7 @@ def remove_from_cart(item_id):
 
     db.session.delete(cart_item)
     db.session.commit()
+    invalidate_user_summary(session['user_id'])
     flash('Item removed from cart.', 'success')
     return redirect(url_for('cart'))
 
@@ -233,6 +476,7 @@ def update_cart(item_id):
         cart_item.quantity = quantity
 
     db.session.commit()
+    invalidate_user_summary(session['user_id'])
     return jsonify({'success': True, 'message': 'Cart updated.'})
 
 @app.route('/add_to_wishlist/<int:product_id>')
@@ -241,7 +485,9 @@ def add_to_wishlist(product_id):
         flash('Please login to add items to your wishlist.', 'error')
         return redirect(url_for('login'))
 
-    product = Product.query.get_or_404(product_id)
+    product = product_cache.get(product_id)
+    if product is None:
+        abort(404)
 
     # Check if item already in wishlist
     wishlist_item = WishlistItem.query.filter_by(user_id=session['user_id'], product_id=product_id).first()
@@ -250,9 +496,10 @@ def add_to_wishlist(product_id):
         wishlist_item = WishlistItem(user_id=session['user_id'], product_id=product_id)
         db.session.add(wishlist_item)
         db.session.commit()
-        flash(f'{product.name} added to wishlist!', 'success')
+        invalidate_user_summary(session['user_id'])
+        flash(f"{product['name']} added to wishlist!", 'success')
     else:
-        flash(f'{product.name} is already in your wishlist.', 'info')
+        flash(f"{product['name']} is already in your wishlist.", 'info')
 
     return redirect(request.referrer or url_for('index'))
 
@@ -271,12 +518,18 @@ def remove_from_wishlist(item_id):
 
     db.session.delete(wishlist_item)
     db.session.commit()
+    invalidate_user_summary(session['user_id'])
     flash('Item removed from wishlist.', 'success')
     return redirect(url_for('wishlist'))
 
 # -------------------------
 # Checkout & Payment routes
 # -------------------------
+def cart_total(cart_items, products):
+    """Sum of the cart lines at their cached product prices; missing products count as 0."""
+    return sum(((products[item.product_id]['price'] or 0.0) if item.product_id in products else 0.0)
+               * item.quantity for item in cart_items)
+
 @app.route('/checkout', methods=['GET', 'POST'])
 def checkout():
     if 'user_id' not in session:
@@ -296,8 +549,19 @@ def checkout():
         shipping_address = request.form.get('shipping_address', '')
         billing_address = request.form.get('billing_address', shipping_address)
         
+        # Charge current prices: the product cache may lag an admin edit made on another worker
+        prices = dict(db.session.execute(
+            db.select(Product.id, Product.price)
+            .where(Product.id.in_({item.product_id for item in cart_items}))).all())
+
+        # Lines whose product has since been deleted are dropped
+        cart_items = [item for item in cart_items if item.product_id in prices]
+        if not cart_items:
+            flash('The products in your cart are no longer available.', 'error')
+            return redirect(url_for('cart'))
+
         # Calculate total
-        total_amount = sum((item.product.price or 0.0) * item.quantity for item in cart_items)
+        total_amount = sum((prices[item.product_id] or 0.0) * item.quantity for item in cart_items)
         
         # Create order
         order = Order(
@@ -318,26 +582,20 @@ def checkout():
                 order_id=order.id,
                 product_id=item.product_id,
                 quantity=item.quantity,
-                price=item.product.price
+                price=prices[item.product_id]
             )
             db.session.add(order_item)
         
-        db.session.commit()
-        
-        # Create notifications for admins
-        admins = User.query.filter_by(user_type='admin').all()
-        for admin in admins:
-            notification = Notification(
-                user_id=admin.id,
+        # Notify admins in the background
+        enqueue('notify_admins',
                 message=f"New order #{order.id} placed by {session.get('username', 'Unknown')} for ${total_amount:.2f}",
                 notification_type="order",
-                related_id=order.id
-            )
-            db.session.add(notification)
+                related_id=order.id)
         
         # Clear cart
         CartItem.query.filter_by(user_id=user_id).delete()
         db.session.commit()
+        invalidate_user_summary(user_id)
         
         # Redirect to payment processing based on method
         if payment_method == 'stripe':
@@ -352,8 +610,9 @@ def checkout():
             return redirect(url_for('order_confirmation', order_id=order.id))
 
     # Calculate total for GET request
-    total = sum((item.product.price or 0.0) * item.quantity for item in cart_items)
-    return render_template('checkout.html', cart_items=cart_items, total=total, 
+    products = product_cache.get_many(item.product_id for item in cart_items)
+    total = cart_total(cart_items, products)
+    return render_template('checkout.html', cart_items=cart_items, products=products, total=total,
                           stripe_public_key=app.config.get('STRIPE_PUBLIC_KEY', ''))
 
 @app.route('/process-stripe-payment/<int:order_id>')
@@ -384,6 +643,7 @@ def process_paypal_payment(order_id):
     return render_template('paypal_payment.html', order=order)
 
 @app.route('/api/create-payment-intent', methods=['POST'])
+@gateway_view
 def create_payment_intent():
     try:
         data = request.get_json()
@@ -395,34 +655,33 @@ def create_payment_intent():
         order = Order.query.get_or_404(order_id)
         
         # Create a PaymentIntent with the order amount and currency
-        intent = stripe.PaymentIntent.create(
+        intent = yield GatewayCall(
+            'stripe', 'create_payment_intent', stripe.PaymentIntent.create,
             amount=int(order.total_amount * 100),  # Convert to cents
             currency='usd',
             metadata={'order_id': order_id}
         )
         
-        # Create payment record in database
-        payment = Payment(
-            order_id=order_id,
-            user_id=order.user_id,
-            payment_method='stripe',
-            payment_intent_id=intent.id,
-            amount=order.total_amount,
-            currency='USD',
-            payment_status='pending'
-        )
-        db.session.add(payment)
+        # Record the payment in the background
+        enqueue('record_payment',
+                order_id=order.id,
+                user_id=order.user_id,
+                payment_method='stripe',
+                payment_intent_id=intent.id,
+                amount=order.total_amount,
+                currency='USD')
         db.session.commit()
         
         return jsonify({
             'clientSecret': intent.client_secret,
-            'payment_id': payment.id
+            'payment_intent_id': intent.id
         })
     except Exception as e:
         app.logger.exception("Error creating payment intent: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/confirm-stripe-payment', methods=['POST'])
+@gateway_view
 def confirm_stripe_payment():
     try:
         data = request.get_json()
@@ -433,29 +692,36 @@ def confirm_stripe_payment():
             return jsonify({'error': 'Payment intent ID and order ID are required'}), 400
         
         # Retrieve the payment intent from Stripe
-        intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+        intent = yield GatewayCall('stripe', 'retrieve_payment_intent', stripe.PaymentIntent.retrieve,
+                                   payment_intent_id)
         
         if intent.status == 'succeeded':
             # Update payment and order status
+            order = Order.query.get(order_id)
+            if not order:
+                return jsonify({'error': 'Order not found'}), 404
+            order.payment_status = 'paid'
+            order.status = 'processing'
+
             payment = Payment.query.filter_by(payment_intent_id=payment_intent_id).first()
             if payment:
                 payment.payment_status = 'completed'
-                
-            order = Order.query.get(order_id)
-            if order:
-                order.payment_status = 'paid'
-                order.status = 'processing'
-                
-            db.session.commit()
+            else:
+                # The pending record job has not run yet; let it land as completed
+                enqueue('record_payment',
+                        order_id=order.id,
+                        user_id=order.user_id,
+                        payment_method='stripe',
+                        payment_intent_id=payment_intent_id,
+                        amount=order.total_amount,
+                        payment_status='completed')
             
-            # Create notification for user
-            notification = Notification(
-                user_id=order.user_id,
-                message=f"Your payment for order #{order_id} was successful. Your order is now being processed.",
-                notification_type="payment",
-                related_id=order_id
-            )
-            db.session.add(notification)
+            # Notify the customer in the background
+            enqueue('notify_user',
+                    user_id=order.user_id,
+                    message=f"Your payment for order #{order_id} was successful. Your order is now being processed.",
+                    notification_type="payment",
+                    related_id=order.id)
             db.session.commit()
             
             return jsonify({'success': True, 'message': 'Payment confirmed successfully'})
@@ -467,6 +733,7 @@ def confirm_stripe_payment():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/create-paypal-order', methods=['POST'])
+@gateway_view
 def create_paypal_order():
     try:
         data = request.get_json()
@@ -490,22 +757,22 @@ def create_paypal_order():
                     "total": f"{order.total_amount:.2f}",
                     "currency": "USD"
                 },
-                "description": f"Payment for order #{order_id}"
+                "description": f"Payment for order #{order_id}",
+                "custom": str(order.id)
             }]
         })
         
-        if payment.create():
-            # Create payment record in database
-            paypal_payment = Payment(
-                order_id=order_id,
-                user_id=order.user_id,
-                payment_method='paypal',
-                payment_intent_id=payment.id,
-                amount=order.total_amount,
-                currency='USD',
-                payment_status='pending'
-            )
-            db.session.add(paypal_payment)
+        created = yield GatewayCall('paypal', 'create_payment', payment.create, falsy_fails=True)
+
+        if created:
+            # Record the payment in the background
+            enqueue('record_payment',
+                    order_id=order.id,
+                    user_id=order.user_id,
+                    payment_method='paypal',
+                    payment_intent_id=payment.id,
+                    amount=order.total_amount,
+                    currency='USD')
             db.session.commit()
             
             # Find the approval URL
@@ -520,6 +787,7 @@ def create_paypal_order():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/paypal-success')
+@gateway_view
 def paypal_success():
     payment_id = request.args.get('paymentId')
     payer_id = request.args.get('PayerID')
@@ -530,29 +798,39 @@ def paypal_success():
     
     try:
         # Execute PayPal payment
-        payment = paypalrestsdk.Payment.find(payment_id)
-        
-        if payment.execute({"payer_id": payer_id}):
+        payment = yield GatewayCall('paypal', 'find_payment', paypalrestsdk.Payment.find, payment_id)
+        executed = yield GatewayCall('paypal', 'execute_payment', payment.execute, {"payer_id": payer_id},
+                                     falsy_fails=True)
+
+        if executed:
             # Update payment and order status
             paypal_payment = Payment.query.filter_by(payment_intent_id=payment_id).first()
             if paypal_payment:
                 paypal_payment.payment_status = 'completed'
-                
-                order = Order.query.get(paypal_payment.order_id)
-                if order:
-                    order.payment_status = 'paid'
-                    order.status = 'processing'
-                    
-                db.session.commit()
-                
-                # Create notification for user
-                notification = Notification(
-                    user_id=order.user_id,
-                    message=f"Your PayPal payment for order #{order.id} was successful. Your order is now being processed.",
-                    notification_type="payment",
-                    related_id=order.id
-                )
-                db.session.add(notification)
+                order_id = paypal_payment.order_id
+            else:
+                # Payment record still queued; the order id travels in the transaction
+                order_id = int(payment.transactions[0].custom)
+
+            order = Order.query.get(order_id)
+            if order:
+                order.payment_status = 'paid'
+                order.status = 'processing'
+                if not paypal_payment:
+                    enqueue('record_payment',
+                            order_id=order.id,
+                            user_id=order.user_id,
+                            payment_method='paypal',
+                            payment_intent_id=payment_id,
+                            amount=order.total_amount,
+                            payment_status='completed')
+
+                # Notify the customer in the background
+                enqueue('notify_user',
+                        user_id=order.user_id,
+                        message=f"Your PayPal payment for order #{order.id} was successful. Your order is now being processed.",
+                        notification_type="payment",
+                        related_id=order.id)
                 db.session.commit()
                 
                 flash('Payment successful! Your order is being processed.', 'success')
@@ -590,21 +868,47 @@ def orders():
         flash('Please login to view your orders.', 'error')
         return redirect(url_for('login'))
     
-    user_id = session['user_id']
-    user_orders = Order.query.filter_by(user_id=user_id).order_by(Order.created_at.desc()).all()
-    
-    return render_template('orders.html', orders=user_orders)
+    # First page server-side; the template fetches further pages from /api/orders
+    rows, next_cursor = paginate_orders(session['user_id'], limit=app.config.get('ORDERS_PAGE_SIZE', 20))
+    return render_template('orders.html', orders=listing_dicts(rows), next_cursor=next_cursor)
+
+@app.route('/api/orders')
+def api_orders():
+    """Keyset-paginated order history of the logged-in user (?cursor=&limit=)."""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'message': 'Login required'}), 401
+
+    cursor = request.args.get('cursor')
+    try:
+        cursor = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+    limit = max(1, min(request.args.get('limit', app.config.get('ORDERS_PAGE_SIZE', 20), type=int), 100))
+    rows, next_cursor = paginate_orders(session['user_id'], cursor=cursor, limit=limit)
+    return jsonify({'orders': listing_dicts(rows), 'next_cursor': next_cursor})
+
+@app.route('/api/orders/<int:order_id>')
+def api_order_detail(order_id):
+    """One order with its items, loaded when the customer expands it in the history."""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'message': 'Login required'}), 401
+    order = Order.query.get_or_404(order_id)
+    if order.user_id != session['user_id'] and session.get('user_type') != 'admin':
+        abort(404)
+    return jsonify(order_detail(order))
 
 # -------------------------
 # Main site routes
 # -------------------------
 @app.route('/')
+@public_page
 def index():
-    sections = {s.section_name: s.visible for s in SectionVisibility.query.all()}
-    products = Product.query.filter_by(visible=True).all()
-    testimonials = Testimonial.query.filter_by(visible=True).all()
-    videos = Video.query.filter_by(visible=True).all()
-    giveaway = Giveaway.query.filter_by(visible=True).first()
+    sections = site_settings.sections()
+    # Hidden sections are not rendered, so skip their queries
+    products = Product.query.filter_by(visible=True).all() if sections.get('products') else []
+    testimonials = Testimonial.query.filter_by(visible=True).all() if sections.get('testimonials') else []
+    videos = Video.query.filter_by(visible=True).all() if sections.get('videos') else []
+    giveaway = Giveaway.query.filter_by(visible=True).first() if sections.get('giveaway') else None
 
     # cart_count is injected by context_processor (cart_count)
     return render_template(
@@ -626,7 +930,7 @@ def cart():
     cart_items = CartItem.query.filter_by(user_id=user_id).all()
 
     # Calculate total
-    total = sum((item.product.price or 0.0) * item.quantity for item in cart_items)
+    total = cart_total(cart_items, product_cache.get_many(item.product_id for item in cart_items))
 
     return render_template('cart.html', cart_items=cart_items, total=total)
 
@@ -645,60 +949,85 @@ def wishlist():
 # API endpoints for forms
 # -------------------------
 @app.route('/api/subscribe', methods=['POST'])
+@rate_limiter.limit(SUBSCRIBE_LIMIT)
 def subscribe():
     try:
         data = request.get_json()
         if not data:
             return jsonify({'success': False, 'message': 'No data provided'}), 400
 
-        email = data.get('email')
-        if email:
-            # Check if email already exists
-            existing = Subscriber.query.filter_by(email=email).first()
-            if not existing:
-                new_sub = Subscriber(email=email)
-                db.session.add(new_sub)
-                db.session.commit()
-                return jsonify({'success': True, 'message': 'Subscribed successfully!'})
-            return jsonify({'success': False, 'message': 'Email already subscribed.'})
-        return jsonify({'success': False, 'message': 'Email is required.'}), 400
+        if not data.get('email'):
+            return jsonify({'success': False, 'message': 'Email is required.'}), 400
+        email = normalize_email(data['email'])
+        if not email:
+            return jsonify({'success': False, 'message': 'Please provide a valid email.'}), 400
+
+        if add_subscriber(email):
+            return jsonify({'success': True, 'message': 'Subscribed successfully!'})
+        return jsonify({'success': False, 'message': 'Email already subscribed.'})
     except Exception as e:
         app.logger.exception("subscribe error")
         return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
 
 @app.route('/api/contact', methods=['POST'])
+@rate_limiter.limit(CONTACT_IP_LIMIT)
 def contact():
     try:
         data = request.get_json()
         if not data:
             return jsonify({'success': False, 'message': 'No data provided'}), 400
 
-        name = data.get('name')
-        email = data.get('email')
-        message_text = data.get('message')
+        name = (data.get('name') or '').strip()
+        email = (data.get('email') or '').strip().lower()
+        message_text = (data.get('message') or '').strip()
 
-        if name and email and message_text:
-            new_message = Message(name=name, email=email, message=message_text)
-            db.session.add(new_message)
-            db.session.commit()
+        if not (name and email and message_text):
+            return jsonify({'success': False, 'message': 'All fields are required.'}), 400
+
+        # Per-sender throttle (per IP is on the route), before touching the database
+        limited = rate_limiter.hit(CONTACT_EMAIL_LIMIT, email)
+        if not limited.allowed:
+            return rate_limiter.limited(limited, 'Too many messages. Please try again later.')
+
+        # Drop resubmissions of the same content; the sender still sees success
+        fingerprint = content_hash(email, message_text)
+        if is_duplicate(fingerprint, app.config.get('CONTACT_DUPLICATE_WINDOW', 86400)):
             return jsonify({'success': True, 'message': 'Message sent successfully!'})
-        return jsonify({'success': False, 'message': 'All fields are required.'}), 400
+
+        new_message = Message(name=name[:100], email=email[:120], message=message_text,
+                              content_hash=fingerprint, ip_address=request.remote_addr)
+        db.session.add(new_message)
+        db.session.flush()
+        enqueue('score_message', message_id=new_message.id)
+        db.session.commit()
+        return jsonify({'success': True, 'message': 'Message sent successfully!'})
     except Exception as e:
         app.logger.exception("contact error")
         return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
 
 @app.route('/api/enter-giveaway', methods=['POST'])
+@rate_limiter.limit(GIVEAWAY_LIMIT)
 def enter_giveaway():
     try:
         data = request.get_json()
         if not data:
             return jsonify({'success': False, 'message': 'No data provided'}), 400
 
-        email = data.get('email')
-        if email:
-            # In a real implementation, you'd save this to a separate table
-            return jsonify({'success': True, 'message': 'Entered giveaway successfully!'})
-        return jsonify({'success': False, 'message': 'Email is required.'}), 400
+        email = (data.get('email') or '').strip().lower()
+        if not email:
+            return jsonify({'success': False, 'message': 'Email is required.'}), 400
+        if '@' not in email or len(email) > 150:
+            return jsonify({'success': False, 'message': 'Please provide a valid email.'}), 400
+
+        giveaway_id, end_date = get_active_giveaway()
+        if giveaway_id is None:
+            return jsonify({'success': False, 'message': 'There is no active giveaway.'}), 404
+        if end_date and end_date < datetime.utcnow():
+            return jsonify({'success': False, 'message': 'This giveaway has ended.'}), 400
+
+        # Buffered; duplicates are dropped by the unique (giveaway_id, email) constraint on flush
+        giveaway_entries.add(giveaway_id, email)
+        return jsonify({'success': True, 'message': 'Entered giveaway successfully!'})
     except Exception as e:
         app.logger.exception("enter_giveaway error")
         return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
@@ -712,35 +1041,130 @@ def admin():
         flash('Admin access required.', 'error')
         return redirect(url_for('login'))
 
-    # Get notifications for this admin
-    notifications = Notification.query.filter_by(user_id=session['user_id']).order_by(Notification.created_at.desc()).all()
+    # Latest unread notifications for this admin; newer ones arrive over the stream
+    user_id = session['user_id']
+    notifications = unread_notifications(user_id, app.config.get('ADMIN_NOTIFICATION_LIMIT', 50))
 
-    # Mark notifications as read (only those fetched)
-    for notification in notifications:
-        if not notification.is_read:
-            notification.is_read = True
+    # Mark the fetched notifications as read in one UPDATE
+    if mark_read(user_id, [n.id for n in notifications]):
+        db.session.commit()
+        invalidate_user_summary(user_id)
+
+    last_notification_id = latest_notification_id(user_id)
+    return render_template('admin.html', notifications=notifications,
+                           last_notification_id=last_notification_id)
+
+@app.route('/api/admin/notifications', methods=['GET'])
+def admin_notifications():
+    """Keyset-paginated notifications for the logged-in admin (?before_id=&limit=&unread=1)."""
+    if 'user_id' not in session or session.get('user_type') != 'admin':
+        abort(403)
+
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    rows, next_before_id = paginate_notifications(
+        session['user_id'],
+        before_id=request.args.get('before_id', type=int),
+        limit=max(limit, 1),
+        unread_only=request.args.get('unread') in ('1', 'true'),
+    )
+    return jsonify({'notifications': [n.to_dict() for n in rows], 'next_before_id': next_before_id})
+
+@app.route('/api/admin/notifications/read', methods=['POST'])
+def admin_notifications_read():
+    """
+    Bulk mark-read in a single UPDATE. Accepts {"ids": [...]} or an id
+    range {"from_id": a, "to_id": b}; either bound may be omitted.
+    """
+    if 'user_id' not in session or session.get('user_type') != 'admin':
+        abort(403)
+
+    data = request.get_json(silent=True) or {}
+    user_id = session['user_id']
+    try:
+        if 'ids' in data:
+            updated = mark_read(user_id, [int(i) for i in data['ids']])
+        else:
+            from_id = int(data['from_id']) if data.get('from_id') is not None else None
+            to_id = int(data['to_id']) if data.get('to_id') is not None else None
+            updated = mark_read_range(user_id, from_id, to_id)
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'Invalid notification ids'}), 400
 
     db.session.commit()
+    invalidate_user_summary(user_id)
+    return jsonify({'success': True, 'updated': updated})
+
+@app.route('/api/admin/notifications/stream')
+def admin_notification_stream():
+    """Server-sent events feed of new notifications for the logged-in admin."""
+    if 'user_id' not in session or session.get('user_type') != 'admin':
+        abort(403)
 
-    return render_template('admin.html', notifications=notifications)
+    user_id = session['user_id']
+    last_id = request.headers.get('Last-Event-ID', type=int)
+    if last_id is None:
+        last_id = request.args.get('last_id', type=int)
+    if last_id is None:
+        last_id = latest_notification_id(user_id)
+
+    stream = stream_notifications(
+        user_id, last_id,
+        heartbeat=app.config.get('NOTIFICATION_STREAM_HEARTBEAT', 15),
+        max_age=app.config.get('NOTIFICATION_STREAM_MAX_AGE', 300),
+    )
+    response = Response(stream_with_context(stream), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Let nginx pass events through unbuffered
+    return response
+
+def metrics_allowed():
+    if 'user_id' in session and session.get('user_type') == 'admin':
+        return True
+    token = app.config.get('METRICS_TOKEN')
+    if token and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return True
+    return metrics.ip_allowed(request.remote_addr, app.config.get('METRICS_ALLOWED_IPS', ''))
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus scrape target for admins, METRICS_TOKEN holders and METRICS_ALLOWED_IPS."""
+    if not app.config.get('METRICS_ENABLED', True):
+        abort(404)
+    if not metrics_allowed():
+        abort(403)
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/api/admin/perf')
+def admin_perf():
+    """Rolling per-endpoint latency percentiles from the instrumentation layer."""
+    if 'user_id' not in session or session.get('user_type') != 'admin':
+        abort(403)
+    return jsonify(perf.report())
+
+def admin_listing(schema, build=lambda stmt: stmt):
+    """
+    JSON list of schema rows, restricted to ?fields=a,b when given;
+    build(stmt) adds the endpoint's filters and ordering to the select.
+    """
+    try:
+        names = schema.parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return json_response(schema.dump(build(schema.select(names)), names))
 
 @app.route('/api/admin/sections', methods=['GET', 'POST'])
 def manage_sections():
     try:
         if request.method == 'GET':
-            sections = SectionVisibility.query.all()
-            return jsonify([s.to_dict() for s in sections])
+            return admin_listing(serializers.SECTIONS)
 
         if request.method == 'POST':
             data = request.get_json()
             if not data:
                 return jsonify({'success': False, 'message': 'No data provided'}), 400
 
-            for section_data in data:
-                section = SectionVisibility.query.filter_by(section_name=section_data['section_name']).first()
-                if section:
-                    section.visible = section_data['visible']
-            db.session.commit()
+            site_settings.update_sections({
+                section_data['section_name']: bool(section_data['visible']) for section_data in data})
             return jsonify({'success': True, 'message': 'Section visibility updated.'})
     except Exception as e:
         app.logger.exception("manage_sections error")
@@ -750,8 +1174,7 @@ def manage_sections():
 def manage_products():
     try:
         if request.method == 'GET':
-            products = Product.query.all()
-            return jsonify([p.to_dict() for p in products])
+            return admin_listing(serializers.PRODUCTS)
 
         if request.method == 'POST':
             name = request.form.get('name')
@@ -774,6 +1197,7 @@ def manage_products():
             )
             db.session.add(new_product)
             db.session.commit()
+            product_cache.invalidate()
             return jsonify({'success': True, 'message': 'Product added successfully.'})
 
         if request.method == 'PUT':
@@ -787,16 +1211,14 @@ def manage_products():
                 product.visible = request.form.get('visible') == 'true'
 
                 if 'image' in request.files and request.files['image'].filename:
-                    # Delete old image if exists
-                    if product.image:
-                        old_image = os.path.join(app.config['UPLOAD_FOLDER'], 'products', product.image)
-                        if os.path.exists(old_image):
-                            os.remove(old_image)
+                    # Delete old image in the background
+                    delete_upload_later('products', product.image)
 
                     # Save new image
                     product.image = save_image(request.files['image'], 'products')
 
                 db.session.commit()
+                product_cache.invalidate()
                 return jsonify({'success': True, 'message': 'Product updated successfully.'})
             return jsonify({'success': False, 'message': 'Product not found.'}), 404
 
@@ -808,14 +1230,12 @@ def manage_products():
             product_id = data.get('id')
             product = Product.query.get(product_id)
             if product:
-                # Delete associated image
-                if product.image:
-                    image_path = os.path.join(app.config['UPLOAD_FOLDER'], 'products', product.image)
-                    if os.path.exists(image_path):
-                        os.remove(image_path)
+                # Delete associated image in the background
+                delete_upload_later('products', product.image)
 
                 db.session.delete(product)
                 db.session.commit()
+                product_cache.invalidate()
                 return jsonify({'success': True, 'message': 'Product deleted successfully.'})
             return jsonify({'success': False, 'message': 'Product not found.'}), 404
     except Exception as e:
@@ -829,8 +1249,7 @@ def admin_orders():
     
     try:
         if request.method == 'GET':
-            orders = Order.query.order_by(Order.created_at.desc()).all()
-            return jsonify([order.to_dict() for order in orders])
+            return admin_listing(serializers.ORDERS, lambda stmt: stmt.order_by(Order.created_at.desc()))
             
         if request.method == 'PUT':
             data = request.get_json()
@@ -843,16 +1262,13 @@ def admin_orders():
             order = Order.query.get(order_id)
             if order:
                 order.status = status
-                db.session.commit()
                 
-                # Create notification for user
-                notification = Notification(
-                    user_id=order.user_id,
-                    message=f"Your order #{order_id} status has been updated to: {status}",
-                    notification_type="order",
-                    related_id=order_id
-                )
-                db.session.add(notification)
+                # Notify the customer in the background
+                enqueue('notify_user',
+                        user_id=order.user_id,
+                        message=f"Your order #{order_id} status has been updated to: {status}",
+                        notification_type="order",
+                        related_id=order.id)
                 db.session.commit()
                 
                 return jsonify({'success': True, 'message': 'Order status updated successfully'})
@@ -868,12 +1284,49 @@ def admin_payments():
         abort(403)
     
     try:
-        payments = Payment.query.order_by(Payment.created_at.desc()).all()
-        return jsonify([payment.to_dict() for payment in payments])
+        return admin_listing(serializers.PAYMENTS, lambda stmt: stmt.order_by(Payment.created_at.desc()))
     except Exception as e:
         app.logger.exception("Error retrieving payments: %s", e)
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/admin/jobs', methods=['GET', 'POST'])
+def admin_jobs():
+    """List background jobs (?status=dead for the dead-letter store) or requeue dead ones."""
+    if 'user_id' not in session or session.get('user_type') != 'admin':
+        abort(403)
+
+    if request.method == 'GET':
+        status = request.args.get('status', 'dead')
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        return admin_listing(serializers.JOBS,
+                             lambda stmt: stmt.where(Job.status == status).order_by(Job.id.desc()).limit(limit))
+
+    data = request.get_json(silent=True) or {}
+    try:
+        job_ids = [int(i) for i in data.get('requeue', [])]
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'Invalid job ids'}), 400
+    requeued = requeue_dead(job_ids)
+    db.session.commit()
+    return jsonify({'success': True, 'requeued': requeued})
+
+# -------------------------
+# Static files: the minified, precompressed copy from build_assets.py while it is current
+# -------------------------
+def static_file(filename):
+    path = dist_path(app.static_folder, filename) or safe_join(app.static_folder, filename)
+    if path is None:
+        abort(404)
+    max_age = app.get_send_file_max_age(filename)
+    # Always served in-process: MEDIA_OFFLOAD locations point at UPLOAD_FOLDER
+    response = send_media(path, filename, offload='',
+                          cache_control=f'public, max-age={max_age}' if max_age else None)
+    if response is None:
+        abort(404)
+    return response
+
+app.view_functions['static'] = static_file
+
 # -------------------------
 # Serve uploaded files
 # -------------------------
@@ -883,9 +1336,28 @@ def uploaded_file(filename):
     if not filename:
         return jsonify({'success': False, 'message': 'Filename required'}), 400
 
-    # send_from_directory handles subpaths in filename safely
-    upload_dir = app.config.get('UPLOAD_FOLDER', 'static/uploads')
-    return send_from_directory(upload_dir, filename)
+    # /uploads/<folder>/<hash>.<ext> -> blobs/ab/<hash>.<ext>; content never changes
+    name = os.path.basename(filename)
+    immutable = blobstore.is_blob_name(name)
+    key = blobstore.blob_key(name) if immutable else filename
+
+    # Object storage: redirect so the bytes never pass through a Python worker
+    url = storage.url(key, cache_control=IMMUTABLE_CACHE_CONTROL if immutable else None)
+    if url:
+        response = redirect(url, 302)
+        response.headers['Cache-Control'] = f"private, max-age={app.config.get('S3_REDIRECT_MAX_AGE', 300)}"
+        return response
+
+    try:
+        path = storage.path(key)  # rejects paths outside UPLOAD_FOLDER
+    except ValueError:
+        abort(404)
+    response = send_media(path, key,
+                          etag=name.rsplit('.', 1)[0] if immutable else None,
+                          cache_control=IMMUTABLE_CACHE_CONTROL if immutable else None)
+    if response is None:
+        abort(404)
+    return response
 
 # -------------------------
 # Error handlers
@@ -910,7 +1382,7 @@ def internal_error(error):
 @app.route('/debug-products')
 def debug_products():
     products = Product.query.filter_by(visible=True).all()
-    sections = {s.section_name: s.visible for s in SectionVisibility.query.all()}
+    sections = site_settings.sections()
 
     # Return raw HTML without any CSS/JS
     return f"""
@@ -931,6 +1403,27 @@ def get_cart_count():
     count = CartItem.query.filter_by(user_id=session['user_id']).count()
     return jsonify({'count': count})
 
+@app.route('/api/me/summary')
+def me_summary():
+    """
+    Login state and header badge counts in one request; the cacheable
+    public pages fill in their navbar from it. Clients revalidate with
+    If-None-Match, so an unchanged summary costs a cache lookup and a 304.
+    """
+    user_id = session.get('user_id')
+    if user_id:
+        summary, etag = build_user_summary(user_id)
+    else:
+        summary = {'authenticated': False, 'username': None, 'is_admin': False,
+                   'cart_count': 0, 'wishlist_count': 0, 'unread_notifications': 0}
+        etag = 'anonymous'
+
+    response = jsonify(summary)
+    response.set_etag(etag, weak=True)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
 @app.route('/api/admin/stats')
 def admin_stats():
     if 'user_id' not in session or session.get('user_type') != 'admin':
@@ -959,12 +1452,40 @@ def admin_messages():
         abort(403)
 
     if request.method == 'GET':
-        limit = request.args.get('limit', type=int)
-        messages_query = Message.query.order_by(Message.created_at.desc())
-        if limit:
-            messages_query = messages_query.limit(limit)
-        messages = messages_query.all()
-        return jsonify([m.to_dict() for m in messages])
+        # Unread first, then newest first; pages continue from ?cursor=<read>:<id>
+        # and the next cursor is returned in the X-Next-Cursor header.
+        limit = max(1, min(request.args.get('limit', 50, type=int), 200))
+        try:
+            names = serializers.MESSAGES.parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        messages_query = serializers.MESSAGES.select(names, extra=('id', 'read')).where(
+            Message.is_spam.is_(request.args.get('spam') in ('1', 'true')))
+
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                cursor_read, cursor_id = cursor.split(':')
+                cursor_read, cursor_id = cursor_read == '1', int(cursor_id)
+            except ValueError:
+                return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+            if cursor_read:
+                messages_query = messages_query.where(Message.read.is_(True), Message.id < cursor_id)
+            else:
+                messages_query = messages_query.where(db.or_(
+                    Message.read.is_(True),
+                    db.and_(Message.read.is_(False), Message.id < cursor_id)))
+
+        messages = serializers.MESSAGES.rows(
+            messages_query.order_by(Message.read.asc(), Message.id.desc()).limit(limit + 1), names)
+        next_cursor = None
+        if len(messages) > limit:
+            last = messages[limit - 1]
+            next_cursor = f"{int(bool(last['read']))}:{last['id']}"
+        response = json_response(serializers.MESSAGES.trim(messages[:limit], names))
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
 
     if request.method == 'DELETE':
         data = request.get_json()
@@ -982,8 +1503,7 @@ def admin_subscribers():
     if 'user_id' not in session or session.get('user_type') != 'admin':
         abort(403)
     if request.method == 'GET':
-        subscribers = Subscriber.query.order_by(Subscriber.created_at.desc()).all()
-        return jsonify([s.to_dict() for s in subscribers])
+        return admin_listing(serializers.SUBSCRIBERS, lambda stmt: stmt.order_by(Subscriber.created_at.desc()))
     if request.method == 'DELETE':
         data = request.get_json()
         if not data or 'id' not in data:
@@ -995,14 +1515,22 @@ def admin_subscribers():
             return jsonify({'success': True, 'message': 'Subscriber deleted'})
         return jsonify({'success': False, 'message': 'Subscriber not found'}), 404
 
+@app.route('/api/admin/subscribers/export')
+def export_subscribers():
+    """Stream the whole subscriber list as CSV."""
+    if 'user_id' not in session or session.get('user_type') != 'admin':
+        abort(403)
+    response = Response(stream_with_context(export_subscribers_csv()), mimetype='text/csv')
+    response.headers['Content-Disposition'] = 'attachment; filename=subscribers.csv'
+    return response
+
 @app.route('/api/admin/videos', methods=['GET', 'POST', 'PUT', 'DELETE'])
 def admin_videos():
     if 'user_id' not in session or session.get('user_type') != 'admin':
         abort(403)
 
     if request.method == 'GET':
-        videos = Video.query.order_by(Video.created_at.desc()).all()
-        return jsonify([v.to_dict() for v in videos])
+        return admin_listing(serializers.VIDEOS, lambda stmt: stmt.order_by(Video.created_at.desc()))
 
     if request.method in ['POST', 'PUT']:
         vid_id = request.form.get('id')
@@ -1026,10 +1554,8 @@ def admin_videos():
             video.description = description
             video.video_url = video_url
             if thumbnail_filename:
-                # Delete old thumbnail if exists
-                old_thumb_path = os.path.join(app.config['UPLOAD_FOLDER'], 'videos', video.thumbnail) if video.thumbnail else None
-                if old_thumb_path and os.path.exists(old_thumb_path):
-                    os.remove(old_thumb_path)
+                # Delete old thumbnail in the background
+                delete_upload_later('videos', video.thumbnail)
                 video.thumbnail = thumbnail_filename
         db.session.commit()
         return jsonify({'success': True, 'message': 'Video saved successfully'})
@@ -1040,10 +1566,7 @@ def admin_videos():
             return jsonify({'success': False, 'message': 'ID required'}), 400
         video = Video.query.get(data['id'])
         if video:
-            if video.thumbnail:
-                thumb_path = os.path.join(app.config['UPLOAD_FOLDER'], 'videos', video.thumbnail)
-                if os.path.exists(thumb_path):
-                    os.remove(thumb_path)
+            delete_upload_later('videos', video.thumbnail)
             db.session.delete(video)
             db.session.commit()
             return jsonify({'success': True, 'message': 'Video deleted'})
@@ -1059,10 +1582,7 @@ def admin_giveaway():
 
     if request.method == 'GET':
         if current:
-            data = current.to_dict()
-            # Add participants count if you have participants table logic
-            data['participants_count'] = 0
-            return jsonify(data)
+            return jsonify(current.to_dict())
         return jsonify({})
 
     if request.method == 'POST':
@@ -1078,9 +1598,7 @@ def admin_giveaway():
             current.title = title
             current.description = description
             if image_filename:
-                old_img_path = os.path.join(app.config['UPLOAD_FOLDER'], 'giveaway', current.image)
-                if current.image and os.path.exists(old_img_path):
-                    os.remove(old_img_path)
+                delete_upload_later('giveaway', current.image)
                 current.image = image_filename
         else:
             # Create new giveaway
@@ -1088,22 +1606,46 @@ def admin_giveaway():
             db.session.add(current)
 
         db.session.commit()
+        active_giveaway_cache.clear()
         return jsonify({'success': True, 'message': 'Giveaway updated successfully'})
 
     if request.method == 'DELETE':
         if current:
-            if current.image:
-                img_path = os.path.join(app.config['UPLOAD_FOLDER'], 'giveaway', current.image)
-                if os.path.exists(img_path):
-                    os.remove(img_path)
+            delete_upload_later('giveaway', current.image)
+            GiveawayEntry.query.filter_by(giveaway_id=current.id).delete(synchronize_session=False)
             db.session.delete(current)
             db.session.commit()
+            active_giveaway_cache.clear()
             return jsonify({'success': True, 'message': 'Giveaway deleted'})
         return jsonify({'success': False, 'message': 'No giveaway to delete'}), 404
 
+@app.route('/api/admin/giveaway/draw', methods=['POST'])
+def draw_giveaway_winners():
+    """Pick random winners from the current giveaway's entries."""
+    if 'user_id' not in session or session.get('user_type') != 'admin':
+        abort(403)
+
+    current = Giveaway.query.first()
+    if not current:
+        return jsonify({'success': False, 'message': 'No giveaway found'}), 404
+
+    data = request.get_json(silent=True) or {}
+    try:
+        count = max(1, min(int(data.get('count', 1)), 100))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'Invalid winner count'}), 400
+
+    giveaway_entries.flush()
+    winners = draw_winners(current.id, count)
+    return jsonify({'success': True, 'winners': winners, 'participants_count': current.participants_count})
+
+# Compile templates and render the main pages once before serving traffic
+if app.config.get('TEMPLATE_WARMUP', True):
+    template_cache.warm_up(app)
+
 if __name__ == '__main__':
     # Ensure secret key is set (from Config)
     if not app.config.get('SECRET_KEY'):
         app.config['SECRET_KEY'] = os.urandom(24)
 
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=True, host='0.0.0.0', port=5000)
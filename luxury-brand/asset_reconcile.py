@@ -0,0 +1,253 @@
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from blobstore import blob_key, is_blob_name
+from database import db, Product, Video, Giveaway, Testimonial, UploadBlob
+from storage import FilesystemStorage
+
+# (model, column, upload subfolder) for every column that names an uploaded file
+REFERENCES = [
+    (Product, 'image', 'products'),
+    (Video, 'thumbnail', 'videos'),
+    (Giveaway, 'image', 'giveaway'),
+    (Testimonial, 'image', 'testimonials'),
+]
+
+MANIFEST_VERSION = 1
+
+
+def referenced_paths():
+    """
+    Map each referenced upload path to the rows that use it, reading only
+    (id, column) with one query per table. Content-addressed names map to
+    "blobs/ab/<name>", legacy names to "<folder>/<name>". External URLs
+    are skipped.
+    """
+    refs = defaultdict(list)
+    for model, column_name, folder in REFERENCES:
+        column = getattr(model, column_name)
+        rows = (db.session.query(model.id, column)
+                .filter(column.isnot(None), column != '', ~column.like('http%')))
+        for row_id, filename in rows:
+            path = blob_key(filename) if is_blob_name(filename) else f'{folder}/{filename}'
+            refs[path].append((model.__tablename__, column_name, row_id))
+    return refs
+
+
+def is_referenced(folder, filename):
+    """Whether any row still names this legacy (per-folder) upload."""
+    for model, column_name, model_folder in REFERENCES:
+        if model_folder == folder:
+            column = getattr(model, column_name)
+            if db.session.query(model.query.filter(column == filename).exists()).scalar():
+                return True
+    return False
+
+
+def refcount_drift(refs):
+    """Blobs whose stored refcount differs from the number of referencing rows."""
+    expected = {os.path.basename(path): len(users) for path, users in refs.items()
+                if is_blob_name(os.path.basename(path))}
+    actual = dict(db.session.query(UploadBlob.name, UploadBlob.refcount))
+    return [{'name': name, 'expected': expected.get(name, 0), 'actual': actual.get(name)}
+            for name in sorted(set(expected) | set(actual))
+            if expected.get(name, 0) != actual.get(name)]
+
+
+# -------------------------
+# Upload tree scan
+# -------------------------
+def _scan_dir(root, rel_dir):
+    """List one directory: ({relpath: (size, mtime_ns)}, [subdirs], dir mtime_ns)."""
+    files, subdirs = {}, []
+    path = os.path.join(root, rel_dir) if rel_dir else root
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            rel = f'{rel_dir}/{entry.name}' if rel_dir else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(rel)
+            elif entry.is_file(follow_symlinks=False):
+                stat = entry.stat(follow_symlinks=False)
+                files[rel] = (stat.st_size, stat.st_mtime_ns)
+    return files, subdirs, os.stat(path).st_mtime_ns
+
+
+def scan_tree(root, workers=8, previous=None):
+    """
+    Walk the upload tree with os.scandir, one directory per task on a thread
+    pool. With a previous manifest, directories whose mtime is unchanged
+    (no files added, removed or renamed) reuse the recorded listing instead
+    of statting every entry; uploads are written once, so this is safe for
+    nightly runs. Returns ({relpath: (size, mtime_ns)}, {rel_dir: mtime_ns}).
+    """
+    previous = previous or {'dirs': {}, 'files': {}}
+    previous_by_dir = defaultdict(dict)
+    for rel, info in previous['files'].items():
+        previous_by_dir[os.path.dirname(rel)][rel] = (info['size'], info['mtime_ns'])
+
+    files, dirs = {}, {}
+    if not os.path.isdir(root):
+        return files, dirs
+
+    def visit(rel_dir):
+        path = os.path.join(root, rel_dir) if rel_dir else root
+        mtime = os.stat(path).st_mtime_ns
+        if previous['dirs'].get(rel_dir) == mtime:
+            subdirs = [d for d in previous['dirs'] if os.path.dirname(d) == rel_dir and d != rel_dir]
+            return previous_by_dir.get(rel_dir, {}), subdirs, mtime
+        return _scan_dir(root, rel_dir)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {'': pool.submit(visit, '')}
+        while pending:
+            rel_dir, future = pending.popitem()
+            listing, subdirs, mtime = future.result()
+            files.update(listing)
+            dirs[rel_dir] = mtime
+            for subdir in subdirs:
+                pending[subdir] = pool.submit(visit, subdir)
+    return files, dirs
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# -------------------------
+# Manifest
+# -------------------------
+def load_manifest(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'version': MANIFEST_VERSION, 'dirs': {}, 'files': {}}
+
+
+def save_manifest(path, manifest):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path)
+
+
+# -------------------------
+# Reconciliation
+# -------------------------
+def reconcile(storage, manifest_path=None, workers=8, full=False, hash_files=True,
+              repair=False, delete_orphans=False, orphan_grace=3600):
+    """
+    Compare referenced upload paths against the stored files.
+
+    Reports rows pointing at missing files, files no row references
+    (orphans), blob refcounts that disagree with the rows and, when
+    hashing, groups of files with identical content. Only new or changed
+    files are hashed; the rest come from the manifest. With `repair`,
+    missing references are cleared with one UPDATE per table and blob
+    refcounts are reset to the recounted values (caller commits). With
+    `delete_orphans`, orphans older than `orphan_grace` seconds are
+    removed, so uploads whose row is not committed yet are left alone.
+
+    Object storage is listed instead of scanned and is not hashed or
+    tracked in the manifest; blob names already are content hashes.
+    """
+    refs = referenced_paths()
+    if isinstance(storage, FilesystemStorage):
+        upload_root = storage.root
+        previous = load_manifest(manifest_path) if manifest_path and not full else None
+        files, dirs = scan_tree(upload_root, workers=workers, previous=previous)
+    else:
+        upload_root = previous = manifest_path = None
+        hash_files = False
+        files, dirs = storage.list_files(), {}
+
+    old_files = previous['files'] if previous else {}
+    hashes, to_hash = {}, []
+    for rel, (size, mtime_ns) in files.items():
+        old = old_files.get(rel)
+        if old and old['size'] == size and old['mtime_ns'] == mtime_ns and old.get('sha256'):
+            hashes[rel] = old['sha256']
+        elif hash_files:
+            to_hash.append(rel)
+    if to_hash:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for rel, digest in zip(to_hash, pool.map(lambda r: _sha256(os.path.join(upload_root, r)), to_hash)):
+                hashes[rel] = digest
+
+    missing = [{'path': rel, 'table': table, 'column': column, 'id': row_id}
+               for rel, users in refs.items() if rel not in files
+               for table, column, row_id in users]
+    orphans = sorted(rel for rel in files if rel not in refs)
+
+    by_hash = defaultdict(list)
+    for rel, digest in hashes.items():
+        by_hash[digest].append(rel)
+    duplicates = [sorted(paths) for paths in by_hash.values() if len(paths) > 1]
+
+    report = {
+        'files': len(files),
+        'references': sum(len(users) for users in refs.values()),
+        'hashed': len(to_hash),
+        'missing': missing,
+        'orphans': orphans,
+        'duplicates': duplicates,
+        'refcount_drift': [],
+        'repaired': 0,
+        'deleted': [],
+    }
+
+    if repair and missing:
+        models = {model.__tablename__: model for model, _, _ in REFERENCES}
+        by_column = defaultdict(set)
+        for item in missing:
+            by_column[(item['table'], item['column'])].add(item['id'])
+        for (table, column), ids in by_column.items():
+            model = models[table]
+            report['repaired'] += (model.query.filter(model.id.in_(ids))
+                                   .update({getattr(model, column): None}, synchronize_session=False))
+        for item in missing:
+            refs.pop(item['path'], None)
+
+    report['refcount_drift'] = refcount_drift(refs)
+    if repair:
+        for item in report['refcount_drift']:
+            if item['actual'] is None:
+                size = files[blob_key(item['name'])][0]
+                db.session.add(UploadBlob(name=item['name'], size=size, refcount=item['expected']))
+            else:
+                UploadBlob.query.filter_by(name=item['name']).update(
+                    {UploadBlob.refcount: item['expected']}, synchronize_session=False)
+
+    if delete_orphans:
+        cutoff = time.time_ns() - int(orphan_grace * 1e9)
+        for rel in orphans:
+            if files[rel][1] <= cutoff:
+                storage.delete(rel)
+                report['deleted'].append(rel)
+                files.pop(rel)
+                if is_blob_name(os.path.basename(rel)):
+                    UploadBlob.query.filter_by(name=os.path.basename(rel), refcount=0).delete(
+                        synchronize_session=False)
+
+    if manifest_path:
+        save_manifest(manifest_path, {
+            'version': MANIFEST_VERSION,
+            'dirs': dirs,
+            'files': {rel: {'size': size, 'mtime_ns': mtime_ns, 'sha256': hashes.get(rel)}
+                      for rel, (size, mtime_ns) in files.items()},
+        })
+    return report
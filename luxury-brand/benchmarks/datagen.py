@@ -0,0 +1,136 @@
+# benchmarks/datagen.py
+# Synthetic data at configurable scale, written with multi-row bulk inserts.
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+from database import (
+    db, User, Product, Order, OrderItem, Notification, Subscriber, Message, CartItem,
+)
+
+BENCH_PASSWORD = 'benchpass'
+
+SCALES = {
+    'small': {'users': 100, 'products': 200, 'orders': 1000, 'notifications': 5000,
+              'subscribers': 5000, 'messages': 500},
+    'medium': {'users': 1000, 'products': 2000, 'orders': 10000, 'notifications': 50000,
+               'subscribers': 50000, 'messages': 5000},
+    'large': {'users': 10000, 'products': 20000, 'orders': 100000, 'notifications': 500000,
+              'subscribers': 500000, 'messages': 50000},
+}
+
+ADJECTIVES = ['Classic', 'Signature', 'Heritage', 'Limited', 'Royal', 'Midnight', 'Golden', 'Silk']
+NOUNS = ['Watch', 'Handbag', 'Scarf', 'Fragrance', 'Wallet', 'Sunglasses', 'Bracelet', 'Loafers']
+
+
+def _next_id(model):
+    return (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+
+
+def _bulk(model, rows, chunk_size):
+    for start in range(0, len(rows), chunk_size):
+        db.session.execute(insert(model.__table__), rows[start:start + chunk_size])
+
+
+def generate(users=0, products=0, orders=0, notifications=0, subscribers=0, messages=0,
+             seed=1234, chunk_size=5000):
+    """
+    Insert the requested number of rows per table in one transaction and
+    return the ids the benchmark scenarios need. Bench users are called
+    bench_user_<n> and share BENCH_PASSWORD; the password is hashed once.
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    def past(days=365):
+        return now - timedelta(seconds=rng.randrange(days * 86400))
+
+    password_hash = generate_password_hash(BENCH_PASSWORD)
+    first_user = _next_id(User)
+    user_rows = [{
+        'id': first_user + i,
+        'username': f'bench_user_{first_user + i}',
+        'email': f'bench_user_{first_user + i}@example.com',
+        'password_hash': password_hash,
+        'user_type': 'customer',
+        'created_at': past(),
+    } for i in range(users)]
+    _bulk(User, user_rows, chunk_size)
+    user_ids = [row['id'] for row in user_rows]
+
+    first_product = _next_id(Product)
+    product_rows = [{
+        'id': first_product + i,
+        'name': f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {first_product + i}',
+        'description': 'Synthetic benchmark product.',
+        'details': 'Generated by benchmarks/datagen.py',
+        'price': round(rng.uniform(20, 2000), 2),
+        'created_at': past(),
+        'updated_at': now,
+        'visible': True,
+    } for i in range(products)]
+    _bulk(Product, product_rows, chunk_size)
+    product_ids = [row['id'] for row in product_rows]
+    prices = {row['id']: row['price'] for row in product_rows}
+
+    if orders and user_ids and product_ids:
+        first_order = _next_id(Order)
+        order_rows, item_rows = [], []
+        for i in range(orders):
+            order_id = first_order + i
+            created = past()
+            total = 0.0
+            for product_id in rng.sample(product_ids, min(len(product_ids), rng.randint(1, 4))):
+                quantity = rng.randint(1, 3)
+                total += prices[product_id] * quantity
+                item_rows.append({'order_id': order_id, 'product_id': product_id,
+                                  'quantity': quantity, 'price': prices[product_id]})
+            order_rows.append({
+                'id': order_id,
+                'user_id': rng.choice(user_ids),
+                'status': rng.choice(['pending', 'processing', 'completed', 'cancelled']),
+                'payment_method': rng.choice(['stripe', 'paypal', 'cod']),
+                'total_amount': round(total, 2),
+                'payment_status': rng.choice(['pending', 'paid']),
+                'shipping_address': f'{rng.randint(1, 999)} Bench Street',
+                'created_at': created,
+                'updated_at': created,
+            })
+        _bulk(Order, order_rows, chunk_size)
+        _bulk(OrderItem, item_rows, chunk_size)
+
+    recipients = user_ids + [user.id for user in User.query.filter_by(user_type='admin')]
+    if notifications and recipients:
+        _bulk(Notification, [{
+            'user_id': rng.choice(recipients),
+            'message': f'Synthetic notification {i}',
+            'is_read': rng.random() < 0.7,
+            'notification_type': rng.choice(['order', 'payment', 'system']),
+            'created_at': past(120),
+        } for i in range(notifications)], chunk_size)
+
+    first_subscriber = _next_id(Subscriber)
+    _bulk(Subscriber, [{
+        'email': f'subscriber{first_subscriber + i}@example.com',
+        'created_at': past(),
+    } for i in range(subscribers)], chunk_size)
+
+    _bulk(Message, [{
+        'name': f'Visitor {i}',
+        'email': f'visitor{i}@example.com',
+        'message': 'Synthetic benchmark enquiry about availability and sizing.',
+        'created_at': past(90),
+        'read': rng.random() < 0.5,
+        'is_spam': rng.random() < 0.1,
+    } for i in range(messages)], chunk_size)
+
+    db.session.commit()
+    return {'user_ids': user_ids, 'product_ids': product_ids}
+
+
+def clear_carts(user_ids):
+    """Remove cart rows left by an earlier scenario for these users."""
+    CartItem.query.filter(CartItem.user_id.in_(user_ids)).delete(synchronize_session=False)
+    db.session.commit()
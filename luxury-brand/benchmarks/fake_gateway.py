@@ -0,0 +1,82 @@
+# benchmarks/fake_gateway.py
+# Stand-in for the Stripe PaymentIntent API so checkout can be benchmarked offline.
+import asyncio
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import stripe
+
+
+class FakeStripe:
+    """
+    Replaces stripe.PaymentIntent.create/retrieve with in-memory versions
+    that sleep for `latency` seconds, to model gateway round trips.
+    Created intents are reported as succeeded on retrieve. With async_api
+    they also get create_async/retrieve_async twins that wait with
+    asyncio.sleep, as an SDK with an async HTTP client would.
+    """
+
+    def __init__(self, latency=0.0, async_api=False):
+        self.latency = latency
+        self.calls = 0
+        self._ids = itertools.count(1)
+        self._intents = {}
+        self._lock = threading.Lock()
+        if async_api:
+            self.create_async = self._create_async
+            self.retrieve_async = self._retrieve_async
+
+    def create(self, amount, currency, metadata=None, **kwargs):
+        time.sleep(self.latency)
+        return self._create(amount, currency, metadata)
+
+    async def _create_async(self, amount, currency, metadata=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return self._create(amount, currency, metadata)
+
+    def _create(self, amount, currency, metadata):
+        with self._lock:
+            self.calls += 1
+            intent_id = f'pi_bench_{next(self._ids)}'
+            intent = SimpleNamespace(id=intent_id, client_secret=f'{intent_id}_secret',
+                                     amount=amount, currency=currency, metadata=metadata or {},
+                                     status='requires_payment_method')
+            self._intents[intent_id] = intent
+        return intent
+
+    def retrieve(self, intent_id, **kwargs):
+        time.sleep(self.latency)
+        return self._retrieve(intent_id)
+
+    async def _retrieve_async(self, intent_id, **kwargs):
+        await asyncio.sleep(self.latency)
+        return self._retrieve(intent_id)
+
+    def _retrieve(self, intent_id):
+        with self._lock:
+            self.calls += 1
+            intent = self._intents.get(intent_id)
+        if intent is None:
+            raise stripe.error.InvalidRequestError(f'No such payment_intent: {intent_id}', 'id')
+        intent.status = 'succeeded'
+        return intent
+
+
+@contextmanager
+def fake_stripe(latency=0.0, async_api=False):
+    fake = FakeStripe(latency, async_api)
+    # Save the class's own attributes (not the bound methods) so restoring is exact
+    originals = {name: vars(stripe.PaymentIntent).get(name) for name in ('create', 'retrieve')}
+    stripe.PaymentIntent.create = fake.create
+    stripe.PaymentIntent.retrieve = fake.retrieve
+    try:
+        yield fake
+    finally:
+        for name, original in originals.items():
+            if original is None:
+                delattr(stripe.PaymentIntent, name)
+            else:
+                setattr(stripe.PaymentIntent, name, original)
@@ -0,0 +1,183 @@
+# benchmarks/gateway.py
+# Stripe payments (create-payment-intent then confirm-stripe-payment, two
+# gateway round trips each) against the slow fake gateway, served three ways:
+#
+#   wsgi          the Flask views in a worker with --threads request threads
+#   asgi_threads  gateway_asgi with the blocking SDK calls on its gateway pool
+#   asgi_async    gateway_asgi with the SDK's async twins awaited on the loop
+#
+# The ASGI modes get the same --threads as their bounded DB pool. Requests go
+# in-process (test client / direct ASGI calls), so no HTTP server is measured.
+#
+#   python -m benchmarks.gateway --latency 0.2 --payments 200 --concurrency 50 -o gateway.json
+#
+# Run from the luxury-brand directory.
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from benchmarks.run import summarize
+
+
+def asgi_request(application, method, path, json_body=None):
+    """Call an ASGI app directly; returns (status, body)."""
+    body = json.dumps(json_body).encode() if json_body is not None else b''
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'localhost'), (b'content-type', b'application/json')],
+        'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+    }
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    async def call():
+        await application(scope, receive, send)
+        return sent[0]['status'], b''.join(m.get('body', b'') for m in sent[1:])
+    return call()
+
+
+def pay_wsgi(client, order_id):
+    response = client.post('/api/create-payment-intent', json={'order_id': order_id})
+    if response.status_code != 200:
+        return f'create-payment-intent returned {response.status_code}'
+    intent_id = response.get_json()['payment_intent_id']
+    response = client.post('/api/confirm-stripe-payment',
+                           json={'order_id': order_id, 'payment_intent_id': intent_id})
+    return None if response.status_code == 200 else f'confirm-stripe-payment returned {response.status_code}'
+
+
+async def pay_asgi(application, order_id):
+    status, body = await asgi_request(application, 'POST', '/api/create-payment-intent', {'order_id': order_id})
+    if status != 200:
+        return f'create-payment-intent returned {status}'
+    intent_id = json.loads(body)['payment_intent_id']
+    status, _ = await asgi_request(application, 'POST', '/api/confirm-stripe-payment',
+                                   {'order_id': order_id, 'payment_intent_id': intent_id})
+    return None if status == 200 else f'confirm-stripe-payment returned {status}'
+
+
+def run_wsgi(app, order_ids, threads, concurrency):
+    """`concurrency` clients sharing a worker that serves `threads` requests at a time."""
+    slots = threading.BoundedSemaphore(threads)
+    latencies, errors = [], []
+    local = threading.local()
+
+    def pay(order_id):
+        client = getattr(local, 'client', None) or app.test_client()
+        local.client = client
+        started = time.perf_counter()
+        with slots:
+            error = pay_wsgi(client, order_id)
+        latencies.append(time.perf_counter() - started)
+        if error:
+            errors.append(error)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as clients:
+        list(clients.map(pay, order_ids))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def run_asgi(application, order_ids, concurrency):
+    async def main():
+        clients = asyncio.Semaphore(concurrency)
+        latencies, errors = [], []
+
+        async def pay(order_id):
+            async with clients:
+                started = time.perf_counter()
+                error = await pay_asgi(application, order_id)
+                latencies.append(time.perf_counter() - started)
+                if error:
+                    errors.append(error)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(pay(order_id) for order_id in order_ids))
+        return summarize(latencies, errors, time.perf_counter() - started)
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gateway-bound payment routes: WSGI threads vs the ASGI sidecar.")
+    parser.add_argument('--latency', type=float, default=0.2, help="fake Stripe round trip in seconds")
+    parser.add_argument('--payments', type=int, default=200, help="payments per mode")
+    parser.add_argument('--concurrency', type=int, default=50, help="clients paying at once")
+    parser.add_argument('--threads', type=int, default=4, help="WSGI request threads / sidecar DB threads")
+    parser.add_argument('--gateway-threads', type=int, default=64, help="sidecar threads for blocking SDK calls")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('-o', '--output', default='-', help="JSON results file, or - for stdout")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='luxury-gateway-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'gateway.db')}"
+    # Queued record_payment/notify_user jobs are left unprocessed
+    os.environ['JOB_WORKER_ENABLED'] = 'false'
+    # All clients come from 127.0.0.1; the payment routes are measured unthrottled
+    os.environ['RATELIMIT_ENABLED'] = 'false'
+    with contextlib.redirect_stdout(sys.stderr):
+        from app import app
+        from gateway_asgi import GatewayASGI
+    from benchmarks.datagen import generate
+    from benchmarks.fake_gateway import fake_stripe
+    from database import Order
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    modes = ('wsgi', 'asgi_threads', 'asgi_async')
+    with app.app_context():
+        generate(seed=args.seed, users=10, products=10, orders=args.payments * len(modes))
+        order_ids = [order_id for (order_id,) in Order.query.with_entities(Order.id).order_by(Order.id)]
+
+    results = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'gateway_latency_s': args.latency,
+            'payments': args.payments,
+            'gateway_calls_per_payment': 2,
+            'concurrency': args.concurrency,
+            'threads': args.threads,
+            'gateway_threads': args.gateway_threads,
+        },
+        'results': {},
+    }
+    for index, mode in enumerate(modes):
+        ids = order_ids[index * args.payments:(index + 1) * args.payments]
+        print(f"Running {mode}", file=sys.stderr)
+        with fake_stripe(args.latency, async_api=(mode == 'asgi_async')):
+            if mode == 'wsgi':
+                summary = run_wsgi(app, ids, args.threads, args.concurrency)
+            else:
+                sidecar = GatewayASGI(app, gateway_threads=args.gateway_threads, db_threads=args.threads)
+                try:
+                    summary = run_asgi(sidecar, ids, args.concurrency)
+                finally:
+                    sidecar.gateway_pool.shutdown()
+                    sidecar.db_pool.shutdown()
+        results['results'][mode] = summary
+    shutil.rmtree(tmpdir, ignore_errors=True)
+
+    report = json.dumps(results, indent=2)
+    if args.output == '-':
+        print(report)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+# benchmarks/lcp.py
+# Measure First and Largest Contentful Paint of the storefront in headless
+# Chromium under mobile emulation (Moto G4 viewport, 4x CPU slowdown, slow
+# 4G), with critical CSS inlining on and off.
+#
+#   pip install playwright && playwright install chromium
+#   python -m benchmarks.lcp --runs 15 -o lcp.json
+#
+# Run from the luxury-brand directory. Every run uses a fresh browser context
+# (cold cache). Third-party requests (fonts, Font Awesome, the hero image) are
+# blocked by default so results depend only on this app; pass
+# --allow-external to include them.
+import argparse
+import contextlib
+import json
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+from datetime import datetime
+
+# Chrome DevTools "Slow 4G" preset
+NETWORK = {'offline': False, 'latency': 150, 'downloadThroughput': 1.6 * 1024 * 1024 / 8 * 0.9,
+           'uploadThroughput': 750 * 1024 / 8 * 0.9}
+CPU_SLOWDOWN = 4
+
+OBSERVE_LCP = """
+window.__lcp = null;
+new PerformanceObserver(list => {
+    for (const entry of list.getEntries()) window.__lcp = entry.renderTime || entry.loadTime || entry.startTime;
+}).observe({type: 'largest-contentful-paint', buffered: true});
+"""
+
+READ_PAINTS = """() => ({
+    lcp: window.__lcp,
+    fcp: (performance.getEntriesByName('first-contentful-paint')[0] || {}).startTime || null,
+})"""
+
+
+def measure(browser, device, url, allow_external):
+    context = browser.new_context(**device)
+    try:
+        page = context.new_page()
+        if not allow_external:
+            origin = url.split('/', 3)[:3]
+            page.route('**/*', lambda route: route.continue_() if route.request.url.split('/', 3)[:3] == origin
+                       else route.abort())
+        cdp = context.new_cdp_session(page)
+        cdp.send('Network.enable')
+        cdp.send('Network.emulateNetworkConditions', NETWORK)
+        cdp.send('Emulation.setCPUThrottlingRate', {'rate': CPU_SLOWDOWN})
+        page.add_init_script(OBSERVE_LCP)
+        page.goto(url, wait_until='load')
+        # LCP is final once the page is idle; give late paints a moment
+        page.wait_for_timeout(500)
+        return page.evaluate(READ_PAINTS)
+    finally:
+        context.close()
+
+
+def summarize(samples, key):
+    values = sorted(s[key] for s in samples if s[key] is not None)
+    if not values:
+        return None
+    return {
+        'median_ms': round(statistics.median(values), 1),
+        'p75_ms': round(values[min(len(values) - 1, int(len(values) * 0.75))], 1),
+        'min_ms': round(values[0], 1),
+        'max_ms': round(values[-1], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Storefront FCP/LCP under mobile emulation.")
+    parser.add_argument('--runs', type=int, default=15, help="page loads per mode")
+    parser.add_argument('--device', default='Moto G4', help="Playwright device descriptor")
+    parser.add_argument('--allow-external', action='store_true', help="let third-party requests through")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('-o', '--output', default='-', help="JSON results file, or - for stdout")
+    args = parser.parse_args()
+
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        parser.error("playwright is required: pip install playwright && playwright install chromium")
+
+    tmpdir = tempfile.mkdtemp(prefix='luxury-lcp-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'lcp.db')}"
+    with contextlib.redirect_stdout(sys.stderr):
+        from app import app
+    from benchmarks.datagen import SCALES, generate
+    from benchmarks.scenarios import ServerThread
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    with app.app_context():
+        generate(seed=args.seed, **SCALES['small'])
+
+    results = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'device': args.device,
+            'cpu_slowdown': CPU_SLOWDOWN,
+            'network': NETWORK,
+            'runs': args.runs,
+            'external_requests': args.allow_external,
+        },
+        'results': {},
+    }
+    with ServerThread(app) as server, sync_playwright() as playwright:
+        browser = playwright.chromium.launch()
+        device = playwright.devices[args.device]
+        try:
+            for mode, enabled in (('blocking_css', False), ('critical_css', True)):
+                app.config['CRITICAL_CSS_ENABLED'] = enabled
+                print(f"Measuring {mode}", file=sys.stderr)
+                samples = [measure(browser, device, server.base_url + '/', args.allow_external)
+                           for _ in range(args.runs)]
+                results['results'][mode] = {'fcp': summarize(samples, 'fcp'), 'lcp': summarize(samples, 'lcp')}
+        finally:
+            browser.close()
+    shutil.rmtree(tmpdir, ignore_errors=True)
+
+    report = json.dumps(results, indent=2)
+    if args.output == '-':
+        print(report)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+# benchmarks/run.py
+# Seed a throwaway database at a chosen scale, run the storefront, checkout and
+# admin scenarios through the Flask test client and a real WSGI server, and
+# write throughput and latency percentiles to JSON.
+#
+#   python -m benchmarks.run --scale small --iterations 200 --concurrency 4 -o bench.json
+#   python -m benchmarks.run --scale small -o new.json --compare bench.json
+#
+# Run from the luxury-brand directory. Exits 1 when --compare finds a regression.
+import argparse
+import contextlib
+import itertools
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from datetime import datetime
+
+
+def percentile(sorted_values, p):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * p / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    ms = lambda value: round(value * 1000, 3) if value is not None else None
+    return {
+        'iterations': len(latencies),
+        'errors': len(errors),
+        'error_samples': errors[:5],
+        'duration_s': round(elapsed, 3),
+        'throughput_per_s': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'mean_ms': ms(sum(latencies) / len(latencies)) if latencies else None,
+        'p50_ms': ms(percentile(latencies, 50)),
+        'p90_ms': ms(percentile(latencies, 90)),
+        'p95_ms': ms(percentile(latencies, 95)),
+        'p99_ms': ms(percentile(latencies, 99)),
+        'max_ms': ms(latencies[-1]) if latencies else None,
+    }
+
+
+def run_scenario(make_driver, name, iterations, concurrency, warmup, ids, seed):
+    from benchmarks.scenarios import SCENARIOS, make_context, worker_login
+
+    step, admin = SCENARIOS[name]
+    remaining = itertools.count()
+    latencies, errors = [], []
+    lock = threading.Lock()
+    ready = threading.Barrier(concurrency + 1)
+
+    def worker(index):
+        driver = make_driver()
+        ctx = make_context(index, ids, seed)
+        try:
+            worker_login(driver, index, ids, admin)
+            for _ in range(warmup):
+                step(driver, ctx)
+        except Exception as e:
+            with lock:
+                errors.append(f'setup: {e}')
+        ready.wait()
+        local = []
+        while next(remaining) < iterations:
+            started = time.perf_counter()
+            try:
+                step(driver, ctx)
+                local.append(time.perf_counter() - started)
+            except Exception as e:
+                with lock:
+                    errors.append(f'{type(e).__name__}: {e}')
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(i,), name=f'bench-{name}-{i}') for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def compare(results, baseline, tolerance):
+    """Return descriptions of scenarios whose p95 or throughput regressed beyond `tolerance`."""
+    regressions = []
+    for driver, scenarios in results['results'].items():
+        for name, current in scenarios.items():
+            previous = baseline.get('results', {}).get(driver, {}).get(name)
+            if not previous or not previous.get('p95_ms') or not current.get('p95_ms'):
+                continue
+            if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+                regressions.append(f"{driver}/{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+            if current['throughput_per_s'] < previous['throughput_per_s'] * (1 - tolerance):
+                regressions.append(f"{driver}/{name}: throughput "
+                                   f"{previous['throughput_per_s']} -> {current['throughput_per_s']}/s")
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    from benchmarks.datagen import SCALES
+
+    parser = argparse.ArgumentParser(description="Run the storefront/checkout benchmark suite.")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    for table in SCALES['small']:
+        parser.add_argument(f'--{table}', type=int, help=f"override the number of {table} to generate")
+    parser.add_argument('--scenario', action='append', choices=['homepage', 'cart_ops', 'checkout', 'admin_listings'],
+                        help="scenario to run (repeatable; default all)")
+    parser.add_argument('--driver', choices=['test-client', 'wsgi', 'both'], default='both')
+    parser.add_argument('--iterations', type=int, default=200, help="measured iterations per scenario")
+    parser.add_argument('--warmup', type=int, default=5, help="unmeasured iterations per worker")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--gateway-latency', type=float, default=0.0, help="fake Stripe round trip in seconds")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--database-url', help="database to seed (default: a fresh SQLite file in a temp dir)")
+    parser.add_argument('-o', '--output', default='-', help="JSON results file, or - for stdout")
+    parser.add_argument('--compare', help="baseline JSON results to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed relative regression (default 0.2)")
+    args = parser.parse_args()
+
+    tmpdir = None
+    if not args.database_url:
+        tmpdir = tempfile.mkdtemp(prefix='luxury-bench-')
+        args.database_url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    # Must be set before the app (and its Config) is imported
+    os.environ['DATABASE_URL'] = args.database_url
+    # Every simulated user logs in from 127.0.0.1, which would share one login bucket
+    os.environ['RATELIMIT_ENABLED'] = 'false'
+    # The job worker's writes would compete with the measured requests (and outlive the temp
+    # database); no scenario reads its side effects, so queued jobs are left unprocessed
+    os.environ['JOB_WORKER_ENABLED'] = 'false'
+
+    # Keep stdout clean for the JSON report
+    with contextlib.redirect_stdout(sys.stderr):
+        from app import app
+    from benchmarks.datagen import generate, clear_carts
+    from benchmarks.fake_gateway import fake_stripe
+    from benchmarks.scenarios import TestClientDriver, HttpDriver, ServerThread, SCENARIOS
+
+    scale = dict(SCALES[args.scale])
+    for table in scale:
+        if getattr(args, table) is not None:
+            scale[table] = getattr(args, table)
+
+    # One access-log line per request would dominate the run
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    print(f"Seeding {args.database_url}: {scale}", file=sys.stderr)
+    started = time.perf_counter()
+    with app.app_context():
+        ids = generate(seed=args.seed, **scale)
+    seed_seconds = time.perf_counter() - started
+    if not ids['user_ids'] or not ids['product_ids']:
+        parser.error("the scenarios need at least one user and one product")
+
+    scenarios = args.scenario or list(SCENARIOS)
+    drivers = ['test-client', 'wsgi'] if args.driver == 'both' else [args.driver]
+    results = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': args.database_url.split(':', 1)[0],
+            'scale': scale,
+            'seed_seconds': round(seed_seconds, 3),
+            'iterations': args.iterations,
+            'warmup': args.warmup,
+            'concurrency': args.concurrency,
+            'gateway_latency_s': args.gateway_latency,
+        },
+        'results': {},
+    }
+
+    with fake_stripe(args.gateway_latency):
+        for driver_name in drivers:
+            server = ServerThread(app).__enter__() if driver_name == 'wsgi' else None
+            make_driver = (lambda: HttpDriver(server.base_url)) if server else (lambda: TestClientDriver(app))
+            try:
+                for name in scenarios:
+                    print(f"Running {driver_name}/{name}", file=sys.stderr)
+                    try:
+                        summary = run_scenario(make_driver, name, args.iterations, args.concurrency,
+                                               args.warmup, ids, args.seed)
+                    except Exception:
+                        summary = {'failed': traceback.format_exc()}
+                    results['results'].setdefault(driver_name, {})[name] = summary
+                    with app.app_context():
+                        clear_carts(ids['user_ids'])
+            finally:
+                if server:
+                    server.__exit__(None, None, None)
+
+    if tmpdir:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    if args.output == '-':
+        print(output)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f"Wrote {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+# benchmarks/scenarios.py
+# HTTP drivers (Flask test client, real WSGI server) and the benchmarked user journeys.
+import http.cookiejar
+import json
+import random
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from werkzeug.serving import make_server
+
+from benchmarks.datagen import BENCH_PASSWORD
+
+
+class ScenarioError(Exception):
+    pass
+
+
+class TestClientDriver:
+    """Drives the app in-process through Flask's test client (no network or server overhead)."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, form=None, json_body=None):
+        response = self.client.open(path, method=method, data=form, json=json_body)
+        return response.status_code, response.headers, response.get_data()
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpDriver:
+    """Drives a running server over HTTP with its own cookie jar; redirects are not followed."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect())
+
+    def request(self, method, path, form=None, json_body=None):
+        data, headers = None, {}
+        if json_body is not None:
+            data = json.dumps(json_body).encode()
+            headers['Content-Type'] = 'application/json'
+        elif form is not None:
+            data = urllib.parse.urlencode(form).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with self.opener.open(req, timeout=30) as response:
+                return response.status, response.headers, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, e.read()
+
+
+class ServerThread:
+    """The app behind werkzeug's threaded WSGI server on an ephemeral localhost port."""
+
+    def __init__(self, app):
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, name='bench-server', daemon=True)
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server.port}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.thread.join()
+
+
+def _expect(status, allowed, what):
+    if status not in allowed:
+        raise ScenarioError(f'{what} returned {status}')
+
+
+def login(driver, username, password):
+    status, _, _ = driver.request('POST', '/login', form={'username': username, 'password': password})
+    _expect(status, (302,), f'login as {username}')
+
+
+# -------------------------
+# Scenarios
+# Each takes (driver, ctx) and runs one iteration; ctx carries the
+# worker's random generator and the generated ids.
+# -------------------------
+def homepage(driver, ctx):
+    status, _, _ = driver.request('GET', '/')
+    _expect(status, (200,), 'GET /')
+    status, _, _ = driver.request('GET', '/api/me/summary')
+    _expect(status, (200,), 'GET /api/me/summary')
+
+
+def cart_ops(driver, ctx):
+    product_id = ctx['rng'].choice(ctx['product_ids'])
+    status, _, _ = driver.request('GET', f'/add_to_cart/{product_id}')
+    _expect(status, (302,), 'add_to_cart')
+    status, _, _ = driver.request('GET', '/cart')
+    _expect(status, (200,), 'GET /cart')
+    status, _, _ = driver.request('GET', '/api/cart/count')
+    _expect(status, (200,), 'GET /api/cart/count')
+
+
+def checkout(driver, ctx):
+    rng = ctx['rng']
+    for product_id in rng.sample(ctx['product_ids'], min(2, len(ctx['product_ids']))):
+        status, _, _ = driver.request('GET', f'/add_to_cart/{product_id}')
+        _expect(status, (302,), 'add_to_cart')
+
+    status, headers, _ = driver.request('POST', '/checkout', form={
+        'payment_method': 'stripe', 'shipping_address': '1 Bench Street'})
+    _expect(status, (302,), 'POST /checkout')
+    location = headers.get('Location', '')
+    if '/process-stripe-payment/' not in location:
+        raise ScenarioError(f'checkout redirected to {location!r}')
+    order_id = int(location.rstrip('/').rsplit('/', 1)[-1])
+
+    status, _, body = driver.request('POST', '/api/create-payment-intent', json_body={'order_id': order_id})
+    _expect(status, (200,), 'create-payment-intent')
+    intent_id = json.loads(body)['payment_intent_id']
+
+    status, _, _ = driver.request('POST', '/api/confirm-stripe-payment', json_body={
+        'order_id': order_id, 'payment_intent_id': intent_id})
+    _expect(status, (200,), 'confirm-stripe-payment')
+
+
+ADMIN_LISTINGS = [
+    '/api/admin/products',
+    '/api/admin/orders',
+    '/api/admin/payments',
+    '/api/admin/messages',
+    '/api/admin/subscribers',
+    '/api/admin/notifications',
+    '/api/admin/stats',
+]
+
+
+def admin_listings(driver, ctx):
+    for path in ADMIN_LISTINGS:
+        status, _, _ = driver.request('GET', path)
+        _expect(status, (200,), f'GET {path}')
+
+
+# name -> (iteration function, needs admin login)
+SCENARIOS = {
+    'homepage': (homepage, False),
+    'cart_ops': (cart_ops, False),
+    'checkout': (checkout, False),
+    'admin_listings': (admin_listings, True),
+}
+
+
+def make_context(worker, ids, seed):
+    return {
+        'rng': random.Random(seed * 1000 + worker),
+        'product_ids': ids['product_ids'],
+    }
+
+
+def worker_login(driver, worker, ids, admin):
+    if admin:
+        login(driver, 'admin', 'admin123')
+    else:
+        user_id = ids['user_ids'][worker % len(ids['user_ids'])]
+        login(driver, f'bench_user_{user_id}', BENCH_PASSWORD)
@@ -0,0 +1,71 @@
+import hashlib
+import re
+
+from database import db, UploadBlob, dialect_insert
+from storage import COPY_CHUNK, IMMUTABLE_CACHE_CONTROL
+
+BLOB_DIR = 'blobs'
+BLOB_NAME = re.compile(r'^[0-9a-f]{64}\.[a-z0-9]{1,8}$')
+
+
+def is_blob_name(name):
+    """True for content-addressed names ("<sha256>.<ext>"); legacy uploads return False."""
+    return bool(name) and BLOB_NAME.match(name) is not None
+
+
+def blob_key(name):
+    """Storage key of a blob, fanned out by hash prefix: blobs/ab/<name>."""
+    return f'{BLOB_DIR}/{name[:2]}/{name}'
+
+
+def store(storage, fileobj, ext):
+    """
+    Hash a seekable file object in chunks, take a reference on the blob and
+    upload it unless an identical one is already stored. Returns the blob
+    name; the reference belongs to the caller's transaction.
+    """
+    digest, size = hashlib.sha256(), 0
+    fileobj.seek(0)
+    for block in iter(lambda: fileobj.read(COPY_CHUNK), b''):
+        digest.update(block)
+        size += len(block)
+    name = f'{digest.hexdigest()}.{ext.lower()}'
+
+    # Reference first: a concurrent collect() of this blob is ordered against it by the row lock
+    acquire(name, size)
+    key = blob_key(name)
+    if not storage.exists(key):
+        fileobj.seek(0)
+        storage.put_stream(key, fileobj, cache_control=IMMUTABLE_CACHE_CONTROL)
+    return name
+
+
+def acquire(name, size):
+    """Take a reference on a blob inside the caller's transaction (one upsert)."""
+    stmt = dialect_insert(UploadBlob.__table__).values(name=name, size=size, refcount=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['name'],
+        set_={'refcount': UploadBlob.__table__.c.refcount + 1},
+    )
+    db.session.execute(stmt)
+
+
+def release(name):
+    """Drop a reference inside the caller's transaction. Legacy names are ignored."""
+    if not is_blob_name(name):
+        return
+    UploadBlob.query.filter(UploadBlob.name == name, UploadBlob.refcount > 0).update(
+        {UploadBlob.refcount: UploadBlob.refcount - 1}, synchronize_session=False)
+
+
+def collect(storage, name):
+    """
+    Delete an unreferenced blob: remove its row only if refcount is still
+    zero, delete the stored object, then commit. Returns True if removed.
+    """
+    deleted = UploadBlob.query.filter(UploadBlob.name == name, UploadBlob.refcount == 0).delete(
+        synchronize_session=False)
+    if deleted:
+        storage.delete(blob_key(name))
+    db.session.commit()
+    return bool(deleted)
@@ -0,0 +1,252 @@
+"""
+Minify and precompress the static CSS/JS bundles.
+
+    python build_assets.py            # build static/dist
+    python build_assets.py --clean    # remove static/dist
+
+Each .css/.js file under static/css and static/js (including
+js/sections/) is minified into static/dist/ with .gz (and .br when the
+brotli package is installed) siblings. The static route serves the dist
+copy, choosing a precompressed variant from Accept-Encoding, as long as
+it is newer than the source file; edit a source file and it is served
+as-is until the next build.
+"""
+import argparse
+import gzip
+import os
+import re
+import shutil
+import sys
+
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # .br files are skipped without it
+    brotli = None
+
+STATIC_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST_DIR = 'dist'
+SOURCES = ('css', 'js')
+
+
+# -------------------------
+# Minifiers
+# -------------------------
+def minify_css(text):
+    """Drop comments and insignificant whitespace. Strings and calc() spacing are kept."""
+    out, i, n = [], 0, len(text)
+    while i < n:
+        c = text[i]
+        if c in '"\'':
+            end = i + 1
+            while end < n and text[end] != c:
+                end += 2 if text[end] == '\\' else 1
+            out.append(text[i:end + 1])
+            i = end + 1
+        elif text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+        else:
+            out.append(c)
+            i += 1
+    css = ''.join(out)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    # "a:hover" vs "a :hover" differ, so only the space after a colon goes
+    css = re.sub(r':\s+', ':', css)
+    css = css.replace(';}', '}')
+    return css.strip() + '\n'
+
+
+# Characters after which a "/" starts a regex literal rather than a division
+_REGEX_PREFIX = set('(,=:[!&|?{};+-*%<>~^') | {''}
+_REGEX_KEYWORDS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'yield', 'await', 'delete')
+
+
+def minify_js(text):
+    """
+    Conservative JS minifier: strips comments, indentation, trailing
+    whitespace and blank lines, but keeps line breaks so automatic
+    semicolon insertion behaves exactly as in the source. String, regex
+    and template literals (including ${...} expressions) are copied
+    verbatim.
+    """
+    out, i, n = [], 0, len(text)
+    template_depth = []  # brace depth at each open ${ inside a template literal
+    braces = 0
+
+    def last_significant():
+        for chunk in reversed(out):
+            stripped = chunk.rstrip()
+            if stripped:
+                return stripped
+        return ''
+
+    def copy_until(start, quote):
+        end = start + 1
+        while end < n and text[end] != quote:
+            if text[end] == '\\':
+                end += 1
+            elif quote == '`' and text.startswith('${', end):
+                return end  # expression inside a template literal
+            end += 1
+        return end
+
+    while i < n:
+        c = text[i]
+        if c == '`' or (c == '}' and template_depth and template_depth[-1] == braces):
+            # Template literal text, from its opening backtick or from the end of a ${...}
+            if c == '}':
+                template_depth.pop()
+            end = copy_until(i, '`')
+            if end < n and text[end] == '`':
+                out.append(text[i:end + 1])
+                i = end + 1
+            else:
+                out.append(text[i:end + 2])
+                template_depth.append(braces)
+                i = end + 2
+        elif c in '"\'':
+            end = copy_until(i, c)
+            out.append(text[i:end + 1])
+            i = end + 1
+        elif text.startswith('//', i):
+            end = text.find('\n', i)
+            i = n if end == -1 else end
+        elif text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+        elif c == '/':
+            previous = last_significant()
+            word = re.search(r'[A-Za-z_$][\w$]*$', previous)
+            if previous[-1:] in _REGEX_PREFIX or (word and word.group() in _REGEX_KEYWORDS):
+                end, in_class = i + 1, False
+                while end < n and text[end] != '\n':
+                    ch = text[end]
+                    if ch == '\\':
+                        end += 1
+                    elif ch == '[':
+                        in_class = True
+                    elif ch == ']':
+                        in_class = False
+                    elif ch == '/' and not in_class:
+                        break
+                    end += 1
+                out.append(text[i:end + 1])
+                i = end + 1
+            else:
+                out.append(c)
+                i += 1
+        else:
+            if c == '{':
+                braces += 1
+            elif c == '}':
+                braces -= 1
+            out.append(c)
+            i += 1
+
+    # Line-level cleanup only touches text outside literals, so rejoin and
+    # strip lines, but leave multi-line template literals untouched.
+    lines, result = ''.join(out).split('\n'), []
+    inside_template = False
+    for line in lines:
+        if inside_template:
+            result.append(line)
+        elif line.strip():
+            result.append(line.strip())
+        if _toggles_template(line):
+            inside_template = not inside_template
+    return '\n'.join(result) + '\n'
+
+
+def _toggles_template(line):
+    """Whether a line leaves an odd number of unescaped backticks open."""
+    return len(re.findall(r'(?<!\\)`', line)) % 2 == 1
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+# -------------------------
+# Build
+# -------------------------
+def _write(path, data):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def build(static_root=STATIC_ROOT, gzip_level=9, brotli_quality=11):
+    """Minify and precompress every bundle. Returns [(relpath, source, minified, gzip, brotli) sizes]."""
+    results = []
+    for folder in SOURCES:
+        for source_dir, subdirs, names in os.walk(os.path.join(static_root, folder)):
+            subdirs.sort()
+            rel_dir = os.path.relpath(source_dir, static_root).replace(os.sep, '/')
+            for name in sorted(names):
+                minify = MINIFIERS.get(os.path.splitext(name)[1])
+                if minify is None:
+                    continue
+                results.append(_build_file(static_root, f'{rel_dir}/{name}', minify, gzip_level, brotli_quality))
+    return results
+
+
+def _build_file(static_root, rel, minify, gzip_level, brotli_quality):
+    with open(os.path.join(static_root, rel), encoding='utf-8') as f:
+        source = f.read()
+    minified = minify(source).encode('utf-8')
+    target = os.path.join(static_root, DIST_DIR, rel)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    _write(target, minified)
+    # mtime=0 keeps the .gz bytes reproducible between builds
+    gz = gzip.compress(minified, compresslevel=gzip_level, mtime=0)
+    _write(target + '.gz', gz)
+    br = None
+    if brotli is not None:
+        br = brotli.compress(minified, quality=brotli_quality)
+        _write(target + '.br', br)
+    return rel, len(source.encode('utf-8')), len(minified), len(gz), len(br) if br is not None else None
+
+
+def dist_path(static_root, filename):
+    """
+    The built copy of static/<filename>, if there is one at least as new
+    as the source. Names that would resolve outside either folder get None.
+    """
+    source = safe_join(static_root, filename)
+    built = safe_join(os.path.join(static_root, DIST_DIR), filename)
+    if source is None or built is None:
+        return None
+    try:
+        if os.stat(built).st_mtime_ns >= os.stat(source).st_mtime_ns:
+            return built
+    except OSError:
+        pass
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Minify and precompress static CSS/JS into static/dist.')
+    parser.add_argument('--static', default=STATIC_ROOT, help='static folder (default: %(default)s)')
+    parser.add_argument('--clean', action='store_true', help='remove the dist folder and exit')
+    args = parser.parse_args(argv)
+
+    if args.clean:
+        shutil.rmtree(os.path.join(args.static, DIST_DIR), ignore_errors=True)
+        print('Removed static/dist')
+        return 0
+
+    if brotli is None:
+        print('brotli not installed; writing .gz files only (pip install brotli)', file=sys.stderr)
+    for rel, source, minified, gz, br in build(args.static):
+        line = f'{rel}: {source:,} -> {minified:,} bytes, gzip {gz:,}'
+        if br is not None:
+            line += f', brotli {br:,}'
+        print(line)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Small thread-safe in-process LRU cache with an optional per-entry TTL.
+    Keeps hit/miss counters so callers can report hit ratios.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': (self.hits / total) if total else 0.0,
+        }
+
+
+class SQLiteCache:
+    """
+    Cache shared by every worker on a host, kept in a local SQLite file
+    (WAL mode, so readers never wait for a writer). Values are stored as
+    JSON; get_many/set_many read or write a batch in one statement.
+    Expired rows are skipped on read and pruned every `prune_every` writes.
+    """
+
+    def __init__(self, path, ttl=None, prune_every=100):
+        self.path = path
+        self.ttl = ttl
+        self.prune_every = prune_every
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS cache '
+                         '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys):
+        """{key: value} for the keys that are present and unexpired."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        placeholders = ','.join('?' * len(keys))
+        rows = self._connect().execute(
+            f'SELECT key, value FROM cache WHERE key IN ({placeholders}) '
+            'AND (expires_at IS NULL OR expires_at >= ?)', [*keys, time.time()]).fetchall()
+        found = {key: json.loads(value) for key, value in rows}
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def set_many(self, mapping, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl else None
+        conn = self._connect()
+        conn.executemany('INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)',
+                         [(key, json.dumps(value), expires_at) for key, value in mapping.items()])
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            conn.execute('DELETE FROM cache WHERE expires_at < ?', (time.time(),))
+
+    def set(self, key, value, ttl=None):
+        self.set_many({key: value}, ttl)
+
+    def incr(self, key):
+        """Atomically add one to an integer entry (0 if absent) and return the new value."""
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT value FROM cache WHERE key = ?', (key,)).fetchone()
+            value = (json.loads(row[0]) if row else 0) + 1
+            conn.execute('INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, NULL)',
+                         (key, json.dumps(value)))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return value
+
+    def delete(self, key):
+        self._connect().execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def clear(self):
+        self._connect().execute('DELETE FROM cache')
+
+    def __len__(self):
+        return self._connect().execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self),
+            'maxsize': None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': (self.hits / total) if total else 0.0,
+        }
@@ -0,0 +1,23 @@
+# compact_notifications.py
+# Retention job: fold old read notifications into NotificationSummary.
+# Run periodically, e.g. nightly from cron.
+import argparse
+
+from app import app
+from notifications import compact_notifications
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact read notifications older than a threshold.")
+    parser.add_argument('--days', type=int, default=app.config.get('NOTIFICATION_RETENTION_DAYS', 90),
+                        help="compact read notifications older than this many days")
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    with app.app_context():
+        compacted = compact_notifications(args.days, args.batch_size)
+    print(f"Compacted {compacted} notifications older than {args.days} days")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+import gzip
+import zlib
+
+from flask import request
+
+from cache import LRUCache
+
+try:
+    import brotli
+except ImportError:  # gzip only without it
+    brotli = None
+
+DEFAULT_MIMETYPES = (
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/xml',
+    'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+)
+
+
+def negotiate(accept_encodings, allow_brotli=True):
+    """Best encoding the client accepts: br (if available), then gzip, else None."""
+    if allow_brotli and brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding, level=6, brotli_quality=5):
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def compress_stream(chunks, encoding, level=6, brotli_quality=5):
+    """
+    Compress a streamed body chunk by chunk, so large exports start
+    flowing without being buffered. Output is emitted whenever the
+    compressor produces some, not per input chunk.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=brotli_quality)
+        feed, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+        feed, finish = compressor.compress, compressor.flush
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = feed(chunk)
+            if data:
+                yield data
+        yield finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+class Compression:
+    """
+    Compress text responses (HTML, JSON, CSS, CSV...) according to the
+    client's Accept-Encoding. Bodies under COMPRESS_MIN_SIZE go out as-is;
+    streamed responses are compressed on the fly. Responses with an ETag
+    are compressed once per (URL, ETag, encoding) and reused from an LRU,
+    and their ETag is made weak, since the compressed bytes differ from
+    the identity body (views comparing with make_conditional still match).
+    File responses (direct_passthrough) and event streams are left alone.
+    """
+
+    def __init__(self, app=None):
+        self.cache = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.cache = LRUCache(maxsize=app.config.get('COMPRESS_CACHE_SIZE', 256))
+        self.mimetypes = frozenset(app.config.get('COMPRESS_MIMETYPES', DEFAULT_MIMETYPES))
+        app.after_request(self._compress_response)
+
+    def _compress_response(self, response):
+        config = self.app.config
+        if not config.get('COMPRESS_ENABLED', True):
+            return response
+        if (response.mimetype not in self.mimetypes or response.direct_passthrough
+                or 'Content-Encoding' in response.headers or response.status_code != 200
+                or request.method == 'HEAD' or response.cache_control.no_transform):
+            return response
+
+        streamed = response.is_streamed
+        if not streamed and (response.content_length or 0) < config.get('COMPRESS_MIN_SIZE', 1024):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate(request.accept_encodings, config.get('COMPRESS_BROTLI', True))
+        if encoding is None:
+            return response
+
+        level = config.get('COMPRESS_LEVEL', 6)
+        quality = config.get('COMPRESS_BROTLI_QUALITY', 5)
+        response.headers['Content-Encoding'] = encoding
+
+        if streamed:
+            response.response = compress_stream(response.response, encoding, level, quality)
+            response.headers.pop('Content-Length', None)
+            return response
+
+        etag, weak = response.get_etag()
+        if etag:
+            key = (request.full_path, etag, encoding)
+            data = self.cache.get(key)
+            if data is None:
+                data = compress(response.get_data(), encoding, level, quality)
+                self.cache.set(key, data)
+            if not weak:
+                response.set_etag(etag, weak=True)
+        else:
+            data = compress(response.get_data(), encoding, level, quality)
+        response.set_data(data)
+        return response
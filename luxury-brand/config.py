@@ -36,10 +36,136 @@ class Config:
     PAYPAL_CLIENT_ID = os.environ.get('PAYPAL_CLIENT_ID', '')
     PAYPAL_CLIENT_SECRET = os.environ.get('PAYPAL_CLIENT_SECRET', '')
 
+    # Header badge summary cache (/api/me/summary)
+    USER_SUMMARY_CACHE_SIZE = int(os.environ.get('USER_SUMMARY_CACHE_SIZE', 10000))
+    USER_SUMMARY_CACHE_TTL = int(os.environ.get('USER_SUMMARY_CACHE_TTL', 30))  # seconds
+
+    # Admin notifications
+    ADMIN_NOTIFICATION_LIMIT = int(os.environ.get('ADMIN_NOTIFICATION_LIMIT', 50))
+    NOTIFICATION_STREAM_HEARTBEAT = int(os.environ.get('NOTIFICATION_STREAM_HEARTBEAT', 15))  # seconds
+    NOTIFICATION_STREAM_MAX_AGE = int(os.environ.get('NOTIFICATION_STREAM_MAX_AGE', 300))  # seconds
+    NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', 90))
+
+    # Background jobs
+    JOB_WORKER_ENABLED = os.environ.get('JOB_WORKER_ENABLED', 'true').lower() == 'true'
+    JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', 1.0))  # seconds
+    JOB_VISIBILITY_TIMEOUT = int(os.environ.get('JOB_VISIBILITY_TIMEOUT', 300))  # seconds before a stuck job is retried
+
+    # Giveaway entry ingestion
+    GIVEAWAY_ENTRY_BATCH_SIZE = int(os.environ.get('GIVEAWAY_ENTRY_BATCH_SIZE', 500))
+    GIVEAWAY_ENTRY_FLUSH_INTERVAL = float(os.environ.get('GIVEAWAY_ENTRY_FLUSH_INTERVAL', 0.5))  # seconds
+    GIVEAWAY_ENTRY_MAX_PENDING = int(os.environ.get('GIVEAWAY_ENTRY_MAX_PENDING', 20000))
+
+    # Contact form intake
+    CONTACT_IP_LIMIT = int(os.environ.get('CONTACT_IP_LIMIT', 5))  # messages per window per IP
+    CONTACT_EMAIL_LIMIT = int(os.environ.get('CONTACT_EMAIL_LIMIT', 3))  # messages per window per sender
+    CONTACT_RATE_WINDOW = int(os.environ.get('CONTACT_RATE_WINDOW', 600))  # seconds
+    CONTACT_DUPLICATE_WINDOW = int(os.environ.get('CONTACT_DUPLICATE_WINDOW', 86400))  # seconds
+    CONTACT_SPAM_THRESHOLD = float(os.environ.get('CONTACT_SPAM_THRESHOLD', 0.7))
+
+    # Reverse proxy hops to trust for X-Forwarded-For/-Proto/-Host (werkzeug ProxyFix).
+    # Set to 1 behind a single nginx/ALB, or every visitor gets the proxy's address
+    # and shares one rate limit bucket. Leave 0 when clients connect directly.
+    PROXY_FIX_HOPS = int(os.environ.get('PROXY_FIX_HOPS', '0'))
+
+    # Rate limits for public write endpoints, "<requests>/<seconds>" per client IP
+    # (the contact form uses CONTACT_*_LIMIT above). The memory backend is exact
+    # but per worker; 'sqlite' shares counters between the workers on a host.
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    RATELIMIT_BACKEND = os.environ.get('RATELIMIT_BACKEND', 'memory')  # memory or sqlite
+    RATELIMIT_SQLITE_PATH = os.environ.get('RATELIMIT_SQLITE_PATH', os.path.join(basedir, 'instance', 'ratelimit.sqlite'))
+    RATELIMIT_LOGIN = os.environ.get('RATELIMIT_LOGIN', '10/300')
+    RATELIMIT_REGISTER = os.environ.get('RATELIMIT_REGISTER', '5/3600')
+    RATELIMIT_SUBSCRIBE = os.environ.get('RATELIMIT_SUBSCRIBE', '10/3600')
+    RATELIMIT_GIVEAWAY = os.environ.get('RATELIMIT_GIVEAWAY', '10/3600')
+    RATELIMIT_CART = os.environ.get('RATELIMIT_CART', '60/60')  # token bucket: bursts up to 60
+
+    # Upload storage: 'filesystem' (UPLOAD_FOLDER) or 's3' (needs boto3). For a local
+    # S3-compatible stand-in, run MinIO or moto_server and set S3_ENDPOINT_URL to it.
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'filesystem')
+    S3_BUCKET = os.environ.get('S3_BUCKET', 'luxury-uploads')
+    S3_PREFIX = os.environ.get('S3_PREFIX', '')
+    S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL')  # e.g. http://localhost:9000
+    S3_REGION = os.environ.get('S3_REGION', 'us-east-1')
+    S3_ACCESS_KEY_ID = os.environ.get('S3_ACCESS_KEY_ID')
+    S3_SECRET_ACCESS_KEY = os.environ.get('S3_SECRET_ACCESS_KEY')
+    S3_PUBLIC_BASE_URL = os.environ.get('S3_PUBLIC_BASE_URL')  # CDN/public bucket URL; presigned URLs if unset
+    S3_URL_EXPIRES = int(os.environ.get('S3_URL_EXPIRES', 3600))  # presigned URL lifetime (seconds)
+    S3_REDIRECT_MAX_AGE = int(os.environ.get('S3_REDIRECT_MAX_AGE', 300))  # browser cache of the redirect
+
+    # Serving uploads from the filesystem backend. MEDIA_OFFLOAD: '' (cached fds + pread),
+    # 'sendfile' (WSGI file_wrapper), 'x-accel-redirect' (nginx internal location at
+    # MEDIA_ACCEL_PREFIX aliased to UPLOAD_FOLDER) or 'x-sendfile' (Apache/lighttpd)
+    MEDIA_OFFLOAD = os.environ.get('MEDIA_OFFLOAD', '')
+    MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', '/_uploads/')
+    MEDIA_FD_CACHE_SIZE = int(os.environ.get('MEDIA_FD_CACHE_SIZE', 256))
+    MEDIA_CHUNK_SIZE = int(os.environ.get('MEDIA_CHUNK_SIZE', 256 * 1024))
+
+    # Upload reconciliation (fix_images.py)
+    ASSET_MANIFEST_PATH = os.environ.get('ASSET_MANIFEST_PATH', os.path.join(basedir, 'instance', 'asset_manifest.json'))
+    ASSET_ORPHAN_GRACE_SECONDS = int(os.environ.get('ASSET_ORPHAN_GRACE_SECONDS', 3600))
+
+    # Performance instrumentation
+    PERF_INSTRUMENTATION = os.environ.get('PERF_INSTRUMENTATION', 'true').lower() == 'true'
+    PERF_SERVER_TIMING = os.environ.get('PERF_SERVER_TIMING', 'true').lower() == 'true'
+    PERF_SLOW_QUERY_MS = float(os.environ.get('PERF_SLOW_QUERY_MS', 100))
+    PERF_N_PLUS_ONE_THRESHOLD = int(os.environ.get('PERF_N_PLUS_ONE_THRESHOLD', 10))
+    PERF_WINDOW_SECONDS = int(os.environ.get('PERF_WINDOW_SECONDS', 300))  # rolling histogram window
+
+    # Prometheus metrics endpoint (/metrics): open to admin sessions, scrapers sending
+    # METRICS_TOKEN as a bearer token, and METRICS_ALLOWED_IPS (comma-separated
+    # addresses or CIDRs, checked against the client IP; see PROXY_FIX_HOPS)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_ALLOWED_IPS = os.environ.get('METRICS_ALLOWED_IPS', '')
+
+    # Response compression (compression.py); static CSS/JS is prebuilt by build_assets.py
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))  # bytes; smaller bodies go out as-is
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))  # gzip level
+    COMPRESS_BROTLI = os.environ.get('COMPRESS_BROTLI', 'true').lower() == 'true'  # when brotli is installed
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 5))
+    COMPRESS_CACHE_SIZE = int(os.environ.get('COMPRESS_CACHE_SIZE', 256))  # compressed bodies kept per ETag
+
+    # Storefront critical path (index.html): inline critical CSS and load stylesheets asynchronously
+    CRITICAL_CSS_ENABLED = os.environ.get('CRITICAL_CSS_ENABLED', 'true').lower() == 'true'
+    CRITICAL_CSS_SECTIONS = int(os.environ.get('CRITICAL_CSS_SECTIONS', 1))  # visible sections inlined after the hero
+
+    # Jinja bytecode cache (precompile_templates.py fills it at deploy) and worker warm-up
+    TEMPLATE_BYTECODE_CACHE = os.environ.get('TEMPLATE_BYTECODE_CACHE', 'true').lower() == 'true'
+    TEMPLATE_CACHE_DIR = os.environ.get('TEMPLATE_CACHE_DIR', os.path.join(basedir, 'instance', 'jinja_cache'))
+    TEMPLATE_WARMUP = os.environ.get('TEMPLATE_WARMUP', 'true').lower() == 'true'
+    TEMPLATE_WARMUP_PATHS = [p for p in os.environ.get('TEMPLATE_WARMUP_PATHS', '/,/login,/register').split(',') if p]
+
+    # Shared caching of public pages (@public_page, e.g. the storefront); seconds
+    PUBLIC_CACHE_MAX_AGE = int(os.environ.get('PUBLIC_CACHE_MAX_AGE', 60))  # browsers
+    PUBLIC_CACHE_S_MAXAGE = int(os.environ.get('PUBLIC_CACHE_S_MAXAGE', 300))  # CDN / reverse proxy
+    PUBLIC_CACHE_STALE_WHILE_REVALIDATE = int(os.environ.get('PUBLIC_CACHE_STALE_WHILE_REVALIDATE', 60))
+
+    # Order history (/orders, /api/orders)
+    ORDERS_PAGE_SIZE = int(os.environ.get('ORDERS_PAGE_SIZE', 20))
+
+    # Product cache for cart, wishlist and checkout. Set PRODUCT_CACHE_SHARED_PATH
+    # to share entries and invalidations between the workers on a host.
+    PRODUCT_CACHE_SIZE = int(os.environ.get('PRODUCT_CACHE_SIZE', 5000))
+    PRODUCT_CACHE_TTL = int(os.environ.get('PRODUCT_CACHE_TTL', 300))  # seconds
+    PRODUCT_CACHE_SHARED_PATH = os.environ.get('PRODUCT_CACHE_SHARED_PATH', '')  # e.g. instance/product_cache.sqlite
+    PRODUCT_CACHE_SHARED_TTL = int(os.environ.get('PRODUCT_CACHE_SHARED_TTL', 3600))
+
+    # Section toggles: workers reload their in-memory copy when this file changes
+    SITE_SETTINGS_VERSION_PATH = os.environ.get('SITE_SETTINGS_VERSION_PATH',
+                                                os.path.join(basedir, 'instance', 'site_settings.version'))
+
+    # Payment gateway sidecar (gateway_asgi.py): threads that wait on blocking SDK
+    # calls, and the bounded pool for the request steps and DB work around them
+    GATEWAY_THREADS = int(os.environ.get('GATEWAY_THREADS', 64))
+    GATEWAY_DB_THREADS = int(os.environ.get('GATEWAY_DB_THREADS', 4))
+
 
 class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_ECHO = True  # Logs SQL queries in console
+    PERF_SLOW_QUERY_MS = 20
 
 
 class ProductionConfig(Config):
@@ -54,6 +180,9 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False  # Easier for automated tests
+    JOB_WORKER_ENABLED = False  # Drain jobs explicitly with jobs.run_pending()
+    TEMPLATE_WARMUP = False
+    RATELIMIT_ENABLED = False
 
 
 # Dictionary for easy config selection
@@ -0,0 +1,64 @@
+import hashlib
+import re
+from datetime import datetime, timedelta
+
+from database import db, Message
+
+
+# -------------------------
+# Duplicate detection
+# -------------------------
+_NON_WORD = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def content_hash(email, message):
+    """
+    Fingerprint of a submission that ignores case, punctuation and
+    whitespace, so trivially varied resubmissions collide.
+    """
+    normalized = _NON_WORD.sub(' ', message.lower()).strip()
+    return hashlib.sha1(f'{email.strip().lower()}|{normalized}'.encode('utf-8')).hexdigest()
+
+
+def is_duplicate(fingerprint, window_seconds):
+    since = datetime.utcnow() - timedelta(seconds=window_seconds)
+    return db.session.query(
+        Message.query.filter(Message.content_hash == fingerprint, Message.created_at >= since).exists()
+    ).scalar()
+
+
+# -------------------------
+# Spam scoring
+# -------------------------
+_URL = re.compile(r'https?://|www\.', re.IGNORECASE)
+_SPAM_WORDS = re.compile(
+    r'\b(viagra|casino|crypto|bitcoin|loan|seo|backlinks?|porn|winner|prize|free money|click here|'
+    r'work from home|earn \$|guaranteed|investment opportunity)\b',
+    re.IGNORECASE,
+)
+_REPEATED = re.compile(r'(.)\1{5,}')
+
+
+def spam_score(name, email, message):
+    """
+    Cheap heuristic spam score between 0 and 1. Each signal adds weight;
+    nothing here needs network access or a model.
+    """
+    score = 0.0
+    links = len(_URL.findall(message))
+    if links:
+        score += min(0.2 * links, 0.5)
+    if _SPAM_WORDS.search(message) or _SPAM_WORDS.search(name):
+        score += 0.35
+    letters = [c for c in message if c.isalpha()]
+    if len(letters) > 20 and sum(c.isupper() for c in letters) / len(letters) > 0.6:
+        score += 0.15
+    if _REPEATED.search(message):
+        score += 0.1
+    if len(message.strip()) < 5:
+        score += 0.2
+    if _URL.search(name) or '@' in name:
+        score += 0.3
+    if message and sum(ord(c) > 127 for c in message) / len(message) > 0.5:
+        score += 0.1
+    return min(score, 1.0)
@@ -0,0 +1,145 @@
+import os
+import re
+import threading
+
+from markupsafe import Markup
+
+from build_assets import minify_css
+
+# Storefront sections in page order (SectionVisibility.section_name)
+SECTION_ORDER = ('products', 'testimonials', 'giveaway', 'videos', 'contact', 'socials')
+
+# Leading selector token -> group. "base" is the navbar, hero and shared
+# layout, always inlined; the rest belong to one storefront section.
+SELECTOR_GROUPS = [
+    ('base', re.compile(r'^(\*|:root|html|body|\.container|\.section|\.section-title|\.hidden|\.nav-[\w-]+|'
+                        r'\.navbar|\.hamburger|\.bar|\.admin-btn|\.cart-indicator|\.wishlist-indicator|'
+                        r'\.hero[\w-]*|\.cta-button|\.fade-in)$')),
+    ('products', re.compile(r'^\.(products?-[\w-]+|dropdown-[\w-]+|action-btn)$')),
+    ('testimonials', re.compile(r'^\.(testimonials?-[\w-]+|text-testimonials|video-testimonials)$')),
+    ('giveaway', re.compile(r'^\.(giveaway-[\w-]+|countdown[\w-]*|no-giveaway)$')),
+    ('videos', re.compile(r'^\.(videos-[\w-]+|video-card|video-wrapper|video-placeholder)$')),
+    ('contact', re.compile(r'^\.(contact-[\w-]+|form-group)$')),
+    ('socials', re.compile(r'^\.(footer[\w-]*|social-icons|newsletter-form)$')),
+]
+
+# Section -> scripts under static/ that initialize its widgets
+SECTION_SCRIPTS = {
+    'products': ['js/sections/products.js'],
+    'testimonials': ['js/sections/testimonials.js', 'js/sections/video-modal.js'],
+    'giveaway': ['js/sections/giveaway.js'],
+    'videos': ['js/sections/video-modal.js'],
+    'contact': ['js/sections/contact.js'],
+    'socials': ['js/sections/socials.js'],
+}
+
+_LEADING_TOKEN = re.compile(r'^(\*|:root|[.#]?[\w-]+)')
+
+
+def _selector_group(selector):
+    match = _LEADING_TOKEN.match(selector.strip())
+    if match:
+        for group, pattern in SELECTOR_GROUPS:
+            if pattern.match(match.group(1)):
+                return group
+    return None
+
+
+def _matching_brace(css, start):
+    depth = 0
+    for index in range(start, len(css)):
+        if css[index] == '{':
+            depth += 1
+        elif css[index] == '}':
+            depth -= 1
+            if depth == 0:
+                return index
+    return len(css) - 1
+
+
+def split_rules(css):
+    """
+    Group the rules of a (minified) stylesheet by SELECTOR_GROUPS.
+    Returns {group: [css text]} in source order; rules inside @media are
+    re-wrapped in their query. @keyframes and other at-rules and rules
+    that match no group are left to the full stylesheet.
+    """
+    groups = {}
+    index = 0
+    while index < len(css):
+        brace = css.find('{', index)
+        if brace == -1:
+            break
+        prelude = css[index:brace].strip()
+        end = _matching_brace(css, brace)
+        body = css[brace + 1:end]
+        if prelude.startswith('@media'):
+            for group, rules in split_rules(body).items():
+                groups.setdefault(group, []).append(f"{prelude}{{{''.join(rules)}}}")
+        elif not prelude.startswith('@'):
+            # A rule listing selectors from several groups goes with the first
+            for group in filter(None, map(_selector_group, prelude.split(','))):
+                groups.setdefault(group, []).append(f'{prelude}{{{body}}}')
+                break
+        index = end + 1
+    return groups
+
+
+class CriticalCSS:
+    """
+    Critical CSS for the storefront, cut from static/css/style.css: the
+    shared layout, navbar and hero plus the first visible section(s).
+    The split is recomputed when style.css changes.
+    """
+
+    def __init__(self, stylesheet):
+        self.stylesheet = stylesheet
+        self._mtime = None
+        self._groups = {}
+        self._rendered = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        mtime = os.stat(self.stylesheet).st_mtime_ns
+        if mtime != self._mtime:
+            with open(self.stylesheet, encoding='utf-8') as f:
+                groups = split_rules(minify_css(f.read()))
+            with self._lock:
+                self._groups, self._rendered, self._mtime = groups, {}, mtime
+
+    def render(self, sections):
+        key = tuple(sections)
+        self._load()
+        css = self._rendered.get(key)
+        if css is None:
+            css = ''.join(rule for group in ('base',) + key for rule in self._groups.get(group, []))
+            self._rendered[key] = css
+        return css
+
+
+def visible_sections(sections):
+    """Visible section names in page order, from a {section_name: visible} mapping."""
+    return [name for name in SECTION_ORDER if sections.get(name)]
+
+
+def init_app(app):
+    """Register the critical_css() and section_scripts() template globals."""
+    critical = CriticalCSS(os.path.join(app.static_folder, 'css', 'style.css'))
+
+    @app.template_global()
+    def critical_css(sections):
+        """<style> with the base rules and those of the first visible section(s)."""
+        above_fold = visible_sections(sections)[:app.config.get('CRITICAL_CSS_SECTIONS', 1)]
+        return Markup(f'<style>{critical.render(above_fold)}</style>')
+
+    @app.template_global()
+    def section_scripts(sections):
+        """Static paths of the section scripts needed by the visible sections."""
+        scripts = []
+        for name in visible_sections(sections):
+            for script in SECTION_SCRIPTS.get(name, ()):
+                if script not in scripts:
+                    scripts.append(script)
+        return scripts
+
+    return critical
@@ -1,3 +1,4 @@
+import os
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -84,6 +85,7 @@ class Giveaway(db.Model):
     image = db.Column(db.String(200), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     visible = db.Column(db.Boolean, default=True)
+    participants_count = db.Column(db.Integer, nullable=False, default=0)  # maintained by giveaways.EntryBuffer
 
     def to_dict(self):
         return {
@@ -93,6 +95,26 @@ class Giveaway(db.Model):
             "end_date": self.end_date.isoformat() if self.end_date else None,
             "image": self.image,
             "visible": self.visible,
+            "participants_count": self.participants_count or 0,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class GiveawayEntry(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    giveaway_id = db.Column(db.Integer, db.ForeignKey("giveaway.id"), nullable=False)
+    email = db.Column(db.String(150), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("giveaway_id", "email", name="uq_giveaway_entry_email"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "giveaway_id": self.giveaway_id,
+            "email": self.email,
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
 
@@ -117,6 +139,15 @@ class Message(db.Model):
     message = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     read = db.Column(db.Boolean, default=False)
+    content_hash = db.Column(db.String(40), nullable=True, index=True)  # fingerprint of normalized content
+    ip_address = db.Column(db.String(45), nullable=True)
+    spam_score = db.Column(db.Float, nullable=True)  # set by the score_message job
+    is_spam = db.Column(db.Boolean, default=False)
+
+    __table_args__ = (
+        # Admin listing: non-spam, unread first, newest first
+        db.Index("ix_message_spam_read_id", "is_spam", "read", "id"),
+    )
 
     def to_dict(self):
         return {
@@ -126,6 +157,8 @@ class Message(db.Model):
             "message": self.message,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "read": self.read,
+            "spam_score": self.spam_score,
+            "is_spam": self.is_spam,
         }
 
 
@@ -210,9 +243,15 @@ class Order(db.Model):
         }
 
 
+# Order history: "a user's orders, newest first" as a keyset scan. The listing
+# columns are included so the page is read from the index alone.
+db.Index("ix_order_user_created", Order.user_id, Order.created_at.desc(), Order.id.desc(),
+         Order.status, Order.payment_status, Order.total_amount)
+
+
 class OrderItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey("order.id"), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey("order.id"), nullable=False, index=True)
     product_id = db.Column(db.Integer, db.ForeignKey("product.id"), nullable=False)
     quantity = db.Column(db.Integer, default=1, nullable=False)
     price = db.Column(db.Float, nullable=False)  # Price at time of purchase
@@ -268,7 +307,12 @@ class Notification(db.Model):
     is_read = db.Column(db.Boolean, default=False)
     notification_type = db.Column(db.String(50), default="general")  # order, payment, system, etc.
     related_id = db.Column(db.Integer, nullable=True)  # ID of related order, payment, etc.
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        # Serves "unread notifications for user, newest first, limit N" and the stream's "id > last_id" poll
+        db.Index("ix_notification_user_read_id", "user_id", "is_read", "id"),
+    )
 
     def to_dict(self):
         return {
@@ -282,6 +326,27 @@ class Notification(db.Model):
         }
 
 
+class NotificationSummary(db.Model):
+    """Per-user, per-type, per-day counts of notifications compacted out of the Notification table."""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    notification_type = db.Column(db.String(50), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "notification_type", "day", name="uq_notification_summary"),
+    )
+
+    def to_dict(self):
+        return {
+            "user_id": self.user_id,
+            "notification_type": self.notification_type,
+            "day": self.day.isoformat() if self.day else None,
+            "count": self.count,
+        }
+
+
 class CartItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
@@ -326,95 +391,120 @@ class WishlistItem(db.Model):
         }
 
 
+class Job(db.Model):
+    """
+    Persistent background job. Rows are deleted once they succeed; jobs
+    that exhaust their attempts stay behind with status "dead" as the
+    dead-letter store.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default="{}")  # JSON keyword arguments
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued, running, dead
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index("ix_job_status_run_at", "status", "run_at"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "payload": self.payload,
+            "status": self.status,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "run_at": self.run_at.isoformat() if self.run_at else None,
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class UploadBlob(db.Model):
+    """
+    Content-addressed upload ("<sha256>.<ext>"). refcount is the number of
+    Product/Video/Giveaway/Testimonial columns naming it; the file is only
+    removed once it drops to zero.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(80), nullable=False, unique=True)
+    size = db.Column(db.Integer, nullable=False, default=0)
+    refcount = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "size": self.size,
+            "refcount": self.refcount,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+# ------------------------
+# HELPERS
+# ------------------------
+
+def dialect_insert(model):
+    """
+    INSERT construct for the bound database, so callers can attach
+    ON CONFLICT clauses (supported on SQLite and PostgreSQL).
+    """
+    dialect = db.engine.dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise NotImplementedError(f"ON CONFLICT inserts are not supported on {dialect}")
+    return insert(model)
+
+
 # ------------------------
 # DB INITIALIZER
 # ------------------------
 
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "defaults.json")
+
+
+def upgrade_schema():
+    """
+    Bring an existing database up to the current models: create_all() only
+    creates missing tables, so add missing columns and indexes here.
+    """
+    engine = db.engine
+    inspector = db.inspect(engine)
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column.type.compile(dialect=engine.dialect)}'
+                if column.default is not None and column.default.is_scalar:
+                    default = db.literal(column.default.arg).compile(
+                        dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+                    ddl += f" DEFAULT {default}"
+                conn.execute(db.text(ddl))
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
 def init_db():
-    """Initialize database with default values."""
-    db.create_all()
+    """Initialize database with default values (fixtures/defaults.json)."""
+    from fixtures import load_fixture_file
 
-    # Create default admin user
-    if not User.query.filter_by(user_type="admin").first():
-        admin = User(username="admin", email="admin@luxury.com", user_type="admin")
-        admin.set_password("admin123")
-        db.session.add(admin)
-        db.session.commit()
-
-    # Create default section visibility entries
-    sections = ["products", "testimonials", "videos", "giveaway", "contact", "socials"]
-    for section in sections:
-        if not SectionVisibility.query.filter_by(section_name=section).first():
-            db.session.add(SectionVisibility(section_name=section, visible=True))
-
-    # Add sample products if none exist
-    if Product.query.count() == 0:
-        sample_products = [
-            Product(
-                name="Premium Watch",
-                description="Elegant luxury watch with precision movement.",
-                details="Stainless steel case, sapphire crystal, water resistant up to 100m",
-                price=299.99,
-                visible=True
-            ),
-            Product(
-                name="Leather Handbag",
-                description="Handcrafted genuine leather handbag.",
-                details="Made from premium Italian leather, multiple compartments, gold hardware",
-                price=199.99,
-                visible=True
-            )
-        ]
-        for product in sample_products:
-            db.session.add(product)
-    
-    # Add sample testimonials if none exist
-    if Testimonial.query.count() == 0:
-        sample_testimonials = [
-            Testimonial(
-                author="Sarah Johnson",
-                content="The quality of these products is exceptional. I'm a customer for life!",
-                visible=True
-            ),
-            Testimonial(
-                author="Michael Chen",
-                content="Fast shipping and excellent customer service. Will definitely shop here again.",
-                visible=True
-            )
-        ]
-        for testimonial in sample_testimonials:
-            db.session.add(testimonial)
-    
-    # Add sample videos if none exist
-    if Video.query.count() == 0:
-        sample_videos = [
-            Video(
-                title="Crafting The Luxury Watch",
-                description="See how our master watchmakers create precision timepieces.",
-                video_url="https://www.youtube.com/embed/dQw4w9WgXcQ",
-                visible=True
-            ),
-            Video(
-                title="Leather Artistry",
-                description="Follow the process of creating our premium leather goods.",
-                video_url="https://www.youtube.com/embed/dQw4w9WgXcQ",
-                visible=True
-            )
-        ]
-        for video in sample_videos:
-            db.session.add(video)
-    
-    # Add sample giveaway if none exist
-    if Giveaway.query.count() == 0:
-        from datetime import timedelta
-        giveaway_end_date = datetime.utcnow() + timedelta(days=7)
-        giveaway = Giveaway(
-            title="Win Our Premium Collection",
-            description="Enter for a chance to win our luxury products!",
-            end_date=giveaway_end_date,
-            visible=True
-        )
-        db.session.add(giveaway)
-    
-    db.session.commit()
+    db.create_all()
+    upgrade_schema()
+    load_fixture_file(DEFAULT_FIXTURES)
     print("Database initialized successfully!")
\ No newline at end of file
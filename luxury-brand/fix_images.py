@@ -1,20 +1,62 @@
 # fix_images.py
-from app import app, db
-from database import Product, Giveaway, Video
+# Reconcile uploaded files with the rows that reference them.
+#   python fix_images.py                    report missing references and orphans
+#   python fix_images.py --repair           clear references to missing files, fix blob refcounts
+#   python fix_images.py --delete-orphans   remove unreferenced files older than the grace period
+# Runs incrementally from a manifest of mtimes and hashes; --full rescans everything.
+import argparse
+import json
 
-def fix_image_references():
+from app import app, db, storage
+from asset_reconcile import reconcile
+
+
+def fix_image_references(repair=True, delete_orphans=False, full=False, workers=8, hash_files=True):
     with app.app_context():
-        # Update product images
-        products = Product.query.all()
-        for product in products:
-            if product.image and not product.image.startswith('http'):
-                # Remove the image reference if file doesn't exist
-                import os
-                image_path = os.path.join(app.config['UPLOAD_FOLDER'], 'products', product.image)
-                if not os.path.exists(image_path):
-                    product.image = None
+        report = reconcile(
+            storage,
+            manifest_path=app.config.get('ASSET_MANIFEST_PATH'),
+            workers=workers,
+            full=full,
+            hash_files=hash_files,
+            repair=repair,
+            delete_orphans=delete_orphans,
+            orphan_grace=app.config.get('ASSET_ORPHAN_GRACE_SECONDS', 3600),
+        )
         db.session.commit()
-        print("Fixed product image references")
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find missing and orphaned upload files.")
+    parser.add_argument('--repair', action='store_true', help="clear references to missing files and fix blob refcounts")
+    parser.add_argument('--delete-orphans', action='store_true', help="delete files no row references")
+    parser.add_argument('--full', action='store_true', help="ignore the manifest and rescan/rehash everything")
+    parser.add_argument('--no-hash', action='store_true', help="skip content hashing (no duplicate report)")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--json', action='store_true', help="print the full report as JSON")
+    args = parser.parse_args()
+
+    report = fix_image_references(repair=args.repair, delete_orphans=args.delete_orphans, full=args.full,
+                                  workers=args.workers, hash_files=not args.no_hash)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"Scanned {report['files']} files ({report['hashed']} hashed) against {report['references']} references")
+    for item in report['missing']:
+        print(f"MISSING  {item['path']}  ({item['table']}.{item['column']} id={item['id']})")
+    for path in report['orphans']:
+        print(f"ORPHAN   {path}")
+    for paths in report['duplicates']:
+        print(f"DUPLICATE {', '.join(paths)}")
+    for item in report['refcount_drift']:
+        print(f"REFCOUNT {item['name']}  stored={item['actual']} actual={item['expected']}")
+    if args.repair:
+        print(f"Cleared {report['repaired']} missing references")
+    if args.delete_orphans:
+        print(f"Deleted {len(report['deleted'])} orphaned files")
+
 
 if __name__ == '__main__':
-    fix_image_references()
\ No newline at end of file
+    main()
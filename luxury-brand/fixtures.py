@@ -0,0 +1,277 @@
+import csv
+import json
+import os
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, Numeric, bindparam, insert, select, tuple_, update
+from werkzeug.security import generate_password_hash
+
+from database import db
+
+try:
+    import yaml
+except ImportError:  # YAML fixtures are optional
+    yaml = None
+
+CHUNK_SIZE = 5000
+
+
+class FixtureError(Exception):
+    pass
+
+
+# -------------------------
+# Reading fixture files
+# -------------------------
+def read_fixture_file(path):
+    """
+    Parse a JSON or YAML fixture file into a list of table specs.
+
+    A file holds a list of specs (or a mapping of table name -> spec),
+    applied in order:
+
+        - table: product
+          key: [name]              # columns that identify a row
+          mode: upsert             # upsert (default) or insert (never update)
+          only_if_empty: false     # seed only when the table has no rows
+          rows: [{name: ..., price: ...}]
+          rows_from: products.csv  # or load rows from a CSV next to this file
+
+    Values may be {"$ref": "user", "username": "admin"} (the id of a
+    matching row), {"$password": "secret"} (a password hash) or
+    {"$now": {"days": 7}} (a timestamp relative to now). Password and $now
+    values are only written on insert.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        raise FixtureError(f'{path}: load CSV files with load_csv() or reference them via rows_from')
+    with open(path, encoding='utf-8') as f:
+        if ext in ('.yml', '.yaml'):
+            if yaml is None:
+                raise FixtureError(f'{path}: PyYAML is required for YAML fixtures')
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+
+    if isinstance(data, dict):
+        data = [dict(spec, table=spec.get('table', name)) for name, spec in data.items()]
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for spec in data:
+        if 'rows_from' in spec:
+            spec['rows'] = read_csv_rows(os.path.join(base_dir, spec.pop('rows_from')))
+    return data
+
+
+def read_csv_rows(path):
+    """Rows of a CSV file with a header line, as dicts; empty cells become None."""
+    with open(path, newline='', encoding='utf-8') as f:
+        return [{column: (value if value != '' else None) for column, value in row.items()}
+                for row in csv.DictReader(f)]
+
+
+# -------------------------
+# Value handling
+# -------------------------
+def _table(name):
+    table = db.metadata.tables.get(name)
+    if table is None:
+        raise FixtureError(f'Unknown table {name!r}')
+    return table
+
+
+def _coerce(column, value):
+    """Convert strings from CSV/JSON/YAML to the column's Python type."""
+    if value is None or not isinstance(value, str):
+        return value
+    column_type = column.type
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, Date):
+        return date.fromisoformat(value)
+    if isinstance(column_type, Boolean):
+        return value.strip().lower() in ('1', 'true', 'yes', 'y', 't')
+    if isinstance(column_type, Integer):
+        return int(value)
+    if isinstance(column_type, (Float, Numeric)):
+        return float(value)
+    return value
+
+
+def _prepare(table, raw):
+    """Coerce one fixture row. Returns (values, columns only written on insert)."""
+    values, insert_only = {}, set()
+    for name, value in raw.items():
+        if name not in table.c:
+            raise FixtureError(f'{table.name}: unknown column {name!r}')
+        if isinstance(value, dict) and '$password' in value:
+            value = generate_password_hash(value['$password'])
+            insert_only.add(name)
+        elif isinstance(value, dict) and '$now' in value:
+            value = datetime.utcnow() + timedelta(**(value['$now'] or {}))
+            insert_only.add(name)
+        elif not (isinstance(value, dict) and '$ref' in value):
+            value = _coerce(table.c[name], value)
+        values[name] = value
+    return values, insert_only
+
+
+def _resolve_refs(rows):
+    """
+    Replace {"$ref": table, column: value, ...} values with the matching
+    row's primary key, with one query per (table, columns) referenced.
+    Nested references are resolved first.
+    """
+    refs = [(row, name, value) for row in rows for name, value in row.items()
+            if isinstance(value, dict) and '$ref' in value]
+    if not refs:
+        return
+    _resolve_refs([ref for _, _, ref in refs])
+
+    wanted = defaultdict(set)
+    for _, _, ref in refs:
+        columns = tuple(sorted(c for c in ref if c != '$ref'))
+        table = _table(ref['$ref'])
+        wanted[(ref['$ref'], columns)].add(tuple(_coerce(table.c[c], ref[c]) for c in columns))
+
+    found = {}
+    for (table_name, columns), keys in wanted.items():
+        table = _table(table_name)
+        pk = list(table.primary_key.columns)[0]
+        key_columns = [table.c[c] for c in columns]
+        keys = list(keys)
+        for start in range(0, len(keys), CHUNK_SIZE // max(len(columns), 1)):
+            chunk = keys[start:start + CHUNK_SIZE // max(len(columns), 1)]
+            condition = (key_columns[0].in_([k[0] for k in chunk]) if len(columns) == 1
+                         else tuple_(*key_columns).in_(chunk))
+            # Highest id first so the lowest matching id wins
+            for row in db.session.execute(select(pk, *key_columns).where(condition).order_by(pk.desc())):
+                found[(table_name, columns, tuple(row[1:]))] = row[0]
+
+    for row, name, ref in refs:
+        columns = tuple(sorted(c for c in ref if c != '$ref'))
+        table = _table(ref['$ref'])
+        key = tuple(_coerce(table.c[c], ref[c]) for c in columns)
+        if (ref['$ref'], columns, key) not in found:
+            raise FixtureError(f"Unresolved reference to {ref['$ref']} where {dict(zip(columns, key))}")
+        row[name] = found[(ref['$ref'], columns, key)]
+
+
+# -------------------------
+# Loading
+# -------------------------
+def _grouped(rows):
+    """executemany needs identical parameter sets, so group rows by their columns."""
+    groups = defaultdict(list)
+    for row in rows:
+        groups[tuple(sorted(row))].append(row)
+    return groups.values()
+
+
+def load_table(table_name, rows, key=None, mode='upsert', only_if_empty=False):
+    """
+    Diff `rows` against the table and apply the difference in bulk, inside
+    the caller's transaction. Existing rows are read with one query over
+    the key columns; new rows are inserted and, in upsert mode, changed
+    rows are updated, both with executemany statements.
+    Returns {'inserted', 'updated', 'unchanged'}.
+    """
+    if mode not in ('upsert', 'insert'):
+        raise FixtureError(f'{table_name}: mode must be "upsert" or "insert"')
+    table = _table(table_name)
+    stats = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+
+    if only_if_empty and db.session.execute(select(1).select_from(table).limit(1)).first():
+        stats['unchanged'] = len(rows)
+        return stats
+    if not key and not only_if_empty:
+        raise FixtureError(f'{table_name}: a key is required unless only_if_empty is set')
+
+    prepared = [_prepare(table, raw) for raw in rows]
+    _resolve_refs([values for values, _ in prepared])
+
+    if not key:
+        to_insert = [values for values, _ in prepared]
+        to_update = []
+    else:
+        key = list(key)
+        pk = list(table.primary_key.columns)[0]
+        compared = sorted({name for values, insert_only in prepared for name in values
+                           if name not in insert_only and name not in key})
+
+        # Last occurrence of a key in the fixture wins
+        incoming = {}
+        for values, insert_only in prepared:
+            if any(k not in values for k in key):
+                raise FixtureError(f'{table_name}: row is missing key columns {key}: {values}')
+            incoming[tuple(values[k] for k in key)] = (values, insert_only)
+
+        # Only rows matching the fixture's keys are read, so the cost follows the fixture, not the table
+        existing = {}
+        key_columns = [table.c[k] for k in key]
+        query = select(pk, *key_columns, *[table.c[c] for c in compared])
+        keys = list(incoming)
+        batch = CHUNK_SIZE // len(key)
+        for start in range(0, len(keys), batch):
+            chunk = keys[start:start + batch]
+            condition = (key_columns[0].in_([k[0] for k in chunk]) if len(key) == 1
+                         else tuple_(*key_columns).in_(chunk))
+            # Lowest id first so it is the row a duplicated key matches
+            for row in db.session.execute(query.where(condition).order_by(pk)):
+                existing.setdefault(tuple(row[1:1 + len(key)]), (row[0], dict(zip(compared, row[1 + len(key):]))))
+
+        to_insert, to_update = [], []
+        for row_key, (values, insert_only) in incoming.items():
+            match = existing.get(row_key)
+            if match is None:
+                to_insert.append(values)
+                continue
+            row_id, current = match
+            changes = {name: values[name] for name in compared
+                       if name in values and current[name] != values[name]}
+            if changes and mode == 'upsert':
+                changes['_pk'] = row_id
+                to_update.append(changes)
+            else:
+                stats['unchanged'] += 1
+
+    for group in _grouped(to_insert):
+        for start in range(0, len(group), CHUNK_SIZE):
+            db.session.execute(insert(table), group[start:start + CHUNK_SIZE])
+    stats['inserted'] = len(to_insert)
+
+    for group in _grouped(to_update):
+        columns = [c for c in group[0] if c != '_pk']
+        # Bind names must not clash with the column names being SET
+        stmt = (update(table)
+                .where(list(table.primary_key.columns)[0] == bindparam('_pk'))
+                .values({c: bindparam(f'_new_{c}') for c in columns}))
+        params = [{('_pk' if c == '_pk' else f'_new_{c}'): v for c, v in row.items()} for row in group]
+        for start in range(0, len(params), CHUNK_SIZE):
+            db.session.execute(stmt, params[start:start + CHUNK_SIZE])
+    stats['updated'] = len(to_update)
+    return stats
+
+
+def apply_fixtures(specs):
+    """Load a list of table specs in one transaction. Returns stats per table spec."""
+    results = []
+    try:
+        for spec in specs:
+            stats = load_table(spec['table'], spec.get('rows', []), key=spec.get('key'),
+                               mode=spec.get('mode', 'upsert'), only_if_empty=spec.get('only_if_empty', False))
+            results.append((spec['table'], stats))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return results
+
+
+def load_fixture_file(path):
+    return apply_fixtures(read_fixture_file(path))
+
+
+def load_csv(path, table_name, key=None, mode='upsert'):
+    """Load a single CSV file (header row = column names) into `table_name`."""
+    return apply_fixtures([{'table': table_name, 'rows': read_csv_rows(path), 'key': key, 'mode': mode}])
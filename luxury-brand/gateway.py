@@ -0,0 +1,109 @@
+import asyncio
+import functools
+from functools import wraps
+
+from database import db
+from metrics import gateway_call
+
+
+class GatewayCall:
+    """
+    One payment gateway API call, yielded by a gateway_view:
+
+        intent = yield GatewayCall('stripe', 'create_payment_intent',
+                                   stripe.PaymentIntent.create, amount=..., currency='usd')
+
+    The view receives the call's result, or has its exception raised at
+    the yield. With falsy_fails a falsy result (PayPal reports failure
+    that way) is counted as a gateway error without raising.
+    """
+
+    def __init__(self, provider, operation, func, *args, falsy_fails=False, **kwargs):
+        self.provider = provider
+        self.operation = operation
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.falsy_fails = falsy_fails
+
+    def run(self):
+        """Call the gateway on this thread (the WSGI path)."""
+        with gateway_call(self.provider, self.operation) as call:
+            result = self.func(*self.args, **self.kwargs)
+            if self.falsy_fails and not result:
+                call.fail()
+        return result
+
+    def async_func(self):
+        """The SDK method's `<name>_async` coroutine twin, when the SDK provides one."""
+        owner = getattr(self.func, '__self__', None)
+        name = getattr(self.func, '__name__', None)
+        candidate = getattr(owner, f'{name}_async', None) if owner is not None and name else None
+        return candidate if asyncio.iscoroutinefunction(candidate) else None
+
+    async def run_async(self, executor):
+        """
+        Await the call without holding a request thread: natively through
+        the async twin if there is one, otherwise on `executor`.
+        """
+        async_func = self.async_func()
+        with gateway_call(self.provider, self.operation) as call:
+            if async_func is not None:
+                result = await async_func(*self.args, **self.kwargs)
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    executor, functools.partial(self.func, *self.args, **self.kwargs))
+            if self.falsy_fails and not result:
+                call.fail()
+        return result
+
+
+class GatewaySteps:
+    """
+    Steps through a gateway view's generator. advance() resumes it with a
+    result (or throws an error in) and returns the next GatewayCall, or
+    None once the view has returned; its return value is then in .result.
+    The DB session is closed before every call, so no connection or
+    SQLite read transaction is held while the gateway is waiting.
+    """
+
+    def __init__(self, generator):
+        self.generator = generator
+        self.result = None
+
+    def advance(self, value=None, error=None):
+        try:
+            if error is not None:
+                call = self.generator.throw(error)
+            else:
+                call = self.generator.send(value)
+        except StopIteration as stop:
+            self.result = stop.value
+            return None
+        db.session.close()
+        return call
+
+
+def gateway_view(view):
+    """
+    Mark a route whose body is a generator yielding GatewayCalls. Under
+    WSGI the calls run inline, as before; gateway_asgi serves the same
+    body with the calls awaited, so gateway waits no longer occupy a
+    worker. ORM objects loaded before a yield are detached afterwards:
+    their loaded columns stay readable, lazy relationships do not.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        steps = GatewaySteps(view(*args, **kwargs))
+        call = steps.advance()
+        while call is not None:
+            try:
+                result = call.run()
+            except Exception as e:
+                call = steps.advance(error=e)
+            else:
+                call = steps.advance(result)
+        return steps.result
+
+    wrapper.gateway_steps = view
+    return wrapper
@@ -0,0 +1,187 @@
+# gateway_asgi.py
+# ASGI sidecar for the payment routes that wait on Stripe/PayPal. It serves the
+# same @gateway_view route bodies as the WSGI app, but awaits the gateway calls
+# on an event loop, so one worker holds many in-flight payments. Route these
+# paths to it from the reverse proxy and everything else to the WSGI app:
+#
+#   /api/create-payment-intent  /api/confirm-stripe-payment
+#   /api/create-paypal-order    /paypal-success
+#
+#   uvicorn gateway_asgi:application --port 8001   (any ASGI server works)
+#
+# Requests here bypass app.wsgi_app, so PROXY_FIX_HOPS does not apply; have the
+# ASGI server trust the proxy instead (uvicorn --proxy-headers --forwarded-allow-ips).
+#
+# SDK methods with an `<name>_async` twin are awaited directly. Otherwise the
+# blocking SDK call runs on a gateway thread pool (GATEWAY_THREADS), which only
+# waits on sockets. Request steps before and after each call, including all
+# database work, run on a small bounded pool (GATEWAY_DB_THREADS).
+import asyncio
+import contextvars
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.exceptions import NotFound
+
+from app import app as flask_app
+from gateway import GatewaySteps
+
+
+def wsgi_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope and its complete request body."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_LENGTH':
+            continue
+        key = name if name == 'CONTENT_TYPE' else f'HTTP_{name}'
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+class _Dispatch:
+    """
+    One request through Flask's dispatch (before_request hooks, the view,
+    after_request hooks, session save, teardown), split at the gateway
+    calls. Every step runs in the request's own contextvars context, so
+    the request context stays pushed across the pool threads that run it.
+    """
+
+    def __init__(self, app, environ):
+        self.app = app
+        self.context = contextvars.copy_context()
+        self.ctx = app.request_context(environ)
+        self.steps = None
+        self.rv = None
+        self.error = None
+
+    def step(self, value=None, error=None):
+        return self.context.run(self._step, value, error)
+
+    def _step(self, value, error):
+        try:
+            try:
+                if self.steps is None:
+                    self.ctx.push()
+                    rv = self.app.preprocess_request()
+                    if rv is not None:
+                        self.rv = rv
+                        return None
+                    request = self.ctx.request
+                    if request.routing_exception is not None:
+                        self.app.raise_routing_exception(request)
+                    view = getattr(self.app.view_functions[request.url_rule.endpoint], 'gateway_steps', None)
+                    if view is None:
+                        raise NotFound()
+                    self.steps = GatewaySteps(view(**request.view_args))
+                    call = self.steps.advance()
+                else:
+                    call = self.steps.advance(value, error)
+                if call is None:
+                    self.rv = self.steps.result
+                return call
+            except Exception as e:
+                self.rv = self.app.handle_user_exception(e)
+        except Exception as e:
+            self.error = e
+            self.rv = self.app.handle_exception(e)
+        return None
+
+    def finish(self):
+        return self.context.run(self._finish)
+
+    def _finish(self):
+        try:
+            response = self.app.finalize_request(self.rv)
+            status = response.status_code
+            headers = [(key.encode('latin-1'), value.encode('latin-1')) for key, value in response.headers.items()]
+            body = response.get_data()
+            response.close()
+            return status, headers, body
+        finally:
+            self.ctx.pop(self.error)
+
+
+class GatewayASGI:
+    """ASGI application serving the app's @gateway_view routes; other paths get 404."""
+
+    def __init__(self, app, gateway_threads=64, db_threads=4):
+        self.app = app
+        self.gateway_pool = ThreadPoolExecutor(gateway_threads, thread_name_prefix='gateway')
+        self.db_pool = ThreadPoolExecutor(db_threads, thread_name_prefix='gateway-db')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            body = await self._read_body(receive)
+            status, headers, body = await self.handle(wsgi_environ(scope, body))
+            await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': body})
+
+    async def handle(self, environ):
+        """(status, headers, body) for one request."""
+        loop = asyncio.get_running_loop()
+        dispatch = _Dispatch(self.app, environ)
+        call = await loop.run_in_executor(self.db_pool, dispatch.step)
+        while call is not None:
+            try:
+                result = await call.run_async(self.gateway_pool)
+            except Exception as e:
+                call = await loop.run_in_executor(self.db_pool, dispatch.step, None, e)
+            else:
+                call = await loop.run_in_executor(self.db_pool, dispatch.step, result)
+        return await loop.run_in_executor(self.db_pool, dispatch.finish)
+
+    @staticmethod
+    async def _read_body(receive):
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+        return b''.join(chunks)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.gateway_pool.shutdown(wait=False)
+                self.db_pool.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_application(app):
+    return GatewayASGI(app,
+                       gateway_threads=app.config.get('GATEWAY_THREADS', 64),
+                       db_threads=app.config.get('GATEWAY_DB_THREADS', 4))
+
+
+application = create_application(flask_app)
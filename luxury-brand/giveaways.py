@@ -0,0 +1,148 @@
+import atexit
+import math
+import random
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+from database import db, Giveaway, GiveawayEntry, dialect_insert
+
+
+class EntryBuffer:
+    """
+    Collects giveaway entries in memory and writes them in batches.
+
+    Each flush is one transaction: a multi-row INSERT ... ON CONFLICT DO
+    NOTHING per giveaway plus an UPDATE that adds the number of rows
+    actually inserted to Giveaway.participants_count. Requests only append
+    to a list, so a launch spike turns into a few writes per second
+    instead of one transaction per entrant.
+    """
+
+    def __init__(self, app, batch_size=500, flush_interval=0.5, max_pending=20000):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def add(self, giveaway_id, email):
+        with self._lock:
+            self._pending.append((giveaway_id, email))
+            pending = len(self._pending)
+        self._ensure_flusher()
+        if pending >= self.max_pending:
+            # Back-pressure: the flusher is behind, so write from the request thread
+            self.flush()
+        elif pending >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write everything buffered so far. Returns the number of new entries."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            by_giveaway = defaultdict(set)
+            for giveaway_id, email in batch:
+                by_giveaway[giveaway_id].add(email)
+            with self.app.app_context():
+                try:
+                    inserted = self._write(by_giveaway)
+                    db.session.commit()
+                    return inserted
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception("Failed to flush %s giveaway entries", len(batch))
+                    # Put the batch back; the unique constraint makes the retry safe
+                    with self._lock:
+                        if len(self._pending) + len(batch) <= self.max_pending:
+                            self._pending[:0] = batch
+                        else:
+                            self.app.logger.error("Dropping %s giveaway entries after failed flush", len(batch))
+                    return 0
+
+    def _write(self, by_giveaway):
+        inserted_total = 0
+        now = datetime.utcnow()
+        for giveaway_id, emails in by_giveaway.items():
+            stmt = dialect_insert(GiveawayEntry.__table__).on_conflict_do_nothing(index_elements=['giveaway_id', 'email'])
+            result = db.session.execute(stmt, [
+                {'giveaway_id': giveaway_id, 'email': email, 'created_at': now} for email in emails
+            ])
+            inserted = result.rowcount
+            if inserted is None or inserted < 0:
+                # Driver cannot report executemany row counts; recount this giveaway instead
+                count = GiveawayEntry.query.filter_by(giveaway_id=giveaway_id).count()
+                Giveaway.query.filter_by(id=giveaway_id).update(
+                    {Giveaway.participants_count: count}, synchronize_session=False)
+            elif inserted:
+                Giveaway.query.filter_by(id=giveaway_id).update(
+                    {Giveaway.participants_count: Giveaway.participants_count + inserted},
+                    synchronize_session=False)
+                inserted_total += inserted
+        return inserted_total
+
+    def _ensure_flusher(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='giveaway-entry-flusher', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+def draw_winners(giveaway_id, count=1, rng=None, chunk_size=10000):
+    """
+    Pick `count` distinct entries uniformly at random in one streaming pass
+    (reservoir sampling, Algorithm L). Memory is O(count) and the number of
+    random draws grows with log(entries), so this stays cheap for millions
+    of entries.
+    """
+    if count <= 0:
+        return []
+    rng = rng or random.SystemRandom()
+
+    def uniform():
+        # Uniform on the open interval (0, 1), safe to take logs of
+        u = rng.random()
+        while u == 0.0:
+            u = rng.random()
+        return u
+
+    rows = (db.session.query(GiveawayEntry.email)
+            .filter(GiveawayEntry.giveaway_id == giveaway_id)
+            .execution_options(yield_per=chunk_size))
+    emails = (email for (email,) in rows)
+
+    reservoir = []
+    for email in emails:
+        reservoir.append(email)
+        if len(reservoir) == count:
+            break
+    if len(reservoir) < count:
+        return reservoir
+
+    w = math.exp(math.log(uniform()) / count)
+    while True:
+        skip = math.floor(math.log(uniform()) / math.log(1 - w))
+        for _ in range(skip):
+            if next(emails, None) is None:
+                return reservoir
+        email = next(emails, None)
+        if email is None:
+            return reservoir
+        reservoir[rng.randrange(count)] = email
+        w *= math.exp(math.log(uniform()) / count)
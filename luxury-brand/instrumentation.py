@@ -0,0 +1,227 @@
+import bisect
+import logging
+import os
+import threading
+import time
+import traceback
+
+from flask import before_render_template, g, has_app_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('perf')
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_THIS_FILE = os.path.abspath(__file__)
+
+# Upper bounds in milliseconds; the last bucket is open-ended
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, float('inf'))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; constant memory, O(log buckets) per sample."""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.total = 0
+        self.sum_ms = 0.0
+
+    def add(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+
+    def merge(self, other):
+        merged = Histogram()
+        merged.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        merged.total = self.total + other.total
+        merged.sum_ms = self.sum_ms + other.sum_ms
+        return merged
+
+    def percentile(self, p):
+        """Estimate the p-th percentile by interpolating inside the bucket that holds it."""
+        if not self.total:
+            return None
+        rank = p / 100.0 * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = BUCKETS_MS[index - 1] if index else 0.0
+                upper = BUCKETS_MS[index]
+                if upper == float('inf'):
+                    return lower
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return BUCKETS_MS[-2]
+
+
+class RollingHistogram:
+    """
+    Latency histogram over roughly the last `window` seconds, kept as a
+    current and a previous half-window that rotate.
+    """
+
+    def __init__(self, window=300):
+        self.half = window / 2.0
+        self._lock = threading.Lock()
+        self._current = Histogram()
+        self._previous = Histogram()
+        self._rotated_at = time.monotonic()
+
+    def _rotate(self, now):
+        elapsed = now - self._rotated_at
+        if elapsed >= self.half:
+            self._previous = self._current if elapsed < 2 * self.half else Histogram()
+            self._current = Histogram()
+            self._rotated_at = now
+
+    def add(self, ms):
+        with self._lock:
+            self._rotate(time.monotonic())
+            self._current.add(ms)
+
+    def snapshot(self):
+        with self._lock:
+            self._rotate(time.monotonic())
+            return self._current.merge(self._previous)
+
+
+class RequestStats:
+    __slots__ = ('started', 'db_ms', 'query_count', 'template_ms', 'template_starts', 'statements', 'flagged')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_ms = 0.0
+        self.query_count = 0
+        self.template_ms = 0.0
+        self.template_starts = []
+        self.statements = {}
+        self.flagged = set()
+
+
+def call_site():
+    """First stack frame inside the application (outside this module and libraries)."""
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith('<'):
+            continue
+        filename = os.path.abspath(frame.filename)
+        if filename != _THIS_FILE and filename.startswith(_APP_DIR) and 'site-packages' not in filename:
+            return f'{os.path.relpath(filename, _APP_DIR)}:{frame.lineno} in {frame.name}'
+    return 'unknown'
+
+
+def _current_stats():
+    if has_app_context():
+        return g.get('_perf')
+    return None
+
+
+class Instrumentation:
+    """
+    Per-request timing: wall time, database time and query count, template
+    render time. Emits a Server-Timing header, keeps a rolling latency
+    histogram per endpoint, logs slow queries with their call site and
+    flags statements repeated often enough to look like N+1 loading.
+    """
+
+    def __init__(self, app=None):
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self.slow_query_ms = 100
+        self.n_plus_one_threshold = 10
+        self.window = 300
+        self.server_timing = True
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('PERF_INSTRUMENTATION', True):
+            return
+        self.slow_query_ms = app.config.get('PERF_SLOW_QUERY_MS', 100)
+        self.n_plus_one_threshold = app.config.get('PERF_N_PLUS_ONE_THRESHOLD', 10)
+        self.window = app.config.get('PERF_WINDOW_SECONDS', 300)
+        self.server_timing = app.config.get('PERF_SERVER_TIMING', True)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        app.extensions['instrumentation'] = self
+
+    # Request hooks
+    def _before_request(self):
+        g._perf = RequestStats()
+
+    def _after_request(self, response):
+        stats = g.pop('_perf', None)
+        if stats is None:
+            return response
+        total_ms = (time.perf_counter() - stats.started) * 1000
+        self.histogram(request.endpoint or 'unmatched').add(total_ms)
+        if self.server_timing:
+            response.headers['Server-Timing'] = (
+                f'app;dur={total_ms:.1f}, '
+                f'db;dur={stats.db_ms:.1f};desc="{stats.query_count} queries", '
+                f'tpl;dur={stats.template_ms:.1f}'
+            )
+        return response
+
+    def histogram(self, endpoint):
+        histogram = self.histograms.get(endpoint)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(endpoint, RollingHistogram(self.window))
+        return histogram
+
+    # SQLAlchemy hooks
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_perf_query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('_perf_query_start')
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+
+        if elapsed_ms >= self.slow_query_ms:
+            logger.warning('Slow query (%.1f ms) at %s: %s', elapsed_ms, call_site(), ' '.join(statement.split())[:500])
+
+        stats = _current_stats()
+        if stats is None:
+            return
+        stats.db_ms += elapsed_ms
+        stats.query_count += 1
+        seen = stats.statements[statement] = stats.statements.get(statement, 0) + 1
+        if seen == self.n_plus_one_threshold and statement not in stats.flagged:
+            stats.flagged.add(statement)
+            logger.warning('Possible N+1: statement ran %d times in %s at %s: %s', seen,
+                           request.endpoint, call_site(), ' '.join(statement.split())[:300])
+
+    # Template hooks
+    def _before_render(self, sender, template, context, **extra):
+        stats = _current_stats()
+        if stats is not None:
+            stats.template_starts.append(time.perf_counter())
+
+    def _after_render(self, sender, template, context, **extra):
+        stats = _current_stats()
+        if stats is not None and stats.template_starts:
+            stats.template_ms += (time.perf_counter() - stats.template_starts.pop()) * 1000
+
+    def report(self):
+        """Per-endpoint request count and latency percentiles (ms) over the rolling window."""
+        result = {}
+        for endpoint, rolling in list(self.histograms.items()):
+            snapshot = rolling.snapshot()
+            if not snapshot.total:
+                continue
+            result[endpoint] = {
+                'count': snapshot.total,
+                'mean_ms': round(snapshot.sum_ms / snapshot.total, 2),
+                'p50_ms': round(snapshot.percentile(50), 2),
+                'p90_ms': round(snapshot.percentile(90), 2),
+                'p99_ms': round(snapshot.percentile(99), 2),
+            }
+        return result
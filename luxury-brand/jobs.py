@@ -0,0 +1,213 @@
+import json
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from database import db, Job
+
+# name -> callable(**payload)
+_handlers = {}
+
+# Set when a job is committed so an idle worker wakes up immediately
+_wakeup = threading.Event()
+
+
+def job_handler(name):
+    """Register a function as the handler for jobs called `name`."""
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, max_attempts=None, delay=None, **payload):
+    """
+    Queue a job in the current session. It is committed together with the
+    caller's own writes, so a job exists if and only if the request's
+    transaction succeeded.
+    """
+    if name not in _handlers:
+        raise KeyError(f"No job handler registered for {name!r}")
+    job = Job(
+        name=name,
+        payload=json.dumps(payload),
+        status='queued',
+        attempts=0,
+        run_at=datetime.utcnow() + timedelta(seconds=delay or 0),
+    )
+    if max_attempts is not None:
+        job.max_attempts = max_attempts
+    db.session.add(job)
+    return job
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_new_jobs(session, flush_context):
+    if any(isinstance(obj, Job) for obj in session.new):
+        session.info['jobs_enqueued'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _wake_worker(session):
+    if session.info.pop('jobs_enqueued', False):
+        _wakeup.set()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_wakeup(session):
+    session.info.pop('jobs_enqueued', None)
+
+
+# -------------------------
+# Execution
+# -------------------------
+def _claim_next():
+    """
+    Atomically move one due job from queued to running. The conditional
+    UPDATE makes claiming safe across threads and worker processes.
+    """
+    while True:
+        now = datetime.utcnow()
+        job_id = (db.session.query(Job.id)
+                  .filter(Job.status == 'queued', Job.run_at <= now)
+                  .order_by(Job.run_at, Job.id)
+                  .limit(1)
+                  .scalar())
+        if job_id is None:
+            db.session.commit()
+            return None
+        claimed = (Job.query
+                   .filter(Job.id == job_id, Job.status == 'queued')
+                   .update({Job.status: 'running', Job.attempts: Job.attempts + 1, Job.locked_at: now},
+                           synchronize_session=False))
+        db.session.commit()
+        if claimed:
+            return db.session.get(Job, job_id)
+
+
+def _run(job, logger):
+    handler = _handlers.get(job.name)
+    try:
+        if handler is None:
+            raise KeyError(f"No job handler registered for {job.name!r}")
+        handler(**json.loads(job.payload or '{}'))
+    except Exception:
+        db.session.rollback()
+        error = traceback.format_exc(limit=5)
+        job = db.session.get(Job, job.id)
+        job.last_error = error
+        job.locked_at = None
+        if job.attempts >= job.max_attempts:
+            job.status = 'dead'
+            logger.error("Job %s (%s) moved to dead-letter after %s attempts", job.id, job.name, job.attempts)
+        else:
+            job.status = 'queued'
+            job.run_at = datetime.utcnow() + timedelta(seconds=2 ** job.attempts)
+            logger.warning("Job %s (%s) failed, retrying: %s", job.id, job.name, error.strip().splitlines()[-1])
+        db.session.commit()
+        return False
+
+    db.session.delete(job)
+    db.session.commit()
+    return True
+
+
+def requeue_stale(visibility_timeout):
+    """Return jobs left running by a crashed worker to the queue."""
+    cutoff = datetime.utcnow() - timedelta(seconds=visibility_timeout)
+    count = (Job.query
+             .filter(Job.status == 'running', Job.locked_at < cutoff)
+             .update({Job.status: 'queued', Job.locked_at: None}, synchronize_session=False))
+    db.session.commit()
+    return count
+
+
+def requeue_dead(job_ids):
+    """Move dead-lettered jobs back to the queue with a fresh attempt budget; caller commits."""
+    return (Job.query
+            .filter(Job.id.in_(job_ids), Job.status == 'dead')
+            .update({Job.status: 'queued', Job.attempts: 0, Job.run_at: datetime.utcnow(), Job.last_error: None},
+                    synchronize_session=False))
+
+
+def run_pending(app, limit=None):
+    """Drain due jobs synchronously (tests, scripts). Returns the number processed."""
+    processed = 0
+    with app.app_context():
+        while limit is None or processed < limit:
+            job = _claim_next()
+            if job is None:
+                break
+            _run(job, app.logger)
+            processed += 1
+    return processed
+
+
+def queue_depth():
+    """Count of jobs per (name, status), for monitoring."""
+    rows = db.session.query(Job.name, Job.status, db.func.count()).group_by(Job.name, Job.status).all()
+    return {(name, status): count for name, status, count in rows}
+
+
+class JobWorker(threading.Thread):
+    """Daemon thread that runs queued jobs inside the Flask app context."""
+
+    def __init__(self, app):
+        super().__init__(name='job-worker', daemon=True)
+        self.app = app
+        self.poll_interval = app.config.get('JOB_POLL_INTERVAL', 1.0)
+        self.visibility_timeout = app.config.get('JOB_VISIBILITY_TIMEOUT', 300)
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+        _wakeup.set()
+
+    def run(self):
+        last_reap = 0
+        while not self._stop_event.is_set():
+            _wakeup.clear()
+            try:
+                with self.app.app_context():
+                    if time.monotonic() - last_reap > self.visibility_timeout:
+                        requeue_stale(self.visibility_timeout)
+                        last_reap = time.monotonic()
+                    job = _claim_next()
+                    if job is not None:
+                        _run(job, self.app.logger)
+                        continue
+            except Exception:
+                self.app.logger.exception("Job worker error")
+            _wakeup.wait(self.poll_interval)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def start_worker(app):
+    """Start this process's worker thread once."""
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = JobWorker(app)
+            _worker.start()
+    return _worker
+
+
+def init_app(app):
+    """
+    Start the worker lazily on the first request, so one-off scripts that
+    import the app do not spin up a worker.
+    """
+    if not app.config.get('JOB_WORKER_ENABLED', True):
+        return
+
+    @app.before_request
+    def _ensure_job_worker():
+        if _worker is None or not _worker.is_alive():
+            start_worker(app)
@@ -0,0 +1,40 @@
+# manage_subscribers.py
+# Bulk newsletter list import/export.
+#   python manage_subscribers.py import list.csv
+#   python manage_subscribers.py export subscribers.csv
+import argparse
+import sys
+
+from app import app
+from subscribers import import_csv, export_csv
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import or export newsletter subscribers as CSV.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help="load addresses from a CSV file")
+    import_parser.add_argument('path', help="CSV file, or - for stdin")
+    import_parser.add_argument('--batch-size', type=int, default=5000)
+
+    export_parser = subparsers.add_parser('export', help="write all subscribers to a CSV file")
+    export_parser.add_argument('path', help="output file, or - for stdout")
+
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.command == 'import':
+            stream = sys.stdin if args.path == '-' else open(args.path, newline='', encoding='utf-8')
+            with stream:
+                stats = import_csv(stream, batch_size=args.batch_size)
+            print(f"Read {stats['read']} rows: {stats['inserted']} added, "
+                  f"{stats['duplicates']} duplicates, {stats['invalid']} invalid")
+        else:
+            stream = sys.stdout if args.path == '-' else open(args.path, 'w', newline='', encoding='utf-8')
+            with stream:
+                for chunk in export_csv():
+                    stream.write(chunk)
+
+
+if __name__ == '__main__':
+    main()
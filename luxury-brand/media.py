@@ -0,0 +1,207 @@
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+
+from flask import Response, current_app, request
+from werkzeug.datastructures import Range
+from werkzeug.wsgi import wrap_file
+
+# Precompressed siblings tried in order when the client accepts them
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _any_satisfiable(range_header, length):
+    """Whether any single range of a Range header overlaps a body of `length` bytes."""
+    return any(Range(range_header.units, [part]).range_for_length(length) is not None
+               for part in range_header.ranges)
+
+
+class _OpenFile:
+    __slots__ = ('fd', 'size', 'mtime_ns', 'ino', 'refs', 'evicted')
+
+    def __init__(self, fd, stat):
+        self.fd = fd
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.ino = stat.st_ino
+        self.refs = 0
+        self.evicted = False
+
+
+class FileDescriptorCache:
+    """
+    LRU of open read-only descriptors for hot files. Readers use os.pread,
+    which has no shared file position, so one descriptor serves any number
+    of concurrent requests. Entries are checked against a fresh stat() and
+    reopened if the file was replaced; evicted descriptors close once the
+    last reader releases them.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._files = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, path, stat):
+        with self._lock:
+            handle = self._files.get(path)
+            if handle is not None and (handle.ino, handle.mtime_ns, handle.size) == (
+                    stat.st_ino, stat.st_mtime_ns, stat.st_size):
+                self._files.move_to_end(path)
+                handle.refs += 1
+                return handle
+            if handle is not None:
+                self._evict(path)
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0))
+        handle = _OpenFile(fd, os.fstat(fd))
+        handle.refs = 1
+        with self._lock:
+            if path in self._files:
+                self._evict(path)
+            self._files[path] = handle
+            while len(self._files) > self.maxsize:
+                self._evict(next(iter(self._files)))
+        return handle
+
+    def release(self, handle):
+        with self._lock:
+            handle.refs -= 1
+            if handle.evicted and handle.refs == 0:
+                os.close(handle.fd)
+
+    def _evict(self, path):
+        handle = self._files.pop(path)
+        handle.evicted = True
+        if handle.refs == 0:
+            os.close(handle.fd)
+
+    def clear(self):
+        with self._lock:
+            for path in list(self._files):
+                self._evict(path)
+
+
+class _PreadBody:
+    """Response body reading [start, end) with os.pread; close() releases the descriptor."""
+
+    def __init__(self, cache, handle, start, end, chunk_size):
+        self.cache = cache
+        self.handle = handle
+        self.start = start
+        self.end = end
+        self.chunk_size = chunk_size
+        self._released = False
+
+    def __iter__(self):
+        offset = self.start
+        while offset < self.end:
+            data = os.pread(self.handle.fd, min(self.chunk_size, self.end - offset), offset)
+            if not data:
+                break
+            offset += len(data)
+            yield data
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self.cache.release(self.handle)
+
+
+_fd_cache = None
+
+
+def _get_fd_cache():
+    global _fd_cache
+    if _fd_cache is None:
+        _fd_cache = FileDescriptorCache(current_app.config.get('MEDIA_FD_CACHE_SIZE', 256))
+    return _fd_cache
+
+
+def _pick_variant(path):
+    """(path, content-encoding) of the best precompressed sibling the client accepts."""
+    for encoding, suffix in PRECOMPRESSED:
+        if request.accept_encodings[encoding] and os.path.isfile(path + suffix):
+            return path + suffix, encoding
+    return path, None
+
+
+def send_media(path, key, etag=None, cache_control=None, offload=None):
+    """
+    Serve a file from upload storage with conditional and Range support.
+
+    `key` is the storage key, used to build the X-Accel-Redirect location.
+    `etag` defaults to one derived from size and mtime. Depending on
+    `offload` (default MEDIA_OFFLOAD), the bytes are sent by the proxy
+    (x-accel-redirect, x-sendfile), by the WSGI server's file_wrapper
+    (sendfile) or from a cached descriptor with os.pread.
+    """
+    config = current_app.config
+    served_path, encoding = _pick_variant(path)
+    try:
+        stat = os.stat(served_path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+    mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    tag = etag or f'{stat.st_size:x}-{stat.st_mtime_ns:x}'
+    if encoding:
+        tag = f'{tag}-{encoding}'
+
+    response = Response(mimetype=mimetype)
+    response.set_etag(tag)
+    response.last_modified = stat.st_mtime
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if cache_control:
+        response.headers['Cache-Control'] = cache_control
+
+    if request.if_none_match:
+        if request.if_none_match.contains_weak(tag):
+            response.status_code = 304
+            return response
+    elif request.if_modified_since and int(stat.st_mtime) <= request.if_modified_since.timestamp():
+        response.status_code = 304
+        return response
+
+    if offload is None:
+        offload = config.get('MEDIA_OFFLOAD', '')
+    if offload == 'x-accel-redirect':
+        # nginx serves the internal location itself (sendfile, Range, HEAD)
+        suffix = served_path[len(path):]
+        response.headers['X-Accel-Redirect'] = config.get('MEDIA_ACCEL_PREFIX', '/_uploads/') + key + suffix
+        return response
+    if offload == 'x-sendfile':
+        response.headers['X-Sendfile'] = os.path.abspath(served_path)
+        return response
+
+    start, end = 0, stat.st_size
+    if_range = request.if_range  # always an object; empty when the header is absent
+    if request.range and (not (if_range.etag or if_range.date) or if_range.etag == tag
+                          or (if_range.date and int(stat.st_mtime) <= if_range.date.timestamp())):
+        byte_range = request.range.range_for_length(stat.st_size)
+        if byte_range is not None:
+            start, end = byte_range
+            response.status_code = 206
+            response.headers['Content-Range'] = f'bytes {start}-{end - 1}/{stat.st_size}'
+        elif not _any_satisfiable(request.range, stat.st_size):
+            response.status_code = 416
+            response.headers['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+        # Otherwise a multi-range request we do not serve: the full body, as RFC 9110 allows
+    response.content_length = end - start
+
+    if request.method == 'HEAD':
+        return response
+
+    chunk_size = config.get('MEDIA_CHUNK_SIZE', 256 * 1024)
+    if offload == 'sendfile' and response.status_code == 200:
+        # Servers such as gunicorn turn file_wrapper into os.sendfile
+        response.response = wrap_file(request.environ, open(served_path, 'rb'), chunk_size)
+    else:
+        cache = _get_fd_cache()
+        response.response = _PreadBody(cache, cache.acquire(served_path, stat), start, end, chunk_size)
+    response.direct_passthrough = True
+    return response
@@ -0,0 +1,331 @@
+import ipaddress
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+
+# Request latency buckets in seconds (Prometheus client defaults)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Shards:
+    """
+    Per-thread storage for metric samples. Each worker thread only ever
+    writes its own dict, so the hot path takes no lock; the scrape merges
+    all shards and folds those of finished threads into a retired total.
+    """
+
+    def __init__(self, merge):
+        self._merge = merge
+        self._local = threading.local()
+        self._shards = []
+        self._retired = {}
+        self._lock = threading.Lock()
+
+    def mine(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def collect(self):
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    self._merge(self._retired, dict(shard))
+            self._shards = live
+            total = {}
+            self._merge(total, self._retired)
+            for _, shard in live:
+                self._merge(total, dict(shard))
+        return total
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}, got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._shards = _Shards(self._merge)
+
+    @staticmethod
+    def _merge(into, shard):
+        for key, value in shard.items():
+            into[key] = into.get(key, 0) + value
+
+    def inc(self, amount=1, **labels):
+        shard = self._shards.mine()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def samples(self):
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+            for key, value in sorted(self._shards.collect().items())
+        ]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(buckets)
+        if self.buckets[-1] != float('inf'):
+            self.buckets += (float('inf'),)
+        super().__init__(name, documentation, labelnames, registry)
+        self._shards = _Shards(self._merge)
+
+    @staticmethod
+    def _merge(into, shard):
+        for key, (counts, total) in shard.items():
+            current = into.get(key)
+            if current is None:
+                into[key] = (list(counts), total)
+            else:
+                into[key] = ([a + b for a, b in zip(current[0], counts)], current[1] + total)
+
+    def observe(self, value, **labels):
+        shard = self._shards.mine()
+        key = self._key(labels)
+        entry = shard.get(key)
+        if entry is None:
+            entry = shard[key] = ([0] * len(self.buckets), 0.0)
+        counts, total = entry
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+                break
+        shard[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        lines = []
+        for key, (counts, total) in sorted(self._shards.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Gauge(Metric):
+    """
+    Point-in-time value. Either set directly, or give a `callback` that
+    returns an iterable of (labels dict, value) pairs read at scrape time.
+    """
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), callback=None, registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.callback = callback
+        self._values = {}
+
+    def set(self, value, **labels):
+        self._values[self._key(labels)] = value
+
+    def samples(self):
+        if self.callback is not None:
+            values = {self._key(labels): value for labels, value in self.callback()}
+        else:
+            values = dict(self._values)
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+            for key, value in sorted(values.items())
+        ]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if any(existing.name == metric.name for existing in self._metrics):
+                raise ValueError(f'Metric {metric.name} already registered')
+            self._metrics.append(metric)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in list(self._metrics):
+            try:
+                samples = metric.samples()
+            except Exception:
+                # A failing collector (e.g. database down) must not hide the rest
+                continue
+            lines.extend(metric.header())
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# -------------------------
+# Application metrics
+# -------------------------
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by route name.', ('endpoint', 'method'))
+REQUESTS = Counter(
+    'http_requests_total', 'Requests by route name and status code.', ('endpoint', 'method', 'status'))
+GATEWAY_LATENCY = Histogram(
+    'payment_gateway_request_duration_seconds', 'Stripe/PayPal API call latency.', ('provider', 'operation'))
+GATEWAY_ERRORS = Counter(
+    'payment_gateway_errors_total', 'Stripe/PayPal API calls that raised or reported failure.',
+    ('provider', 'operation'))
+
+_caches = {}
+
+
+def register_cache(name, cache):
+    """Export hit/miss counters and size of an LRUCache under `name`."""
+    _caches[name] = cache
+
+
+def _cache_stats(field):
+    def collect():
+        for name, cache in list(_caches.items()):
+            yield {'cache': name}, cache.stats()[field]
+    return collect
+
+
+Gauge('cache_hits', 'Cache hits since start.', ('cache',), callback=_cache_stats('hits'))
+Gauge('cache_misses', 'Cache misses since start.', ('cache',), callback=_cache_stats('misses'))
+Gauge('cache_hit_ratio', 'Cache hits / lookups since start.', ('cache',), callback=_cache_stats('hit_ratio'))
+Gauge('cache_entries', 'Entries currently cached.', ('cache',), callback=_cache_stats('size'))
+
+
+class _GatewayCall:
+    def __init__(self):
+        self.failed = False
+
+    def fail(self):
+        """Count the call as an error without raising (PayPal reports failure via return values)."""
+        self.failed = True
+
+
+@contextmanager
+def gateway_call(provider, operation):
+    """
+    Time a payment gateway API call and count failures:
+
+        with gateway_call('stripe', 'create_intent'):
+            stripe.PaymentIntent.create(...)
+    """
+    call = _GatewayCall()
+    started = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        call.failed = True
+        raise
+    finally:
+        GATEWAY_LATENCY.observe(time.perf_counter() - started, provider=provider, operation=operation)
+        if call.failed:
+            GATEWAY_ERRORS.inc(provider=provider, operation=operation)
+
+
+def ip_allowed(address, allowed):
+    """Whether address falls in `allowed`, a comma-separated list of addresses and CIDRs."""
+    if not address or not allowed:
+        return False
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    for network in allowed.split(','):
+        network = network.strip()
+        try:
+            if network and ip in ipaddress.ip_network(network, strict=False):
+                return True
+        except ValueError:
+            continue
+    return False
+
+
+def init_app(app, db, queue_depth=None):
+    """Time every request and export DB pool and job queue gauges."""
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop('_metrics_started', None)
+        if started is not None:
+            endpoint = request.endpoint or 'unmatched'
+            REQUEST_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method)
+            REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+        return response
+
+    def pool_stats():
+        pool = db.engine.pool
+        for state in ('size', 'checkedout', 'checkedin', 'overflow'):
+            reader = getattr(pool, state, None)
+            if callable(reader):
+                yield {'state': state}, reader()
+
+    Gauge('db_pool_connections', 'SQLAlchemy connection pool state.', ('state',), callback=pool_stats)
+
+    if queue_depth is not None:
+        def job_depth():
+            for (name, status), count in queue_depth().items():
+                yield {'job': name, 'status': status}, count
+
+        Gauge('job_queue_depth', 'Background jobs by name and status.', ('job', 'status'), callback=job_depth)
@@ -0,0 +1,219 @@
+import json
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from database import db, Notification, NotificationSummary, dialect_insert
+
+
+class NotificationBroker:
+    """
+    In-process wake-up channel for notification listeners.
+
+    Publishers record which users received new notifications; listeners
+    block until their user is touched or the timeout expires, then read the
+    rows themselves. The broker carries no payloads, so a listener that
+    times out and polls the database also sees notifications committed by
+    other worker processes.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._last_seq_by_user = {}
+
+    def current_seq(self):
+        with self._cond:
+            return self._seq
+
+    def publish(self, user_ids):
+        if not user_ids:
+            return
+        with self._cond:
+            self._seq += 1
+            for user_id in user_ids:
+                self._last_seq_by_user[user_id] = self._seq
+            self._cond.notify_all()
+
+    def wait(self, user_id, since_seq, timeout):
+        """
+        Block until `user_id` has news after `since_seq` or `timeout` passes.
+        Returns (woken, current_seq).
+        """
+        with self._cond:
+            woken = self._cond.wait_for(lambda: self._last_seq_by_user.get(user_id, 0) > since_seq, timeout)
+            return woken, self._seq
+
+
+broker = NotificationBroker()
+
+
+# -------------------------
+# Session hooks: publish after the notification rows are committed
+# -------------------------
+@event.listens_for(Session, 'after_flush')
+def _collect_new_notifications(session, flush_context):
+    user_ids = {obj.user_id for obj in session.new if isinstance(obj, Notification)}
+    if user_ids:
+        session.info.setdefault('notified_user_ids', set()).update(user_ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_new_notifications(session):
+    broker.publish(session.info.pop('notified_user_ids', None))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_new_notifications(session):
+    session.info.pop('notified_user_ids', None)
+
+
+# -------------------------
+# Queries
+# -------------------------
+def unread_notifications(user_id, limit):
+    return (Notification.query
+            .filter_by(user_id=user_id, is_read=False)
+            .order_by(Notification.id.desc())
+            .limit(limit)
+            .all())
+
+
+def mark_read(user_id, ids):
+    """Flag the given notifications read with a single UPDATE; caller commits."""
+    if not ids:
+        return 0
+    return (Notification.query
+            .filter(Notification.user_id == user_id, Notification.id.in_(ids), Notification.is_read.is_(False))
+            .update({Notification.is_read: True}, synchronize_session=False))
+
+
+def mark_read_range(user_id, from_id=None, to_id=None):
+    """Flag every unread notification with from_id <= id <= to_id read in one UPDATE; caller commits."""
+    query = Notification.query.filter(Notification.user_id == user_id, Notification.is_read.is_(False))
+    if from_id is not None:
+        query = query.filter(Notification.id >= from_id)
+    if to_id is not None:
+        query = query.filter(Notification.id <= to_id)
+    return query.update({Notification.is_read: True}, synchronize_session=False)
+
+
+def paginate_notifications(user_id, before_id=None, limit=20, unread_only=False):
+    """
+    Keyset page of notifications, newest first. Returns (rows, next_before_id);
+    next_before_id is None on the last page.
+    """
+    query = Notification.query.filter(Notification.user_id == user_id)
+    if unread_only:
+        query = query.filter(Notification.is_read.is_(False))
+    if before_id is not None:
+        query = query.filter(Notification.id < before_id)
+    rows = query.order_by(Notification.id.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1].id
+    return rows, None
+
+
+def notifications_after(user_id, last_id, limit=50):
+    return (Notification.query
+            .filter(Notification.user_id == user_id, Notification.id > last_id)
+            .order_by(Notification.id.asc())
+            .limit(limit)
+            .all())
+
+
+def latest_notification_id(user_id):
+    return db.session.query(db.func.max(Notification.id)).filter(Notification.user_id == user_id).scalar() or 0
+
+
+# -------------------------
+# Retention
+# -------------------------
+def compact_notifications(older_than_days=90, batch_size=5000):
+    """
+    Fold read notifications older than the cutoff into NotificationSummary
+    (one row per user, type and day) and delete them.
+
+    Works through the table in id windows of `batch_size`, one short
+    transaction each, so it can run against a live database.
+    Returns the number of notifications compacted.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    upper_id = (db.session.query(db.func.max(Notification.id))
+                .filter(Notification.created_at < cutoff).scalar())
+    if upper_id is None:
+        return 0
+    lower_id = db.session.query(db.func.min(Notification.id)).scalar()
+
+    day = db.func.date(Notification.created_at)
+    compacted = 0
+    for window_start in range(lower_id, upper_id + 1, batch_size):
+        window = (
+            Notification.id >= window_start,
+            Notification.id < min(window_start + batch_size, upper_id + 1),
+            Notification.is_read.is_(True),
+            Notification.created_at < cutoff,
+        )
+        groups = (db.session.query(Notification.user_id, Notification.notification_type, day, db.func.count())
+                  .filter(*window)
+                  .group_by(Notification.user_id, Notification.notification_type, day)
+                  .all())
+        if not groups:
+            continue
+
+        rows = [{
+            'user_id': user_id,
+            'notification_type': notification_type or 'general',
+            'day': date.fromisoformat(str(group_day)[:10]),
+            'count': count,
+        } for user_id, notification_type, group_day, count in groups]
+        stmt = dialect_insert(NotificationSummary)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['user_id', 'notification_type', 'day'],
+            set_={'count': NotificationSummary.count + stmt.excluded['count']},
+        )
+        db.session.execute(stmt, rows)
+        compacted += Notification.query.filter(*window).delete(synchronize_session=False)
+        db.session.commit()
+    return compacted
+
+
+# -------------------------
+# Server-sent events
+# -------------------------
+def sse_event(data, event_id=None, event_name=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event_name:
+        lines.append(f'event: {event_name}')
+    lines.append(f'data: {json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def stream_notifications(user_id, last_id, heartbeat=15, max_age=300):
+    """
+    Yield SSE frames for notifications newer than `last_id`.
+
+    Wakes immediately on in-process publishes and otherwise polls the
+    (indexed) table every `heartbeat` seconds. The stream ends after
+    `max_age` seconds; EventSource reconnects with Last-Event-ID.
+    """
+    yield 'retry: 3000\n\n'
+    deadline = time.monotonic() + max_age
+    seq = broker.current_seq()
+    while time.monotonic() < deadline:
+        rows = [n.to_dict() for n in notifications_after(user_id, last_id)]
+        # Release the connection between polls; the stream may idle for a while
+        db.session.close()
+        for row in rows:
+            last_id = row['id']
+            yield sse_event(row, event_id=row['id'], event_name='notification')
+        if rows:
+            continue
+        woken, seq = broker.wait(user_id, seq, heartbeat)
+        if not woken:
+            yield ': keepalive\n\n'
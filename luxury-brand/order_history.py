@@ -0,0 +1,104 @@
+from collections import defaultdict
+from datetime import datetime
+
+from database import db, Order, OrderItem, Product
+
+# Product names shown per order in the history listing
+PREVIEW_ITEMS = 3
+
+
+def encode_cursor(created_at, order_id):
+    return f'{created_at.isoformat()},{order_id}'
+
+
+def decode_cursor(cursor):
+    """(created_at, id) from a cursor; raises ValueError if malformed."""
+    created_at, order_id = cursor.rsplit(',', 1)
+    return datetime.fromisoformat(created_at), int(order_id)
+
+
+def paginate_orders(user_id, cursor=None, limit=20):
+    """
+    Keyset page of a user's orders, newest first. Reads only the listing
+    columns, all of which are in ix_order_user_created, so the page is
+    served from the index. Returns (rows, next_cursor); next_cursor is
+    None on the last page.
+    """
+    query = (db.session.query(Order.id, Order.created_at, Order.status, Order.payment_status,
+                              Order.total_amount)
+             .filter(Order.user_id == user_id))
+    if cursor is not None:
+        created_at, order_id = cursor
+        query = query.filter(db.or_(
+            Order.created_at < created_at,
+            db.and_(Order.created_at == created_at, Order.id < order_id)))
+    rows = query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        return rows[:limit], encode_cursor(last.created_at, last.id)
+    return rows, None
+
+
+def item_summaries(order_ids):
+    """
+    {order_id: {'item_count', 'preview'}} for a page of orders, from one
+    IN query over the order lines joined to product names.
+    """
+    summaries = defaultdict(lambda: {'item_count': 0, 'preview': []})
+    if not order_ids:
+        return summaries
+    lines = (db.session.query(OrderItem.order_id, OrderItem.quantity, Product.name)
+             .outerjoin(Product, Product.id == OrderItem.product_id)
+             .filter(OrderItem.order_id.in_(order_ids))
+             .order_by(OrderItem.order_id, OrderItem.id))
+    for order_id, quantity, name in lines:
+        summary = summaries[order_id]
+        summary['item_count'] += quantity or 0
+        if len(summary['preview']) < PREVIEW_ITEMS:
+            summary['preview'].append(name or 'Unavailable product')
+    return summaries
+
+
+def listing_dicts(rows):
+    """Compact JSON for the history page: order fields plus an item summary, no nested items."""
+    summaries = item_summaries([row.id for row in rows])
+    listing = []
+    for row in rows:
+        summary = summaries[row.id]
+        listing.append({
+            'id': row.id,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'status': row.status,
+            'payment_status': row.payment_status,
+            'total_amount': row.total_amount,
+            'item_count': summary['item_count'],
+            'preview': summary['preview'],
+        })
+    return listing
+
+
+def order_detail(order):
+    """Full order with its lines, loaded with one joined query."""
+    lines = (db.session.query(OrderItem, Product.name)
+             .outerjoin(Product, Product.id == OrderItem.product_id)
+             .filter(OrderItem.order_id == order.id)
+             .order_by(OrderItem.id))
+    return {
+        'id': order.id,
+        'status': order.status,
+        'payment_method': order.payment_method,
+        'payment_status': order.payment_status,
+        'total_amount': order.total_amount,
+        'shipping_address': order.shipping_address,
+        'billing_address': order.billing_address,
+        'created_at': order.created_at.isoformat() if order.created_at else None,
+        'updated_at': order.updated_at.isoformat() if order.updated_at else None,
+        'order_items': [{
+            'id': item.id,
+            'product_id': item.product_id,
+            'product_name': name,
+            'quantity': item.quantity,
+            'price': item.price,
+            'subtotal': item.price * item.quantity,
+        } for item, name in lines],
+    }
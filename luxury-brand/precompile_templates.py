@@ -0,0 +1,33 @@
+# precompile_templates.py
+# Deploy step: compile every template into the Jinja bytecode cache
+# (TEMPLATE_CACHE_DIR) so new workers load bytecode instead of compiling.
+# Run after the new code is in place and before workers start.
+import argparse
+import os
+
+# Compiling is all this needs; skip the worker warm-up requests
+os.environ.setdefault('TEMPLATE_WARMUP', 'false')
+
+from app import app
+from template_cache import precompile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile all templates into the Jinja bytecode cache.")
+    parser.add_argument('--clear', action='store_true', help="drop existing cache entries first")
+    args = parser.parse_args()
+
+    cache = app.jinja_env.bytecode_cache
+    if cache is None:
+        parser.error("TEMPLATE_BYTECODE_CACHE is disabled")
+    if args.clear:
+        cache.clear()
+
+    timings = precompile(app)
+    for name, seconds in timings:
+        print(f"{name}: {seconds * 1000:.1f} ms")
+    print(f"Compiled {len(timings)} templates into {app.config['TEMPLATE_CACHE_DIR']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+import threading
+
+from cache import LRUCache, SQLiteCache
+from database import db, Product
+
+VERSION_KEY = 'products:version'
+
+
+def snapshot(product):
+    """The product fields cart, wishlist and checkout need, as a plain dict."""
+    return {
+        'id': product.id,
+        'name': product.name,
+        'price': product.price,
+        'image': product.image,
+        'visible': product.visible,
+    }
+
+
+class ProductCache:
+    """
+    Read-through cache of product snapshots keyed by id.
+
+    Lookups go to the in-process LRU, then the shared SQLite cache (when
+    configured), then one IN query for whatever is left. Every key
+    carries the product version; invalidate() bumps it, so all cached
+    products are dropped at once without deleting anything. With the
+    shared cache the version lives there, so a write in one worker is
+    seen by all of them on their next lookup; without it each worker's
+    entries age out after the LRU TTL.
+    """
+
+    def __init__(self, maxsize=5000, ttl=300, shared_path=None, shared_ttl=3600):
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.shared = SQLiteCache(shared_path, ttl=shared_ttl) if shared_path else None
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def version(self):
+        if self.shared is not None:
+            return self.shared.get(VERSION_KEY, 0)
+        return self._version
+
+    def invalidate(self):
+        """Drop every cached product (call after any product write)."""
+        if self.shared is not None:
+            self.shared.incr(VERSION_KEY)
+        else:
+            with self._lock:
+                self._version += 1
+        self.local.clear()
+
+    def get_many(self, product_ids):
+        """{id: snapshot} for the given ids; ids with no product are left out."""
+        version = self.version()
+        found = {}
+        missing = []
+        for product_id in dict.fromkeys(product_ids):
+            cached = self.local.get((version, product_id))
+            if cached is not None:
+                found[product_id] = cached
+            else:
+                missing.append(product_id)
+
+        if missing and self.shared is not None:
+            shared = self.shared.get_many(f'product:{version}:{product_id}' for product_id in missing)
+            for product_id in missing:
+                cached = shared.get(f'product:{version}:{product_id}')
+                if cached is not None:
+                    found[product_id] = cached
+                    self.local.set((version, product_id), cached)
+            missing = [product_id for product_id in missing if product_id not in found]
+
+        if missing:
+            loaded = {row.id: snapshot(row) for row in db.session.execute(
+                db.select(Product.id, Product.name, Product.price, Product.image, Product.visible)
+                .where(Product.id.in_(missing)))}
+            for product_id, cached in loaded.items():
+                self.local.set((version, product_id), cached)
+            if loaded and self.shared is not None:
+                self.shared.set_many({f'product:{version}:{product_id}': cached
+                                      for product_id, cached in loaded.items()})
+            found.update(loaded)
+        return found
+
+    def get(self, product_id):
+        return self.get_many([product_id]).get(product_id)
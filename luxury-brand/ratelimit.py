@@ -0,0 +1,253 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import deque, namedtuple
+from functools import wraps
+
+from flask import jsonify, make_response, request
+
+SLIDING_WINDOW = 'sliding_window'
+TOKEN_BUCKET = 'token_bucket'
+
+# Outcome of one hit: reset is the number of seconds until another hit would be allowed
+RateLimit = namedtuple('RateLimit', 'allowed limit remaining reset')
+
+
+class Policy:
+    """
+    `limit` hits per `window` seconds for each key. With a sliding window
+    that is a hard cap over any `window`-long span; a token bucket holds
+    `limit` tokens and refills at limit/window per second, so short bursts
+    are allowed while the average rate stays the same.
+    """
+
+    def __init__(self, name, limit, window, algorithm=SLIDING_WINDOW):
+        if algorithm not in (SLIDING_WINDOW, TOKEN_BUCKET):
+            raise ValueError(f'Unknown rate limit algorithm: {algorithm}')
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.algorithm = algorithm
+
+    @classmethod
+    def parse(cls, name, spec, algorithm=SLIDING_WINDOW):
+        """Policy from a "<limit>/<seconds>" string, e.g. "10/60"."""
+        limit, window = spec.split('/')
+        return cls(name, int(limit), float(window), algorithm)
+
+
+class MemoryBackend:
+    """
+    Exact per-process limits: sliding windows keep every hit timestamp,
+    buckets their token count. Workers do not share state, so the
+    effective limit is per worker.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._state = {}
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def hit(self, policy, key):
+        now = time.monotonic()
+        with self._lock:
+            self._windows[policy.name] = policy.window
+            state_key = (policy.name, key)
+            if state_key not in self._state and len(self._state) >= self.max_keys:
+                self._evict(now)
+            if policy.algorithm == TOKEN_BUCKET:
+                return self._take_token(policy, state_key, now)
+            return self._log_hit(policy, state_key, now)
+
+    def _log_hit(self, policy, state_key, now):
+        hits = self._state.setdefault(state_key, deque())
+        while hits and hits[0] <= now - policy.window:
+            hits.popleft()
+        if len(hits) >= policy.limit:
+            return RateLimit(False, policy.limit, 0, hits[0] + policy.window - now)
+        hits.append(now)
+        reset = hits[0] + policy.window - now if len(hits) >= policy.limit else 0.0
+        return RateLimit(True, policy.limit, policy.limit - len(hits), reset)
+
+    def _take_token(self, policy, state_key, now):
+        rate = policy.limit / policy.window
+        tokens, updated = self._state.get(state_key, (policy.limit, now))
+        tokens = min(policy.limit, tokens + (now - updated) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._state[state_key] = (tokens, now)
+        reset = 0.0 if tokens >= 1 else (1 - tokens) / rate
+        return RateLimit(allowed, policy.limit, int(tokens), reset)
+
+    def _evict(self, now):
+        # A key idle for a whole window is back at its full quota, so dropping it loses nothing
+        def last_seen(state):
+            if isinstance(state, deque):
+                return state[-1] if state else float('-inf')
+            return state[1]
+
+        stale = [key for key, state in self._state.items() if last_seen(state) <= now - self._windows[key[0]]]
+        for key in stale:
+            del self._state[key]
+        if len(self._state) >= self.max_keys:
+            self._state.clear()
+
+
+class SQLiteBackend:
+    """
+    Limits shared by every worker on a host through a local SQLite file
+    (kept apart from the main database, so throttled traffic never takes
+    its write lock). Each hit is one short IMMEDIATE transaction on the
+    key's row. Sliding windows are approximated from the current and
+    previous fixed window, weighted by how much of the previous one still
+    overlaps, which keeps state to one row per key. Rows idle for a whole
+    window are pruned every `prune_every` hits.
+    """
+
+    def __init__(self, path, prune_every=1000):
+        self.path = path
+        self.prune_every = prune_every
+        self._hits = 0
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS ratelimit (key TEXT PRIMARY KEY, '
+                     'a REAL NOT NULL, b REAL NOT NULL, c REAL NOT NULL, expires_at REAL NOT NULL)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def hit(self, policy, key):
+        conn = self._connect()
+        row_key = f'{policy.name}:{key}'
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT a, b, c FROM ratelimit WHERE key = ?', (row_key,)).fetchone()
+            if policy.algorithm == TOKEN_BUCKET:
+                result, state = self._take_token(policy, row, now)
+            else:
+                result, state = self._count_hit(policy, row, now)
+            conn.execute('INSERT OR REPLACE INTO ratelimit (key, a, b, c, expires_at) VALUES (?, ?, ?, ?, ?)',
+                         (row_key, *state, now + policy.window))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        self._hits += 1
+        if self._hits % self.prune_every == 0:
+            conn.execute('DELETE FROM ratelimit WHERE expires_at < ?', (now,))
+        return result
+
+    @staticmethod
+    def _take_token(policy, row, now):
+        # a: tokens, b: last refill time
+        rate = policy.limit / policy.window
+        tokens, updated = (row[0], row[1]) if row else (policy.limit, now)
+        tokens = min(policy.limit, tokens + (now - updated) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        reset = 0.0 if tokens >= 1 else (1 - tokens) / rate
+        return RateLimit(allowed, policy.limit, int(tokens), reset), (tokens, now, 0)
+
+    @staticmethod
+    def _count_hit(policy, row, now):
+        # a: current window start, b: hits in it, c: hits in the previous window
+        start = now - now % policy.window
+        if row is None or row[0] < start - policy.window:
+            current, previous = 0, 0
+        elif row[0] < start:
+            current, previous = 0, row[1]
+        else:
+            current, previous = row[1], row[2]
+        overlap = 1 - (now - start) / policy.window
+        used = previous * overlap + current
+        allowed = used + 1 <= policy.limit
+        if allowed:
+            current += 1
+            used += 1
+        reset = 0.0 if used < policy.limit else start + policy.window - now
+        return (RateLimit(allowed, policy.limit, max(0, int(policy.limit - used)), reset),
+                (start, current, previous))
+
+    def clear(self):
+        self._connect().execute('DELETE FROM ratelimit')
+
+
+def client_ip():
+    """The caller's address; behind a reverse proxy this needs PROXY_FIX_HOPS set."""
+    return request.remote_addr or 'unknown'
+
+
+class RateLimiter:
+    """
+    Per-route throttling. @limiter.limit(policy) checks the caller before
+    the view runs, so a rejected request does no database work; views
+    that key on request data (e.g. the sender's email) call hit()
+    themselves. Limited responses carry X-RateLimit-Limit/-Remaining/
+    -Reset, and 429s a Retry-After.
+    """
+
+    def __init__(self, app=None, backend=None):
+        self.backend = backend
+        self.enabled = True
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        if self.backend is None:
+            if app.config.get('RATELIMIT_BACKEND', 'memory') == 'sqlite':
+                self.backend = SQLiteBackend(app.config['RATELIMIT_SQLITE_PATH'])
+            else:
+                self.backend = MemoryBackend()
+
+    def hit(self, policy, key):
+        if not self.enabled:
+            return RateLimit(True, policy.limit, policy.limit, 0.0)
+        return self.backend.hit(policy, key)
+
+    def limit(self, policy, key=client_ip, methods=None):
+        """Decorator: throttle a view by `key()` (the client IP by default), optionally only for `methods`."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if methods and request.method not in methods:
+                    return view(*args, **kwargs)
+                result = self.hit(policy, key())
+                if not result.allowed:
+                    return self.limited(result)
+                response = make_response(view(*args, **kwargs))
+                self.add_headers(response, result)
+                return response
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def add_headers(response, result):
+        response.headers['X-RateLimit-Limit'] = str(result.limit)
+        response.headers['X-RateLimit-Remaining'] = str(result.remaining)
+        response.headers['X-RateLimit-Reset'] = str(math.ceil(result.reset))
+        return response
+
+    def limited(self, result, message='Too many requests. Please try again later.'):
+        """The 429 response: JSON for API routes, plain text for pages and form posts."""
+        if request.path.startswith('/api/'):
+            response = make_response(jsonify({'success': False, 'message': message}), 429)
+        else:
+            response = make_response(message, 429, {'Content-Type': 'text/plain; charset=utf-8'})
+        response.headers['Retry-After'] = str(max(1, math.ceil(result.reset)))
+        return self.add_headers(response, result)
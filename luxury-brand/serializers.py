@@ -0,0 +1,169 @@
+import json
+from datetime import date, datetime
+
+from flask import Response
+
+from database import (
+    db, Product, Video, Subscriber, Message, SectionVisibility, Order, OrderItem, Payment, Job,
+)
+
+try:
+    import orjson
+except ImportError:  # stdlib json without it
+    orjson = None
+
+# Ids per IN query when loading related rows (SQLite caps bound parameters)
+IN_BATCH = 500
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def dumps(data):
+    """
+    Compact JSON as bytes. orjson writes datetimes natively, in the same
+    form as isoformat() so output matches the models' to_dict.
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':'), default=_default).encode()
+
+
+def json_response(data, status=200):
+    return Response(dumps(data), status=status, mimetype='application/json')
+
+
+class Schema:
+    """
+    JSON shape of a listing as plain column expressions, read with a Core
+    select: only the requested columns are fetched and rows come back as
+    tuples, with no ORM instances, identity map or per-row to_dict.
+
+    fields maps output names to column expressions. relations maps output
+    names to (key field, loader); the loader takes the page's key values
+    and returns {key: value}, so a nested list costs one query per page
+    instead of one per row.
+    """
+
+    def __init__(self, fields, relations=None):
+        self.fields = fields
+        self.relations = relations or {}
+
+    @property
+    def names(self):
+        return [*self.fields, *self.relations]
+
+    def parse_fields(self, value):
+        """Names from a ?fields=a,b parameter (all when empty); ValueError on unknown names."""
+        if not value:
+            return self.names
+        names = list(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+        unknown = [name for name in names if name not in self.fields and name not in self.relations]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return names
+
+    def select(self, names=None, extra=()):
+        """
+        Select for the given output names; extra names the fields the
+        caller needs beyond those (e.g. for a cursor), trimmed again by
+        trim(). Keys of requested relations are always included.
+        """
+        names = names or self.names
+        wanted = [name for name in names if name in self.fields]
+        for name in [*extra, *(self.relations[name][0] for name in names if name in self.relations)]:
+            if name not in wanted:
+                wanted.append(name)
+        return db.select(*(self.fields[name].label(name) for name in wanted))
+
+    def rows(self, stmt, names=None):
+        """Execute stmt into dicts and attach the requested relations."""
+        names = names or self.names
+        result = db.session.execute(stmt)
+        keys = list(result.keys())
+        rows = [dict(zip(keys, row)) for row in result]
+        for name in names:
+            if name in self.relations:
+                key, loader = self.relations[name]
+                values = loader([row[key] for row in rows]) if rows else {}
+                for row in rows:
+                    row[name] = values.get(row[key], [])
+        return rows
+
+    def trim(self, rows, names=None):
+        """Drop fields that were only selected as keys or extras."""
+        names = set(names or self.names)
+        if rows:
+            for key in [key for key in rows[0] if key not in names]:
+                for row in rows:
+                    del row[key]
+        return rows
+
+    def dump(self, stmt, names=None):
+        return self.trim(self.rows(stmt, names), names)
+
+
+def _batches(ids):
+    ids = list(dict.fromkeys(ids))
+    for start in range(0, len(ids), IN_BATCH):
+        yield ids[start:start + IN_BATCH]
+
+
+def _order_items(order_ids):
+    """{order_id: [item]} matching OrderItem.to_dict, for a page of orders."""
+    items = {}
+    for batch in _batches(order_ids):
+        lines = db.session.execute(
+            db.select(OrderItem.id, OrderItem.order_id, OrderItem.product_id, Product.name,
+                      OrderItem.quantity, OrderItem.price)
+            .outerjoin(Product, Product.id == OrderItem.product_id)
+            .where(OrderItem.order_id.in_(batch))
+            .order_by(OrderItem.order_id, OrderItem.id))
+        for item_id, order_id, product_id, name, quantity, price in lines:
+            items.setdefault(order_id, []).append({
+                'id': item_id,
+                'order_id': order_id,
+                'product_id': product_id,
+                'product_name': name,
+                'quantity': quantity,
+                'price': price,
+                'subtotal': price * quantity,
+            })
+    return items
+
+
+def _columns(model, *names):
+    return {name: getattr(model, name) for name in names}
+
+
+# -------------------------
+# Admin listings (same fields as the models' to_dict)
+# -------------------------
+SECTIONS = Schema(_columns(SectionVisibility, 'id', 'section_name', 'visible'))
+
+PRODUCTS = Schema(_columns(Product, 'id', 'name', 'description', 'details', 'price', 'image', 'visible',
+                           'created_at', 'updated_at'))
+
+ORDERS = Schema(
+    _columns(Order, 'id', 'user_id', 'status', 'payment_method', 'total_amount', 'payment_status',
+             'shipping_address', 'billing_address', 'created_at', 'updated_at'),
+    relations={'order_items': ('id', _order_items)},
+)
+
+PAYMENTS = Schema(_columns(Payment, 'id', 'order_id', 'user_id', 'payment_method', 'payment_intent_id',
+                           'payment_status', 'amount', 'currency', 'transaction_data', 'created_at',
+                           'updated_at'))
+
+JOBS = Schema(_columns(Job, 'id', 'name', 'payload', 'status', 'attempts', 'max_attempts', 'run_at',
+                       'last_error', 'created_at'))
+
+MESSAGES = Schema(_columns(Message, 'id', 'name', 'email', 'message', 'created_at', 'read', 'spam_score',
+                           'is_spam'))
+
+SUBSCRIBERS = Schema(_columns(Subscriber, 'id', 'email', 'created_at'))
+
+VIDEOS = Schema(_columns(Video, 'id', 'title', 'description', 'video_url', 'thumbnail', 'visible',
+                         'created_at'))
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import threading
+from types import MappingProxyType
+
+from database import db, SectionVisibility
+
+
+class SiteSettings:
+    """
+    Section toggles held in memory as a read-only {section_name: visible}
+    snapshot, so page views never query SectionVisibility.
+
+    Writers update the table and then bump the version file; readers
+    compare the file's stat with the one their snapshot was loaded at
+    and reload only when it changed. The stat is taken before the query,
+    so an update that lands during a reload is picked up on the next
+    read. Workers must share the version file (same host or volume).
+    """
+
+    def __init__(self, version_path):
+        self.version_path = version_path
+        self._snapshot = None
+        self._token = None
+        self._lock = threading.Lock()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.version_path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def sections(self):
+        """The current snapshot; needs an app context only when it reloads."""
+        token = self._stat()
+        snapshot = self._snapshot
+        if snapshot is None or token != self._token:
+            with self._lock:
+                if self._snapshot is None or token != self._token:
+                    rows = db.session.execute(db.select(SectionVisibility.section_name, SectionVisibility.visible))
+                    self._snapshot = MappingProxyType({name: bool(visible) for name, visible in rows})
+                    self._token = token
+                snapshot = self._snapshot
+        return snapshot
+
+    def version(self):
+        try:
+            with open(self.version_path) as f:
+                return int(f.read() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def bump(self):
+        """Publish a new version; the file is replaced, so every reader sees a new stat."""
+        version = self.version() + 1
+        directory = os.path.dirname(self.version_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.settings-')
+        with os.fdopen(fd, 'w') as f:
+            f.write(str(version))
+        os.replace(tmp, self.version_path)
+        return version
+
+    def update_sections(self, changes):
+        """
+        Apply {section_name: visible} in one UPDATE, commit and bump the
+        version. Unknown section names are ignored. Returns the new version.
+        """
+        if changes:
+            db.session.execute(
+                db.update(SectionVisibility)
+                .where(SectionVisibility.section_name.in_(list(changes)))
+                .values(visible=db.case(changes, value=SectionVisibility.section_name))
+                .execution_options(synchronize_session=False))
+            db.session.commit()
+        return self.bump()
@@ -13,6 +13,9 @@ document.addEventListener('DOMContentLoaded', function() {
     loadSubscribers();
     loadVideos();
     loadGiveaway();
+
+    // Live notifications (new orders, status changes)
+    initNotificationStream();
 });
 
 
@@ -98,6 +101,31 @@ function loadDashboardData() {
 }
 
 
+// Subscribe to server-sent notifications; EventSource reconnects with Last-Event-ID
+function initNotificationStream() {
+    const list = document.getElementById('admin-notifications');
+    if (!list || !window.EventSource) return;
+
+    const source = new EventSource(`/api/admin/notifications/stream?last_id=${list.dataset.lastId || 0}`);
+    source.addEventListener('notification', e => {
+        const notification = JSON.parse(e.data);
+        const empty = list.querySelector('.notification-item.empty');
+        if (empty) empty.remove();
+
+        const li = document.createElement('li');
+        li.className = 'notification-item unread';
+        li.dataset.id = notification.id;
+        // Messages include customer-supplied text (usernames), so never parse them as HTML
+        const message = document.createElement('span');
+        message.textContent = notification.message;
+        const time = document.createElement('small');
+        time.textContent = new Date(notification.created_at).toLocaleString();
+        li.append(message, time);
+        list.prepend(li);
+    });
+}
+
+
 // Load products
 function loadProducts() {
     fetch('/api/admin/products')
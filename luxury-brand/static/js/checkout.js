@@ -45,7 +45,7 @@ async function initializeStripe() {
         }),
     });
     
-    const { clientSecret, payment_id } = await response.json();
+    const { clientSecret } = await response.json();
     
     // Initialize Stripe Elements
     const appearance = {
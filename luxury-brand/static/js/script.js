@@ -1,14 +1,9 @@
 // DOM Content Loaded
+// Section widgets (slider, countdown, video modal, forms) live in
+// static/js/sections/ and are only included for visible sections.
 document.addEventListener('DOMContentLoaded', function() {
-    // Initialize all functionality
     initNavigation();
-    initProductDropdowns();
-    initTestimonialSlider();
-    initCountdown();
-    initVideoPlaceholders();
-    initForms();
-    initWishlistCart(); // Wishlist and cart functionality
-    
+
     // Initialize animations after all else
     setTimeout(initAnimations, 100);
     
@@ -16,9 +11,8 @@ document.addEventListener('DOMContentLoaded', function() {
     updateCartCount();
     updateWishlistIndicator();
 
-    // Fetch counts from backend if logged in
-    fetchCartCountFromBackend();
-    fetchWishlistCountFromBackend();
+    // Fetch header badge counts from backend if logged in
+    fetchSummaryFromBackend();
 });
 
 // Navigation handling
@@ -52,123 +46,6 @@ function initNavigation() {
     });
 }
 
-// Product dropdown toggles
-function initProductDropdowns() {
-    const dropdownBtns = document.querySelectorAll('.dropdown-btn');
-    if (!dropdownBtns.length) return;
-
-    dropdownBtns.forEach(btn => {
-        btn.addEventListener('click', e => {
-            e.preventDefault();
-            e.stopPropagation();
-            const dropdownContent = btn.nextElementSibling;
-            const icon = btn.querySelector('i');
-            dropdownContent.classList.toggle('active');
-            btn.classList.toggle('active');
-            if (dropdownContent.classList.contains('active')) {
-                icon.style.transform = 'rotate(180deg)';
-                closeOtherDropdowns(btn);
-            } else {
-                icon.style.transform = 'rotate(0deg)';
-            }
-        });
-    });
-
-    document.addEventListener('click', e => {
-        if (!e.target.closest('.product-dropdown')) {
-            closeAllDropdowns();
-        }
-    });
-
-    document.addEventListener('keydown', e => {
-        if (e.key === 'Escape') {
-            closeAllDropdowns();
-        }
-    });
-
-    function closeOtherDropdowns(currentBtn) {
-        dropdownBtns.forEach(btn => {
-            if (btn !== currentBtn) {
-                btn.nextElementSibling.classList.remove('active');
-                btn.classList.remove('active');
-                btn.querySelector('i').style.transform = 'rotate(0deg)';
-            }
-        });
-    }
-
-    function closeAllDropdowns() {
-        dropdownBtns.forEach(btn => {
-            btn.nextElementSibling.classList.remove('active');
-            btn.classList.remove('active');
-            btn.querySelector('i').style.transform = 'rotate(0deg)';
-        });
-    }
-}
-
-// Testimonial slider logic
-function initTestimonialSlider() {
-    const slides = document.querySelectorAll('.testimonial-slide');
-    const prevBtn = document.querySelector('.testimonial-prev');
-    const nextBtn = document.querySelector('.testimonial-next');
-
-    if (!slides.length) return;
-
-    let currentSlide = 0;
-    function showSlide(index) {
-        slides.forEach(slide => slide.classList.remove('active'));
-        slides[index].classList.add('active');
-    }
-    function nextSlide() {
-        currentSlide = (currentSlide + 1) % slides.length;
-        showSlide(currentSlide);
-    }
-    function prevSlide() {
-        currentSlide = (currentSlide - 1 + slides.length) % slides.length;
-        showSlide(currentSlide);
-    }
-    if (nextBtn && prevBtn) {
-        nextBtn.addEventListener('click', nextSlide);
-        prevBtn.addEventListener('click', prevSlide);
-    }
-    if (slides.length > 1) {
-        setInterval(nextSlide, 5000);
-    }
-}
-
-// Countdown timer
-function initCountdown() {
-    const daysEl = document.getElementById('days');
-    const hoursEl = document.getElementById('hours');
-    const minutesEl = document.getElementById('minutes');
-    const secondsEl = document.getElementById('seconds');
-
-    if (!daysEl) return;
-
-    // Ideally pass timestamp from server for exact countdown
-    const countDownDate = new Date();
-    countDownDate.setDate(countDownDate.getDate() + 7);
-
-    const intervalId = setInterval(() => {
-        const now = Date.now();
-        const distance = countDownDate - now;
-
-        const days = Math.floor(distance / (1000 * 60 * 60 * 24));
-        const hours = Math.floor((distance % (1000 * 60 * 60 * 24)) / (1000 * 60 * 60));
-        const minutes = Math.floor((distance % (1000 * 60 * 60)) / (1000 * 60));
-        const seconds = Math.floor((distance % (1000 * 60)) / 1000);
-
-        daysEl.textContent = days.toString().padStart(2, '0');
-        hoursEl.textContent = hours.toString().padStart(2, '0');
-        minutesEl.textContent = minutes.toString().padStart(2, '0');
-        secondsEl.textContent = seconds.toString().padStart(2, '0');
-
-        if (distance < 0) {
-            clearInterval(intervalId);
-            daysEl.textContent = hoursEl.textContent = minutesEl.textContent = secondsEl.textContent = '00';
-        }
-    }, 1000);
-}
-
 // Animations on scroll
 function initAnimations() {
     const fadeElems = document.querySelectorAll('.fade-in');
@@ -188,133 +65,7 @@ function initAnimations() {
     window.addEventListener('resize', checkFade);
 }
 
-// Video play modal
-function initVideoPlaceholders() {
-    const placeholders = document.querySelectorAll('.video-placeholder');
-    const modal = document.querySelector('.video-modal');
-    const closeBtn = document.querySelector('.close-modal');
-    const player = document.getElementById('video-player');
-
-    if (!placeholders.length) return;
-
-    placeholders.forEach(el => {
-        el.addEventListener('click', () => {
-            const url = el.getAttribute('data-video');
-            if (url) {
-                player.src = url;
-                modal.classList.add('active');
-            }
-        });
-    });
-
-    if (closeBtn) {
-        closeBtn.addEventListener('click', () => {
-            modal.classList.remove('active');
-            player.src = '';
-        });
-    }
-    if (modal) {
-        modal.addEventListener('click', e => {
-            if (e.target === modal) {
-                modal.classList.remove('active');
-                player.src = '';
-            }
-        });
-    }
-}
-
-// Form submissions: newsletter, contact, giveaway
-function initForms() {
-    const newsletterForm = document.getElementById('newsletter-form');
-    if (newsletterForm) newsletterForm.addEventListener('submit', handleNewsletter);
-
-    const contactForm = document.getElementById('contact-form');
-    if (contactForm) contactForm.addEventListener('submit', handleContact);
-
-    const giveawayForm = document.getElementById('giveaway-form');
-    if (giveawayForm) giveawayForm.addEventListener('submit', handleGiveaway);
-}
-
-function handleNewsletter(e) {
-    e.preventDefault();
-    const form = e.target;
-    const email = form.querySelector('input[type="email"]').value.trim();
-    fetch('/api/subscribe', {
-        method: 'POST',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({email}),
-    })
-    .then(res => res.json())
-    .then(data => {
-        showNotification(data.message, data.success ? 'success' : 'error');
-        if (data.success) form.reset();
-    })
-    .catch(() => showNotification('An error occurred. Please try again.', 'error'));
-}
-
-function handleContact(e) {
-    e.preventDefault();
-    const form = e.target;
-    const name = form.querySelector('input[type="text"]').value.trim();
-    const email = form.querySelector('input[type="email"]').value.trim();
-    const message = form.querySelector('textarea').value.trim();
-    fetch('/api/contact', {
-        method: 'POST',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({name, email, message}),
-    })
-    .then(res => res.json())
-    .then(data => {
-        showNotification(data.message, data.success ? 'success' : 'error');
-        if (data.success) form.reset();
-    })
-    .catch(() => showNotification('An error occurred. Please try again.', 'error'));
-}
-
-function handleGiveaway(e) {
-    e.preventDefault();
-    const form = e.target;
-    const email = form.querySelector('input[type="email"]').value.trim();
-    fetch('/api/enter-giveaway', {
-        method: 'POST',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({email}),
-    })
-    .then(res => res.json())
-    .then(data => {
-        showNotification(data.message, data.success ? 'success' : 'error');
-        if (data.success) form.reset();
-    })
-    .catch(() => showNotification('An error occurred. Please try again.', 'error'));
-}
-
-// Wishlist & Cart
-
-function initWishlistCart() {
-    document.querySelectorAll('.action-btn.wishlist').forEach(btn =>
-        btn.addEventListener('click', e => {
-            e.preventDefault();
-            e.stopPropagation();
-            const card = btn.closest('.product-card');
-            const id = card.getAttribute('data-product-id');
-            const name = card.querySelector('.product-title').textContent;
-            toggleWishlist(id, name, btn);
-        })
-    );
-
-    document.querySelectorAll('.action-btn.cart').forEach(btn =>
-        btn.addEventListener('click', e => {
-            e.preventDefault();
-            e.stopPropagation();
-            const card = btn.closest('.product-card');
-            const id = card.getAttribute('data-product-id');
-            const name = card.querySelector('.product-title').textContent;
-            const price = btn.dataset.price || parseFloat(btn.textContent.match(/\$([\d.]+)/)[1]);
-            addToCart(id, name, price, btn);
-        })
-    );
-}
-
+// Wishlist & Cart (also used by the wishlist page)
 function toggleWishlist(id, name, btn) {
     let wishlist = JSON.parse(localStorage.getItem('wishlist')) || [];
     const index = wishlist.findIndex(i => i.id === id);
@@ -410,56 +161,46 @@ function showNotification(message, type = 'info') {
     });
 }
 
-// Backend API calls to update cart counts if logged in
-function fetchCartCountFromBackend() {
-    fetch('/api/cart/count')
+// Backend API call for login state and header badges.
+// One request returns the username, admin flag and cart, wishlist and
+// notification counts; the browser revalidates it with If-None-Match so
+// unchanged data comes back as a 304.
+function fetchSummaryFromBackend() {
+    fetch('/api/me/summary', {credentials: 'same-origin'})
     .then(res => res.json())
     .then(data => {
-        if ('count' in data) {
-            let indicator = document.getElementById('cart-indicator');
-            if (!indicator) {
-                const link = document.querySelector('a[href="/cart"]');
-                if (!link) return;
-                indicator = document.createElement('span');
-                indicator.id = 'cart-indicator';
-                indicator.className = 'cart-indicator';
-                link.appendChild(indicator);
-            }
-            if (data.count > 0) {
-                indicator.textContent = data.count;
-                indicator.style.display = 'flex';
-            } else {
-                indicator.style.display = 'none';
-            }
-        }
+        if (!data.authenticated) return;
+        showAccountLinks(data);
+        setIndicator('cart-indicator', 'cart-indicator', 'a[href="/cart"]', data.cart_count);
+        setIndicator('wishlist-indicator', 'wishlist-indicator', 'a[href="/wishlist"]', data.wishlist_count);
     })
-    .catch(err => console.error('Failed to fetch cart count:', err));
+    .catch(err => console.error('Failed to fetch account summary:', err));
 }
 
-function fetchWishlistCountFromBackend() {
-    // Implement when backend API for wishlist count is ready
-    /*
-    fetch('/api/wishlist/count')
-    .then(res => res.json())
-    .then(data => {
-        if ('count' in data) {
-            let indicator = document.getElementById('wishlist-indicator');
-            if (!indicator) {
-                const link = document.querySelector('a[href="/wishlist"]');
-                if (!link) return;
-                indicator = document.createElement('span');
-                indicator.id = 'wishlist-indicator';
-                indicator.className = 'wishlist-indicator';
-                link.appendChild(indicator);
-            }
-            if (data.count > 0) {
-                indicator.textContent = data.count;
-                indicator.style.display = 'flex';
-            } else {
-                indicator.style.display = 'none';
-            }
-        }
-    })
-    .catch(err => console.error('Failed to fetch wishlist count:', err));
-    */
+// Swap the guest links of a shared-cached page for the account links
+function showAccountLinks(data) {
+    const account = document.querySelectorAll('[data-account]');
+    if (!account.length) return;
+    account.forEach(el => el.hidden = false);
+    document.querySelectorAll('[data-guest]').forEach(el => el.hidden = true);
+    document.querySelectorAll('[data-account-username]').forEach(el => el.textContent = data.username);
+    document.querySelectorAll('[data-account-admin]').forEach(el => el.hidden = !data.is_admin);
+}
+
+function setIndicator(id, className, linkSelector, count) {
+    let indicator = document.getElementById(id);
+    if (!indicator) {
+        const link = document.querySelector(linkSelector);
+        if (!link) return;
+        indicator = document.createElement('span');
+        indicator.id = id;
+        indicator.className = className;
+        link.appendChild(indicator);
+    }
+    if (count > 0) {
+        indicator.textContent = count;
+        indicator.style.display = 'flex';
+    } else {
+        indicator.style.display = 'none';
+    }
 }
@@ -0,0 +1,57 @@
+// Giveaway section: countdown and entry form
+document.addEventListener('DOMContentLoaded', function() {
+    initCountdown();
+    const giveawayForm = document.getElementById('giveaway-form');
+    if (giveawayForm) giveawayForm.addEventListener('submit', handleGiveaway);
+});
+
+function initCountdown() {
+    const daysEl = document.getElementById('days');
+    const hoursEl = document.getElementById('hours');
+    const minutesEl = document.getElementById('minutes');
+    const secondsEl = document.getElementById('seconds');
+
+    if (!daysEl) return;
+
+    // Ideally pass timestamp from server for exact countdown
+    const countDownDate = new Date();
+    countDownDate.setDate(countDownDate.getDate() + 7);
+
+    const intervalId = setInterval(() => {
+        const now = Date.now();
+        const distance = countDownDate - now;
+
+        const days = Math.floor(distance / (1000 * 60 * 60 * 24));
+        const hours = Math.floor((distance % (1000 * 60 * 60 * 24)) / (1000 * 60 * 60));
+        const minutes = Math.floor((distance % (1000 * 60 * 60)) / (1000 * 60));
+        const seconds = Math.floor((distance % (1000 * 60)) / 1000);
+
+        daysEl.textContent = days.toString().padStart(2, '0');
+        hoursEl.textContent = hours.toString().padStart(2, '0');
+        minutesEl.textContent = minutes.toString().padStart(2, '0');
+        secondsEl.textContent = seconds.toString().padStart(2, '0');
+
+        if (distance < 0) {
+            clearInterval(intervalId);
+            daysEl.textContent = hoursEl.textContent = minutesEl.textContent = secondsEl.textContent = '00';
+        }
+    }, 1000);
+}
+
+
+function handleGiveaway(e) {
+    e.preventDefault();
+    const form = e.target;
+    const email = form.querySelector('input[type="email"]').value.trim();
+    fetch('/api/enter-giveaway', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({email}),
+    })
+    .then(res => res.json())
+    .then(data => {
+        showNotification(data.message, data.success ? 'success' : 'error');
+        if (data.success) form.reset();
+    })
+    .catch(() => showNotification('An error occurred. Please try again.', 'error'));
+}
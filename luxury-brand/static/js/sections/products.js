@@ -0,0 +1,82 @@
+// Products section: detail dropdowns and wishlist/cart buttons
+document.addEventListener('DOMContentLoaded', function() {
+    initProductDropdowns();
+    initWishlistCart();
+});
+
+function initProductDropdowns() {
+    const dropdownBtns = document.querySelectorAll('.dropdown-btn');
+    if (!dropdownBtns.length) return;
+
+    dropdownBtns.forEach(btn => {
+        btn.addEventListener('click', e => {
+            e.preventDefault();
+            e.stopPropagation();
+            const dropdownContent = btn.nextElementSibling;
+            const icon = btn.querySelector('i');
+            dropdownContent.classList.toggle('active');
+            btn.classList.toggle('active');
+            if (dropdownContent.classList.contains('active')) {
+                icon.style.transform = 'rotate(180deg)';
+                closeOtherDropdowns(btn);
+            } else {
+                icon.style.transform = 'rotate(0deg)';
+            }
+        });
+    });
+
+    document.addEventListener('click', e => {
+        if (!e.target.closest('.product-dropdown')) {
+            closeAllDropdowns();
+        }
+    });
+
+    document.addEventListener('keydown', e => {
+        if (e.key === 'Escape') {
+            closeAllDropdowns();
+        }
+    });
+
+    function closeOtherDropdowns(currentBtn) {
+        dropdownBtns.forEach(btn => {
+            if (btn !== currentBtn) {
+                btn.nextElementSibling.classList.remove('active');
+                btn.classList.remove('active');
+                btn.querySelector('i').style.transform = 'rotate(0deg)';
+            }
+        });
+    }
+
+    function closeAllDropdowns() {
+        dropdownBtns.forEach(btn => {
+            btn.nextElementSibling.classList.remove('active');
+            btn.classList.remove('active');
+            btn.querySelector('i').style.transform = 'rotate(0deg)';
+        });
+    }
+}
+
+function initWishlistCart() {
+    document.querySelectorAll('.action-btn.wishlist').forEach(btn =>
+        btn.addEventListener('click', e => {
+            e.preventDefault();
+            e.stopPropagation();
+            const card = btn.closest('.product-card');
+            const id = card.getAttribute('data-product-id');
+            const name = card.querySelector('.product-title').textContent;
+            toggleWishlist(id, name, btn);
+        })
+    );
+
+    document.querySelectorAll('.action-btn.cart').forEach(btn =>
+        btn.addEventListener('click', e => {
+            e.preventDefault();
+            e.stopPropagation();
+            const card = btn.closest('.product-card');
+            const id = card.getAttribute('data-product-id');
+            const name = card.querySelector('.product-title').textContent;
+            const price = btn.dataset.price || parseFloat(btn.textContent.match(/\$([\d.]+)/)[1]);
+            addToCart(id, name, price, btn);
+        })
+    );
+}
@@ -0,0 +1,22 @@
+// Footer newsletter signup
+document.addEventListener('DOMContentLoaded', function() {
+    const newsletterForm = document.getElementById('newsletter-form');
+    if (newsletterForm) newsletterForm.addEventListener('submit', handleNewsletter);
+});
+
+function handleNewsletter(e) {
+    e.preventDefault();
+    const form = e.target;
+    const email = form.querySelector('input[type="email"]').value.trim();
+    fetch('/api/subscribe', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({email}),
+    })
+    .then(res => res.json())
+    .then(data => {
+        showNotification(data.message, data.success ? 'success' : 'error');
+        if (data.success) form.reset();
+    })
+    .catch(() => showNotification('An error occurred. Please try again.', 'error'));
+}
@@ -0,0 +1,31 @@
+// Testimonials section: text slider (video testimonials use video-modal.js)
+document.addEventListener('DOMContentLoaded', initTestimonialSlider);
+
+function initTestimonialSlider() {
+    const slides = document.querySelectorAll('.testimonial-slide');
+    const prevBtn = document.querySelector('.testimonial-prev');
+    const nextBtn = document.querySelector('.testimonial-next');
+
+    if (!slides.length) return;
+
+    let currentSlide = 0;
+    function showSlide(index) {
+        slides.forEach(slide => slide.classList.remove('active'));
+        slides[index].classList.add('active');
+    }
+    function nextSlide() {
+        currentSlide = (currentSlide + 1) % slides.length;
+        showSlide(currentSlide);
+    }
+    function prevSlide() {
+        currentSlide = (currentSlide - 1 + slides.length) % slides.length;
+        showSlide(currentSlide);
+    }
+    if (nextBtn && prevBtn) {
+        nextBtn.addEventListener('click', nextSlide);
+        prevBtn.addEventListener('click', prevSlide);
+    }
+    if (slides.length > 1) {
+        setInterval(nextSlide, 5000);
+    }
+}
@@ -0,0 +1,36 @@
+// Video placeholders (videos and video testimonials) open the shared modal
+document.addEventListener('DOMContentLoaded', initVideoPlaceholders);
+
+function initVideoPlaceholders() {
+    const placeholders = document.querySelectorAll('.video-placeholder');
+    const modal = document.querySelector('.video-modal');
+    const closeBtn = document.querySelector('.close-modal');
+    const player = document.getElementById('video-player');
+
+    if (!placeholders.length) return;
+
+    placeholders.forEach(el => {
+        el.addEventListener('click', () => {
+            const url = el.getAttribute('data-video');
+            if (url) {
+                player.src = url;
+                modal.classList.add('active');
+            }
+        });
+    });
+
+    if (closeBtn) {
+        closeBtn.addEventListener('click', () => {
+            modal.classList.remove('active');
+            player.src = '';
+        });
+    }
+    if (modal) {
+        modal.addEventListener('click', e => {
+            if (e.target === modal) {
+                modal.classList.remove('active');
+                player.src = '';
+            }
+        });
+    }
+}
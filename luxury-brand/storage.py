@@ -0,0 +1,149 @@
+import mimetypes
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+try:
+    import boto3
+    from botocore.config import Config as BotoConfig
+    from botocore.exceptions import ClientError
+except ImportError:  # only needed for STORAGE_BACKEND = 's3'
+    boto3 = None
+
+COPY_CHUNK = 1024 * 1024
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+class FilesystemStorage:
+    """Uploads under a local directory (UPLOAD_FOLDER). Keys are '/'-separated relative paths."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, key):
+        path = os.path.normpath(os.path.join(self.root, *key.split('/')))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f'Invalid storage key {key!r}')
+        return path
+
+    def exists(self, key):
+        return os.path.isfile(self.path(key))
+
+    def put_stream(self, key, fileobj, content_type=None, cache_control=None):
+        """Copy a file object into place in chunks, via a temp file and an atomic rename."""
+        path = self.path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                shutil.copyfileobj(fileobj, f, COPY_CHUNK)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def url(self, key, cache_control=None):
+        """Files are served by the app itself (see uploaded_file)."""
+        return None
+
+
+class S3Storage:
+    """
+    Uploads in an S3-compatible bucket. Set endpoint_url to use a local
+    stand-in such as MinIO (`minio server /data`) or `moto_server`.
+    Reads are offloaded to the bucket: url() returns a public or presigned
+    URL that uploaded_file redirects to.
+    """
+
+    def __init__(self, bucket, prefix='', endpoint_url=None, region=None, access_key_id=None,
+                 secret_access_key=None, public_base_url=None, url_expires=3600):
+        if boto3 is None:
+            raise RuntimeError("STORAGE_BACKEND 's3' requires boto3 (pip install boto3)")
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.public_base_url = public_base_url.rstrip('/') if public_base_url else None
+        self.url_expires = url_expires
+        self.client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            # Path-style addressing works with local stand-ins that have no wildcard DNS
+            config=BotoConfig(s3={'addressing_style': 'path'}) if endpoint_url else None,
+        )
+
+    def object_key(self, key):
+        return f'{self.prefix}/{key}' if self.prefix else key
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+    def put_stream(self, key, fileobj, content_type=None, cache_control=None):
+        """upload_fileobj sends large bodies as a multipart upload, part by part."""
+        extra = {'ContentType': content_type or mimetypes.guess_type(key)[0] or 'application/octet-stream'}
+        if cache_control:
+            extra['CacheControl'] = cache_control
+        self.client.upload_fileobj(fileobj, self.bucket, self.object_key(key), ExtraArgs=extra)
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_key(key))
+
+    def url(self, key, cache_control=None):
+        if self.public_base_url:
+            return f'{self.public_base_url}/{self.object_key(key)}'
+        params = {'Bucket': self.bucket, 'Key': self.object_key(key)}
+        if cache_control:
+            params['ResponseCacheControl'] = cache_control
+        return self.client.generate_presigned_url('get_object', Params=params, ExpiresIn=self.url_expires)
+
+    def list_files(self, prefix=''):
+        """{key: (size, mtime_ns)} for every object under `prefix`."""
+        files = {}
+        base = self.object_key(prefix) if prefix else (f'{self.prefix}/' if self.prefix else '')
+        strip = len(self.prefix) + 1 if self.prefix else 0
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=base):
+            for item in page.get('Contents', []):
+                modified = item['LastModified']
+                mtime_ns = int(modified.timestamp() * 1e9) if isinstance(modified, datetime) else 0
+                files[item['Key'][strip:]] = (item['Size'], mtime_ns)
+        return files
+
+
+def init_storage(app):
+    """Build the upload storage backend named by STORAGE_BACKEND."""
+    backend = app.config.get('STORAGE_BACKEND', 'filesystem')
+    if backend == 'filesystem':
+        return FilesystemStorage(app.config['UPLOAD_FOLDER'])
+    if backend == 's3':
+        return S3Storage(
+            bucket=app.config['S3_BUCKET'],
+            prefix=app.config.get('S3_PREFIX', ''),
+            endpoint_url=app.config.get('S3_ENDPOINT_URL'),
+            region=app.config.get('S3_REGION'),
+            access_key_id=app.config.get('S3_ACCESS_KEY_ID'),
+            secret_access_key=app.config.get('S3_SECRET_ACCESS_KEY'),
+            public_base_url=app.config.get('S3_PUBLIC_BASE_URL'),
+            url_expires=app.config.get('S3_URL_EXPIRES', 3600),
+        )
+    raise ValueError(f'Unknown STORAGE_BACKEND {backend!r}')
@@ -0,0 +1,111 @@
+import csv
+import io
+import re
+
+from database import db, Subscriber, dialect_insert
+
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+def normalize_email(email):
+    """Trimmed, lower-cased email, or None if it does not look like an address."""
+    if not email:
+        return None
+    email = email.strip().lower()
+    if len(email) > 150 or not EMAIL_RE.match(email):
+        return None
+    return email
+
+
+def _insert_ignore():
+    return dialect_insert(Subscriber.__table__).on_conflict_do_nothing(index_elements=['email'])
+
+
+def subscribe(email):
+    """
+    Add a subscriber in a single INSERT ... ON CONFLICT DO NOTHING.
+    Returns True if the address is new, False if it was already subscribed.
+    Concurrent double-submits resolve in the database instead of raising.
+    """
+    result = db.session.execute(_insert_ignore(), {'email': email})
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def _email_column(header):
+    for index, name in enumerate(header):
+        if name.strip().lower() in ('email', 'e-mail', 'email address'):
+            return index
+    return None
+
+
+def import_csv(stream, batch_size=5000):
+    """
+    Stream subscriber addresses from a CSV file object into the table.
+
+    Uses the column named "email" if there is a header, otherwise the first
+    column. Rows are inserted in batches of `batch_size`, one transaction
+    per batch, with conflicts ignored. Returns counts of rows read,
+    inserted, duplicate (already present or repeated in the file) and
+    invalid.
+    """
+    stats = {'read': 0, 'inserted': 0, 'duplicates': 0, 'invalid': 0}
+    reader = csv.reader(stream)
+    column = 0
+    batch = set()
+
+    def flush():
+        if not batch:
+            return
+        result = db.session.execute(_insert_ignore(), [{'email': email} for email in batch])
+        db.session.commit()
+        inserted = result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(batch)
+        stats['inserted'] += inserted
+        stats['duplicates'] += len(batch) - inserted
+        batch.clear()
+
+    for line_no, row in enumerate(reader):
+        if not row:
+            continue
+        if line_no == 0:
+            header_column = _email_column(row)
+            if header_column is not None:
+                column = header_column
+                continue
+        stats['read'] += 1
+        email = normalize_email(row[column] if column < len(row) else None)
+        if email is None:
+            stats['invalid'] += 1
+        elif email in batch:
+            stats['duplicates'] += 1
+        else:
+            batch.add(email)
+            if len(batch) >= batch_size:
+                flush()
+    flush()
+    return stats
+
+
+def export_csv(chunk_size=5000):
+    """
+    Yield the subscriber list as CSV text chunks, walking the table by id so
+    memory stays flat however large the list is.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['email', 'created_at'])
+    last_id = 0
+    while True:
+        rows = (db.session.query(Subscriber.id, Subscriber.email, Subscriber.created_at)
+                .filter(Subscriber.id > last_id)
+                .order_by(Subscriber.id)
+                .limit(chunk_size)
+                .all())
+        for _, email, created_at in rows:
+            writer.writerow([email, created_at.isoformat() if created_at else ''])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        if len(rows) < chunk_size:
+            return
+        last_id = rows[-1][0]
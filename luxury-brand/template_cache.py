@@ -0,0 +1,70 @@
+import logging
+import os
+import time
+
+from jinja2 import FileSystemBytecodeCache
+
+logger = logging.getLogger(__name__)
+
+
+def init_app(app):
+    """
+    Keep compiled templates in TEMPLATE_CACHE_DIR, shared by every worker
+    and kept across restarts. Jinja checks each entry against the
+    template source's checksum, so an edited template is recompiled
+    rather than served stale. Entries are written via a temp file and a
+    rename, so concurrent workers never read a partial file.
+    """
+    if not app.config.get('TEMPLATE_BYTECODE_CACHE', True):
+        return None
+    cache_dir = app.config['TEMPLATE_CACHE_DIR']
+    os.makedirs(cache_dir, exist_ok=True)
+    cache = FileSystemBytecodeCache(cache_dir)
+    # Works whether or not app.jinja_env has been created yet
+    app.jinja_options = {**app.jinja_options, 'bytecode_cache': cache}
+    if 'jinja_env' in app.__dict__:
+        app.jinja_env.bytecode_cache = cache
+    return cache
+
+
+def template_names(app):
+    return [name for name in app.jinja_env.list_templates() if name.endswith('.html')]
+
+
+def precompile(app):
+    """
+    Compile every template into the bytecode cache (run at deploy, see
+    precompile_templates.py). Returns [(template name, seconds)].
+    """
+    timings = []
+    for name in template_names(app):
+        started = time.perf_counter()
+        app.jinja_env.get_template(name)
+        timings.append((name, time.perf_counter() - started))
+    return timings
+
+
+def warm_up(app):
+    """
+    Run at worker start: load every template into this process's template
+    cache (from bytecode when available) and render the pages listed in
+    TEMPLATE_WARMUP_PATHS once, so the first real requests do not pay for
+    compilation, url_for map building or first-query setup. Failures are
+    logged, never raised; a broken page must not stop the worker booting.
+    """
+    started = time.perf_counter()
+    for name in template_names(app):
+        try:
+            app.jinja_env.get_template(name)
+        except Exception:
+            logger.exception('Template warm-up: %s failed to compile', name)
+    client = app.test_client()
+    for path in app.config.get('TEMPLATE_WARMUP_PATHS', ()):
+        try:
+            response = client.get(path)
+            response.close()
+            if response.status_code >= 500:
+                logger.warning('Template warm-up: GET %s returned %s', path, response.status_code)
+        except Exception:
+            logger.exception('Template warm-up: GET %s failed', path)
+    logger.info('Template warm-up finished in %.1f ms', (time.perf_counter() - started) * 1000)